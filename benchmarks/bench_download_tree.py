@@ -0,0 +1,69 @@
+"""
+Throughput of downloading a Box folder tree at increasing parallelism.
+
+Each simulated download sleeps for a fixed latency before writing its content,
+standing in for the round trip and transfer of one file from Box. The same
+tree is downloaded into a fresh directory at each parallelism setting, so no
+file is skipped.
+
+Usage:
+    python benchmarks/bench_download_tree.py [--files 64] [--latency 0.1] [--parallel 1 4 16]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from box_transfer import download_directory  # noqa: E402
+
+CONTENT = b"x" * 64 * 1024
+
+
+def make_client(files: int, latency: float) -> MagicMock:
+    """Mock Box client for one folder of `files` files"""
+    entries = []
+    for i in range(files):
+        item = MagicMock(id=str(i), type="file", sha1=None)
+        item.name = f"file-{i}.bin"
+        entries.append(item)
+
+    def download(file_id, output_stream):
+        time.sleep(latency)
+        output_stream.write(CONTENT)
+
+    client = MagicMock()
+    client.folders.get_folder_items.return_value = MagicMock(
+        entries=entries, next_marker=None
+    )
+    client.downloads.download_file_to_output_stream.side_effect = download
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--parallel", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    client = make_client(args.files, args.latency)
+    print(f"{args.files} files, {args.latency * 1000:.0f} ms each")
+    for parallel in args.parallel:
+        with tempfile.TemporaryDirectory() as tmp, ThreadPoolExecutor(parallel) as pool:
+            start = time.perf_counter()
+            download_directory(client, "0", tmp, parallel, pool)
+            elapsed = time.perf_counter() - start
+        print(
+            f"{f'parallel[{parallel}]':>14}: {elapsed:7.2f} s"
+            f"  {args.files / elapsed:8.1f} files/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
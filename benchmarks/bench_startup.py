@@ -0,0 +1,93 @@
+"""
+Cold-start time of the stdio server, up to the first tools/list response.
+
+Each run spawns `src/mcp_server_box.py` the way a desktop MCP host does,
+performs the initialize handshake and lists the tools. The script exits with
+status 1 when the median time goes over the budget, so it can gate CI.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--budget 1.0]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SERVER = os.path.join(os.path.dirname(__file__), "..", "src", "mcp_server_box.py")
+
+
+def send(process: subprocess.Popen, message: dict) -> None:
+    process.stdin.write(json.dumps(message) + "\n")
+    process.stdin.flush()
+
+
+def receive(process: subprocess.Popen, request_id: int) -> dict:
+    for line in process.stdout:
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+    raise RuntimeError(f"Server exited before answering request {request_id}")
+
+
+def time_to_tools_list() -> tuple[float, int]:
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, SERVER, "--transport", "stdio"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        send(
+            process,
+            {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "initialize",
+                "params": {
+                    "protocolVersion": "2025-06-18",
+                    "capabilities": {},
+                    "clientInfo": {"name": "bench_startup", "version": "0"},
+                },
+            },
+        )
+        receive(process, 1)
+        send(process, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        send(process, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        tools = receive(process, 2)["result"]["tools"]
+        return time.perf_counter() - start, len(tools)
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds")
+    args = parser.parse_args()
+
+    timings = []
+    for _ in range(args.runs):
+        elapsed, tool_count = time_to_tools_list()
+        timings.append(elapsed)
+
+    median = statistics.median(timings)
+    print(f"{args.runs} cold starts, {tool_count} tools listed")
+    print(f"{'min':>8}: {min(timings):6.3f} s")
+    print(f"{'median':>8}: {median:6.3f} s")
+    print(f"{'max':>8}: {max(timings):6.3f} s")
+    print(f"{'budget':>8}: {args.budget:6.3f} s")
+    if median > args.budget:
+        print("FAIL: median time to tools/list is over budget")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Concurrent tool throughput with and without the Box API executor.
+
+Each simulated toolkit call sleeps for a fixed latency, standing in for a
+blocking HTTP round trip to Box. The "inline" run reproduces the old behaviour
+of calling the toolkit directly on the event loop; the "executor" run uses the
+shared thread pool from server_context.
+
+Usage:
+    python benchmarks/bench_tool_concurrency.py [--calls 64] [--latency 0.1] [--workers 16]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from box_tools_search import box_search_tool  # noqa: E402
+from server_context import BoxContext  # noqa: E402
+
+
+class InlineExecutor(Executor):
+    """Runs each call on the submitting thread, i.e. blocks the event loop."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def make_ctx(executor: Executor) -> MagicMock:
+    ctx = MagicMock()
+    ctx.request_context.lifespan_context = BoxContext(
+        client=MagicMock(), executor=executor
+    )
+    return ctx
+
+
+async def run_concurrent(ctx, calls: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(box_search_tool(ctx, f"query {i}") for i in range(calls)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    def slow_box_search(*_args, **_kwargs):
+        time.sleep(args.latency)
+        return []
+
+    with patch("box_tools_search.box_search", slow_box_search):
+        inline = asyncio.run(run_concurrent(make_ctx(InlineExecutor()), args.calls))
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            pooled = asyncio.run(run_concurrent(make_ctx(pool), args.calls))
+
+    print(f"{args.calls} concurrent calls, {args.latency * 1000:.0f} ms each")
+    for label, elapsed in (("inline", inline), (f"executor[{args.workers}]", pooled)):
+        print(f"{label:>14}: {elapsed:7.2f} s  {args.calls / elapsed:8.1f} calls/s")
+    print(f"{'speedup':>14}: {inline / pooled:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
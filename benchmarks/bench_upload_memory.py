@@ -0,0 +1,205 @@
+"""
+Peak memory of uploading a large file from a path.
+
+Each upload runs in its own process through the real Box SDK network stack.
+Requests are answered by an in-process fake of the Box upload API, which reads
+the request bodies the way a socket would. Three paths are compared:
+
+    toolkit   read the file into memory and call box_upload_file (the old path)
+    stream    upload_file_from_path: one request streamed from the file handle
+    chunked   upload_file_chunked: parallel parts through an upload session
+
+Uploads of base64 content, as box_upload_file_from_content_tool receives it,
+are compared the same way. The base64 text is built before the baseline is
+taken, and on Linux the peak is reset once it is built:
+
+    b64decode   decode the whole text and call box_upload_file (the old path)
+    spooled     spool_content and upload_stream: decoded in chunks into a
+                temporary file that moves to disk, then streamed
+
+The script exits with status 1 when the streaming paths grow the process by
+more than the budget, so it can gate CI.
+
+Usage:
+    python benchmarks/bench_upload_memory.py [--size 1024] [--budget 128]
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from contextlib import suppress
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+PART_SIZE = 8 * 1024 * 1024
+MODES = ("toolkit", "stream", "chunked", "b64decode", "spooled")
+STREAMING_MODES = ("stream", "chunked", "spooled")
+
+
+def peak_rss_mb() -> float:
+    with suppress(OSError):
+        # Linux, where the peak can be reset
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def reset_peak_rss() -> None:
+    """Start the peak over from the current size, where Linux allows it"""
+    with suppress(OSError):
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+
+
+def fake_box_session():
+    """requests session whose transport is a fake of the Box upload API"""
+    import requests
+    from requests.adapters import BaseAdapter
+
+    def consume(body) -> str:
+        sha1 = hashlib.sha1()
+        if hasattr(body, "read"):
+            while chunk := body.read(64 * 1024):
+                sha1.update(chunk)
+        elif body:
+            sha1.update(body if isinstance(body, bytes) else body.encode("utf-8"))
+        return sha1.hexdigest()
+
+    file_entry = {"id": "1", "type": "file", "name": "bench.bin"}
+
+    class FakeBoxUploads(BaseAdapter):
+        def send(self, request, **kwargs):
+            sha1 = consume(request.body)
+            path = request.path_url.split("?")[0]
+            if path.endswith("/upload_sessions"):
+                data = {
+                    "id": "session",
+                    "type": "upload_session",
+                    "part_size": PART_SIZE,
+                    "num_parts_processed": 0,
+                }
+            elif path.endswith("/parts"):
+                data = {"entries": [], "total_count": 0}
+            elif request.method == "PUT":
+                start = int(request.headers["content-range"].split()[1].split("-")[0])
+                data = {"part": {"part_id": str(start), "offset": start, "sha1": sha1}}
+            else:
+                data = {"entries": [file_entry], "total_count": 1}
+            response = requests.Response()
+            response.status_code = 201 if request.method == "POST" else 200
+            response.headers["Content-Type"] = "application/json"
+            response._content = json.dumps(data).encode("utf-8")
+            response.url = request.url
+            response.request = request
+            return response
+
+        def close(self):
+            pass
+
+    session = requests.Session()
+    session.mount("https://", FakeBoxUploads())
+    return session
+
+
+def run_child(mode: str, file_path: str) -> None:
+    sys.path.insert(0, SRC)
+    from box_ai_agents_toolkit import box_upload_file
+    from box_sdk_gen import (
+        BoxClient,
+        BoxDeveloperTokenAuth,
+        BoxNetworkClient,
+        NetworkSession,
+    )
+
+    from box_transfer import (
+        spool_content,
+        upload_file_chunked,
+        upload_file_from_path,
+        upload_stream,
+    )
+
+    client = BoxClient(
+        BoxDeveloperTokenAuth(token="token"),
+        network_session=NetworkSession(
+            network_client=BoxNetworkClient(fake_box_session())
+        ),
+    )
+    if mode in ("b64decode", "spooled"):
+        with open(file_path, "rb") as f:
+            content = base64.b64encode(f.read()).decode("ascii")
+        # Not counting the copies made to build the text
+        reset_peak_rss()
+    baseline = peak_rss_mb()
+    if mode == "b64decode":
+        box_upload_file(client, base64.b64decode(content), "bench.bin", "0")
+    elif mode == "spooled":
+        spool, _, sha1 = spool_content(content, is_base64=True)
+        with spool:
+            upload_stream(client, spool, "bench.bin", "0", sha1)
+    elif mode == "toolkit":
+        with open(file_path, "rb") as f:
+            box_upload_file(client, f.read(), "bench.bin", "0")
+    elif mode == "stream":
+        upload_file_from_path(client, file_path, "bench.bin", "0")
+    else:
+        with tempfile.TemporaryDirectory() as state_dir:
+            upload_file_chunked(client, file_path, "0", "bench.bin", 4, state_dir)
+    print(json.dumps({"baseline": baseline, "peak": peak_rss_mb()}))
+
+
+def write_file(path: str, size_mb: int) -> None:
+    block = os.urandom(1024 * 1024)
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+
+def measure(mode: str, file_path: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", mode, file_path],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=1024, help="file size in MB")
+    parser.add_argument("--budget", type=float, default=128, help="MB")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "bench.bin")
+        write_file(file_path, args.size)
+        print(f"Uploading a {args.size} MB file")
+        growth = {}
+        for mode in MODES:
+            result = measure(mode, file_path)
+            growth[mode] = result["peak"] - result["baseline"]
+            print(f"{mode:>9}: peak {result['peak']:8.1f} MB, +{growth[mode]:8.1f} MB")
+
+    print(f"{'budget':>9}: +{args.budget:.1f} MB")
+    if max(growth[mode] for mode in STREAMING_MODES) > args.budget:
+        print("FAIL: streaming uploads grew the process over budget")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import asyncio
+from contextlib import nullcontext
+from functools import partial
+from typing import Any, List, Optional
+
+import httpx
+from box_ai_agents_toolkit import BoxClient, SearchForContentContentTypes
+
+from box_transfer import FOLDER_CONTENT_FIELDS, FOLDER_ITEMS_PAGE_SIZE
+from rate_limits import (
+    RateLimitedNetworkClient,
+    RateLimitScheduler,
+    retry_after_seconds,
+)
+from server_context import (
+    SingleFlightCCGAuth,
+    get_executor,
+    get_transfer_concurrency,
+)
+
+# Same retry budget as the SDK's BoxRetryStrategy
+MAX_ATTEMPTS = 5
+# Attempts while waiting for Box to generate the extracted text representation
+REPRESENTATION_POLL_ATTEMPTS = 15
+REPRESENTATION_POLL_INTERVAL = 1.0
+
+
+class BoxAsyncAPI:
+    """
+    Native asyncio access to the read-only Box endpoints on the hot path.
+
+    Requests go through a shared, pooled httpx.AsyncClient, so concurrent tool
+    calls wait on sockets instead of each holding a thread. Authentication,
+    base URLs and extra headers (including As-User) come from the sync BoxClient,
+    which stays the fallback for every endpoint not covered here. Requests are
+    scheduled by the sync client's rate limiter, so both paths share its budget.
+    """
+
+    def __init__(self, client: BoxClient, http_client: httpx.AsyncClient):
+        self.client = client
+        self.http_client = http_client
+        self.api_url = f"{client.network_session.base_urls.base_url}/2.0"
+        network_client = client.network_session.network_client
+        self.scheduler: RateLimitScheduler | None = (
+            network_client.scheduler
+            if isinstance(network_client, RateLimitedNetworkClient)
+            else None
+        )
+
+    async def _authorization(
+        self, refresh: bool = False, rejected_token: Optional[str] = None
+    ) -> str:
+        auth = self.client.auth
+        loop = asyncio.get_running_loop()
+        if refresh:
+            refresh_token = auth.refresh_token
+            if isinstance(auth, SingleFlightCCGAuth):
+                # Exchanged only if no other caller has replaced the token yet
+                refresh_token = partial(
+                    auth.refresh_token, rejected_token=rejected_token
+                )
+            token = await loop.run_in_executor(get_executor(), refresh_token)
+        else:
+            # A token kept fresh by the token manager is served without a thread hop
+            cached_token = getattr(auth, "cached_token", None)
+            token = cached_token() if cached_token else None
+            if token is None:
+                token = await loop.run_in_executor(get_executor(), auth.retrieve_token)
+        return f"Bearer {token.access_token}"
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[dict[str, str]] = None,
+        headers: Optional[dict[str, str]] = None,
+    ) -> httpx.Response:
+        """
+        Send an authenticated request, retrying like the SDK does.
+        401 refreshes the token once; 429, 5xx and 202 with Retry-After are
+        retried with the server's Retry-After or an exponential backoff.
+        With a rate limiter, requests wait for their endpoint class and 429s
+        pause the class and queue the request behind it.
+        """
+        reauthenticated = False
+        attempt = 1
+        while True:
+            if self.scheduler is not None:
+                await self.scheduler.acquire_async(url)
+            authorization = await self._authorization()
+            request_headers = {
+                **self.client.network_session.additional_headers,
+                **(headers or {}),
+                "Authorization": authorization,
+            }
+            response = await self.http_client.request(
+                method,
+                url,
+                params=params,
+                headers=request_headers,
+                follow_redirects=True,
+            )
+            status = response.status_code
+            if status == 401 and not reauthenticated:
+                await self._authorization(
+                    refresh=True, rejected_token=authorization.removeprefix("Bearer ")
+                )
+                reauthenticated = True
+                continue
+
+            retry_after = response.headers.get("Retry-After")
+            if status == 429 and self.scheduler is not None:
+                # Queued in the rate limiter, with its own retry budget
+                if attempt <= self.scheduler.max_retries:
+                    self.scheduler.throttle(
+                        url, retry_after_seconds(retry_after, attempt)
+                    )
+                    attempt += 1
+                    continue
+            elif (
+                status == 429
+                or status >= 500
+                or (status == 202 and retry_after is not None)
+            ) and attempt < MAX_ATTEMPTS:
+                await asyncio.sleep(retry_after_seconds(retry_after, attempt))
+                attempt += 1
+                continue
+
+            response.raise_for_status()
+            return response
+
+    async def get_json(self, path: str, **kwargs: Any) -> dict:
+        response = await self.request("GET", f"{self.api_url}{path}", **kwargs)
+        return response.json()
+
+    async def get_user_me(self) -> dict:
+        """Get the current user's information."""
+        return await self.get_json("/users/me")
+
+    async def search(
+        self,
+        query: str,
+        file_extensions: List[str] | None = None,
+        content_types: List[SearchForContentContentTypes] | None = None,
+        ancestor_folder_ids: List[str] | None = None,
+    ) -> List[dict]:
+        """Search for files, with the same filters and fields as box_search."""
+        params = {
+            "query": query,
+            "type": "file",
+            "fields": "id,name,type,size,description",
+        }
+        if file_extensions:
+            params["file_extensions"] = ",".join(file_extensions)
+        if content_types:
+            params["content_types"] = ",".join(ct.value for ct in content_types)
+        if ancestor_folder_ids:
+            params["ancestor_folder_ids"] = ",".join(ancestor_folder_ids)
+        search_results = await self.get_json("/search", params=params)
+        return search_results.get("entries", [])
+
+    async def folder_list_page(
+        self,
+        folder_id: str,
+        fields: List[str],
+        limit: int = FOLDER_ITEMS_PAGE_SIZE,
+        marker: Optional[str] = None,
+    ) -> dict:
+        """
+        List one page of the files and folders in a folder, with only the
+        given fields, and the marker of the next page (None on the last).
+        """
+        params = {
+            "fields": ",".join(fields),
+            "usemarker": "true",
+            "limit": str(limit),
+        }
+        if marker:
+            params["marker"] = marker
+        page = await self.get_json(f"/folders/{folder_id}/items", params=params)
+        return {
+            "entries": [
+                item for item in page.get("entries", []) if item["type"] != "web_link"
+            ],
+            "next_marker": page.get("next_marker") or None,
+        }
+
+    async def folder_list_content(
+        self,
+        folder_id: str,
+        is_recursive: bool = False,
+        fields: Optional[List[str]] = None,
+    ) -> List[dict]:
+        """
+        List every file and folder in a folder, following markers across pages.
+        Sub-folders of a recursive listing are fetched concurrently, at most
+        the transfer concurrency pages at a time across the whole tree, so a
+        wide tree neither exhausts the connection pool nor floods the rate
+        limiter.
+        """
+        # Box always sends the ID
+        fields = fields or ["type", *FOLDER_CONTENT_FIELDS]
+        if not is_recursive:
+            return await self._folder_list_all(folder_id, fields)
+        semaphore = asyncio.Semaphore(get_transfer_concurrency())
+        return await self._folder_list_tree(folder_id, fields, semaphore)
+
+    async def _folder_list_all(
+        self,
+        folder_id: str,
+        fields: List[str],
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> List[dict]:
+        items: List[dict] = []
+        marker = None
+        while True:
+            async with semaphore or nullcontext():
+                page = await self.folder_list_page(folder_id, fields, marker=marker)
+            items.extend(page["entries"])
+            marker = page["next_marker"]
+            if not marker:
+                return items
+
+    async def _folder_list_tree(
+        self, folder_id: str, fields: List[str], semaphore: asyncio.Semaphore
+    ) -> List[dict]:
+        items = await self._folder_list_all(folder_id, fields, semaphore)
+        sub_folders = [item for item in items if item["type"] == "folder"]
+        sub_folder_contents = await asyncio.gather(
+            *(
+                self._folder_list_tree(item["id"], fields, semaphore)
+                for item in sub_folders
+            )
+        )
+        contents_by_id = {
+            folder["id"]: content
+            for folder, content in zip(sub_folders, sub_folder_contents)
+        }
+
+        # Same order as box_folder_list_content: a folder's content precedes it
+        result: List[dict] = []
+        for item in items:
+            if item["type"] == "folder":
+                result.extend(contents_by_id[item["id"]])
+            result.append(item)
+        return result
+
+    async def file_text_info(self, file_id: str) -> dict:
+        """
+        Return the file's SHA1 and representations, asking Box for its
+        extracted text representation.
+        """
+        return await self.get_json(
+            f"/files/{file_id}",
+            params={"fields": "name,sha1,representations"},
+            headers={"x-rep-hints": "[extracted_text]"},
+        )
+
+    async def file_text_extract(self, file_id: str) -> str:
+        """Return the extracted text representation of a file."""
+        return await self.extracted_text(await self.file_text_info(file_id))
+
+    async def extracted_text(self, file_info: dict) -> str:
+        """Return the extracted text of a file, from its file_text_info."""
+        entries = (file_info.get("representations") or {}).get("entries") or []
+        extracted_text_entry = next(
+            (
+                entry
+                for entry in entries
+                if entry.get("representation") == "extracted_text"
+            ),
+            None,
+        )
+        if extracted_text_entry is None:
+            return ""
+
+        # Ask Box to generate the representation if needed and wait for it
+        attempts = 0
+        while extracted_text_entry["status"]["state"] != "success":
+            if (
+                extracted_text_entry["status"]["state"] == "error"
+                or attempts >= REPRESENTATION_POLL_ATTEMPTS
+            ):
+                return ""
+            if attempts:
+                await asyncio.sleep(REPRESENTATION_POLL_INTERVAL)
+            response = await self.request("GET", extracted_text_entry["info"]["url"])
+            extracted_text_entry = {**extracted_text_entry, **response.json()}
+            attempts += 1
+
+        url = extracted_text_entry["content"]["url_template"].replace(
+            "{+asset_path}", ""
+        )
+        response = await self.request("GET", url)
+        return response.content.decode("utf-8")
@@ -0,0 +1,91 @@
+"""
+Reads behind the box://file resources.
+
+The resources let MCP clients read a file's content and extracted text a
+range at a time, and cache what they read. box://file/{file_id} describes the
+file's current version; its SHA1 changes with the content, so a client can
+keep ranges read earlier for as long as the SHA1 is the same.
+"""
+
+import json
+
+from mcp.server.fastmcp import Context
+
+from box_tools_files import read_file_text
+from box_tools_generic import call_box_api, get_box_client
+from server_context import get_max_inline_size
+
+# Fields describing the current version of a file
+FILE_VERSION_FIELDS = ["name", "size", "sha1", "file_version", "modified_at", "etag"]
+
+FILE_BYTES_URI = "box://file/{file_id}/bytes/{start}-{end}"
+FILE_TEXT_URI = "box://file/{file_id}/text"
+FILE_TEXT_RANGE_URI = "box://file/{file_id}/text/{start}-{end}"
+
+
+def _check_range(start: int, end: int) -> None:
+    if start < 0 or end <= start:
+        raise ValueError(f"Invalid range {start}-{end}: end must be after start")
+
+
+async def read_file_info(ctx: Context, file_id: str) -> str:
+    """
+    The current version of a file, and the URIs to read it by range.
+
+    return:
+        str: JSON with the file's ID, name, size, SHA1, version ID,
+             modification time and ETag, and the resource URIs.
+    """
+    box_client = get_box_client(ctx)
+    file_info = await call_box_api(
+        ctx, box_client.files.get_file_by_id, file_id, fields=FILE_VERSION_FIELDS
+    )
+    version = file_info.file_version
+    modified_at = file_info.modified_at
+    return json.dumps(
+        {
+            "id": file_id,
+            "name": file_info.name,
+            "size": file_info.size,
+            "sha1": file_info.sha1,
+            "version_id": version.id if version is not None else None,
+            "modified_at": modified_at.isoformat() if modified_at else None,
+            "etag": file_info.etag,
+            "max_range": get_max_inline_size(),
+            "bytes_uri": FILE_BYTES_URI.replace("{file_id}", file_id),
+            "text_uri": FILE_TEXT_URI.replace("{file_id}", file_id),
+            "text_range_uri": FILE_TEXT_RANGE_URI.replace("{file_id}", file_id),
+        }
+    )
+
+
+async def read_file_bytes(ctx: Context, file_id: str, start: int, end: int) -> bytes:
+    """
+    Bytes start to end (excluded) of a file's content. Only the range is
+    downloaded, with an HTTP range request.
+    """
+    _check_range(start, end)
+    max_range = get_max_inline_size()
+    if end - start > max_range:
+        raise ValueError(
+            f"Range {start}-{end} is over the {max_range} byte limit, "
+            "read it in smaller ranges"
+        )
+    box_client = get_box_client(ctx)
+    content = await call_box_api(
+        ctx,
+        box_client.downloads.download_file,
+        file_id,
+        range=f"bytes={start}-{end - 1}",
+    )
+    return await call_box_api(ctx, content.read) if content is not None else b""
+
+
+async def read_file_text_range(ctx: Context, file_id: str, start: int, end: int) -> str:
+    """
+    Characters start to end (excluded) of a file's extracted text, cut from
+    the cached text of its current version.
+    """
+    _check_range(start, end)
+    text = await read_file_text(ctx, file_id)
+    return text[start:end]
@@ -12,7 +12,7 @@ from box_ai_agents_toolkit import (
 )
 from mcp.server.fastmcp import Context
 
-from box_tools_generic import get_box_client
+from box_tools_generic import call_box_api, get_box_client
 
 
 async def box_ai_ask_file_single_tool(
@@ -31,8 +31,13 @@ async def box_ai_ask_file_single_tool(
     """
 
     box_client = get_box_client(ctx)
-    response = box_ai_ask_file_single(
-        box_client, file_id, prompt=prompt, ai_agent_id=ai_agent_id
+    response = await call_box_api(
+        ctx,
+        box_ai_ask_file_single,
+        box_client,
+        file_id,
+        prompt=prompt,
+        ai_agent_id=ai_agent_id,
     )
     return response
 
@@ -52,8 +57,13 @@ async def box_ai_ask_file_multi_tool(
         ai_agent_id (Optional[str]): The ID of the AI agent to use for processing.
     """
     box_client = get_box_client(ctx)
-    response = box_ai_ask_file_multi(
-        box_client, file_ids, prompt=prompt, ai_agent_id=ai_agent_id
+    response = await call_box_api(
+        ctx,
+        box_ai_ask_file_multi,
+        box_client,
+        file_ids,
+        prompt=prompt,
+        ai_agent_id=ai_agent_id,
     )
     return response
 
@@ -77,8 +87,8 @@ async def box_ai_ask_hub_tool(
         hubs_id = str(hubs_id)
 
     box_client = get_box_client(ctx)
-    response = box_ai_ask_hub(
-        box_client, hubs_id, prompt=prompt, ai_agent_id=ai_agent_id
+    response = await call_box_api(
+        ctx, box_ai_ask_hub, box_client, hubs_id, prompt=prompt, ai_agent_id=ai_agent_id
     )
     return response
 
@@ -101,8 +111,13 @@ async def box_ai_extract_freeform_tool(
     """
     box_client = get_box_client(ctx)
 
-    response = box_ai_extract_freeform(
-        box_client, file_ids, prompt=prompt, ai_agent_id=ai_agent_id
+    response = await call_box_api(
+        ctx,
+        box_ai_extract_freeform,
+        box_client,
+        file_ids,
+        prompt=prompt,
+        ai_agent_id=ai_agent_id,
     )
     return response
 
@@ -177,8 +192,13 @@ async def box_ai_extract_structured_using_fields_tool(
     """
     box_client = get_box_client(ctx)
 
-    response = box_ai_extract_structured_using_fields(
-        box_client, file_ids, fields, ai_agent_id=ai_agent_id
+    response = await call_box_api(
+        ctx,
+        box_ai_extract_structured_using_fields,
+        box_client,
+        file_ids,
+        fields,
+        ai_agent_id=ai_agent_id,
     )
     return response
 
@@ -203,8 +223,13 @@ async def box_ai_extract_structured_using_template_tool(
     """
     box_client = get_box_client(ctx)
 
-    response = box_ai_extract_structured_using_template(
-        box_client, file_ids, template_key, ai_agent_id=ai_agent_id
+    response = await call_box_api(
+        ctx,
+        box_ai_extract_structured_using_template,
+        box_client,
+        file_ids,
+        template_key,
+        ai_agent_id=ai_agent_id,
     )
     return response
 
@@ -228,7 +253,9 @@ async def box_ai_extract_structured_enhanced_using_fields_tool(
     """
     box_client = get_box_client(ctx)
 
-    response = box_ai_extract_structured_enhanced_using_fields(
+    response = await call_box_api(
+        ctx,
+        box_ai_extract_structured_enhanced_using_fields,
         box_client,
         file_ids,
         fields,
@@ -254,7 +281,11 @@ async def box_ai_extract_structured_enhanced_using_template_tool(
     """
     box_client = get_box_client(ctx)
 
-    response = box_ai_extract_structured_enhanced_using_template(
-        box_client, file_ids, template_key
+    response = await call_box_api(
+        ctx,
+        box_ai_extract_structured_enhanced_using_template,
+        box_client,
+        file_ids,
+        template_key,
     )
     return response
@@ -16,7 +16,7 @@ from box_ai_agents_toolkit import (
 )
 from mcp.server.fastmcp import Context
 
-from box_tools_generic import get_box_client
+from box_tools_generic import call_box_api, coalesce, get_box_client
 
 # region DocGen Templates
 
@@ -33,9 +33,10 @@ async def box_docgen_template_create_tool(ctx: Context, file_id: str) -> dict[st
         dict[str, Any]: Metadata of the created template.
     """
     box_client = get_box_client(ctx)
-    return box_docgen_template_create(box_client, file_id)
+    return await call_box_api(ctx, box_docgen_template_create, box_client, file_id)
 
 
+@coalesce
 async def box_docgen_template_list_tool(
     ctx: Context,
     marker: str | None = None,
@@ -53,9 +54,12 @@ async def box_docgen_template_list_tool(
         dict[str, Any] | list[dict[str, Any]]: A list of template metadata or an error message.
     """
     box_client = get_box_client(ctx)
-    return box_docgen_template_list(box_client, marker=marker, limit=limit)
+    return await call_box_api(
+        ctx, box_docgen_template_list, box_client, marker=marker, limit=limit
+    )
 
 
+@coalesce
 async def box_docgen_template_get_by_id_tool(
     ctx: Context, template_id: str
 ) -> dict[str, Any]:
@@ -70,9 +74,12 @@ async def box_docgen_template_get_by_id_tool(
         dict[str, Any]: Metadata of the template or an error message.
     """
     box_client = get_box_client(ctx)
-    return box_docgen_template_get_by_id(box_client, template_id)
+    return await call_box_api(
+        ctx, box_docgen_template_get_by_id, box_client, template_id
+    )
 
 
+@coalesce
 async def box_docgen_template_get_by_name_tool(
     ctx: Context, template_name: str
 ) -> dict[str, Any]:
@@ -87,7 +94,9 @@ async def box_docgen_template_get_by_name_tool(
         dict[str, Any]: Metadata of the template or an error message.
     """
     box_client = get_box_client(ctx)
-    return box_docgen_template_get_by_name(box_client, template_name)
+    return await call_box_api(
+        ctx, box_docgen_template_get_by_name, box_client, template_name
+    )
 
 
 async def box_docgen_template_delete_tool(
@@ -103,9 +112,10 @@ async def box_docgen_template_delete_tool(
         dict[str, Any]: Success message or an error message.
     """
     box_client = get_box_client(ctx)
-    return box_docgen_template_delete(box_client, template_id)
+    return await call_box_api(ctx, box_docgen_template_delete, box_client, template_id)
 
 
+@coalesce
 async def box_docgen_template_list_tags_tool(
     ctx: Context,
     template_id: str,
@@ -127,7 +137,9 @@ async def box_docgen_template_list_tags_tool(
         list[dict[str, Any]]: A list of tags for the template or an error message.
     """
     box_client = get_box_client(ctx)
-    return box_docgen_template_list_tags(
+    return await call_box_api(
+        ctx,
+        box_docgen_template_list_tags,
         box_client,
         template_id,
         template_version_id=template_version_id,
@@ -136,6 +148,7 @@ async def box_docgen_template_list_tags_tool(
     )
 
 
+@coalesce
 async def box_docgen_template_list_jobs_tool(
     ctx: Context,
     template_id: str,
@@ -155,8 +168,13 @@ async def box_docgen_template_list_jobs_tool(
         DocGenJobsV2025R0: A page of Doc Gen jobs for the template.
     """
     box_client = get_box_client(ctx)
-    return box_docgen_template_list_jobs(
-        box_client, template_id=template_id, marker=marker, limit=limit
+    return await call_box_api(
+        ctx,
+        box_docgen_template_list_jobs,
+        box_client,
+        template_id=template_id,
+        marker=marker,
+        limit=limit,
     )
 
 
@@ -210,7 +228,9 @@ async def box_docgen_create_batch_tool(
         If an error occurs, contains an "error" key with the error message.
     """
     box_client = get_box_client(ctx)
-    return box_docgen_create_batch(
+    return await call_box_api(
+        ctx,
+        box_docgen_create_batch,
         box_client,
         docgen_template_id=docgen_template_id,
         destination_folder_id=destination_folder_id,
@@ -262,7 +282,9 @@ async def box_docgen_create_single_file_from_user_input_tool(
         dict[str, Any]: Information about the created batch job.
     """
     box_client = get_box_client(ctx)
-    return box_docgen_create_single_file_from_user_input(
+    return await call_box_api(
+        ctx,
+        box_docgen_create_single_file_from_user_input,
         box_client,
         docgen_template_id=docgen_template_id,
         destination_folder_id=destination_folder_id,
@@ -272,6 +294,7 @@ async def box_docgen_create_single_file_from_user_input_tool(
     )
 
 
+@coalesce
 async def box_docgen_list_jobs_by_batch_tool(
     ctx: Context,
     batch_id: str,
@@ -291,11 +314,17 @@ async def box_docgen_list_jobs_by_batch_tool(
         list[dict[str, Any]]: A list of Doc Gen jobs in the batch.
     """
     box_client = get_box_client(ctx)
-    return box_docgen_list_jobs_by_batch(
-        box_client, batch_id=batch_id, marker=marker, limit=limit
+    return await call_box_api(
+        ctx,
+        box_docgen_list_jobs_by_batch,
+        box_client,
+        batch_id=batch_id,
+        marker=marker,
+        limit=limit,
     )
 
 
+@coalesce
 async def box_docgen_get_job_by_id_tool(ctx: Context, job_id: str) -> dict[str, Any]:
     """
     Retrieve a Box Doc Gen job by its ID.
@@ -308,9 +337,10 @@ async def box_docgen_get_job_by_id_tool(ctx: Context, job_id: str) -> dict[str,
         dict[str, Any]: Details of the specified Doc Gen job.
     """
     box_client = get_box_client(ctx)
-    return box_docgen_get_job_by_id(box_client, job_id)
+    return await call_box_api(ctx, box_docgen_get_job_by_id, box_client, job_id)
 
 
+@coalesce
 async def box_docgen_list_jobs_tool(
     ctx: Context,
     marker: str | None = None,
@@ -328,7 +358,9 @@ async def box_docgen_list_jobs_tool(
         list[dict[str, Any]]: A list of Doc Gen jobs.
     """
     box_client = get_box_client(ctx)
-    return box_docgen_list_jobs(box_client, marker=marker, limit=limit)
+    return await call_box_api(
+        ctx, box_docgen_list_jobs, box_client, marker=marker, limit=limit
+    )
 
 
 # endregion DocGen Batches and Jobs
@@ -1,35 +1,192 @@
-import base64
+import asyncio
+import mimetypes
 import os
+import time
+from typing import Any, List
 
 from box_ai_agents_toolkit import (
     DocumentFiles,
     ImageFiles,
-    box_file_download,
     box_file_text_extract,
-    box_upload_file,
 )
-from mcp.server.fastmcp import Context
+from mcp.server.fastmcp import Context, Image
+
+from box_tools_generic import (
+    call_box_api,
+    coalesce,
+    get_box_async_api,
+    get_box_client,
+    get_box_executor,
+)
+from box_transfer import (
+    CHUNKED_UPLOAD_THRESHOLD,
+    FILE_INFO_FIELDS,
+    THUMBNAIL_MAX_SIZE,
+    download_directory,
+    download_file_content,
+    download_file_to_path,
+    download_thumbnail,
+    file_sha1,
+    find_conflicting_file,
+    spool_content,
+    upload_directory,
+    upload_file_chunked,
+    upload_file_from_path,
+    upload_stream,
+)
+from server_context import (
+    get_content_cache,
+    get_max_inline_size,
+    get_text_cache,
+    get_transfer_concurrency,
+    get_upload_concurrency,
+    get_upload_state_dir,
+)
+
+
+async def read_file_text(ctx: Context, file_id: str) -> str:
+    """
+    The whole extracted text of a file, cached by file version so an
+    unchanged file is only extracted once.
+    """
+    text_cache = get_text_cache()
+    box_api = get_box_async_api(ctx)
+    if box_api is not None:
+        # The file's SHA1 comes with the representations the extraction needs
+        file_info = await box_api.file_text_info(file_id)
+        sha1 = file_info.get("sha1")
+    else:
+        box_client = get_box_client(ctx)
+        file_info = await call_box_api(
+            ctx, box_client.files.get_file_by_id, file_id, fields=["sha1"]
+        )
+        sha1 = file_info.sha1
+
+    if sha1:
+        text = await call_box_api(ctx, text_cache.get, file_id, sha1)
+        if text is not None:
+            return text
 
-from box_tools_generic import get_box_client
+    if box_api is not None:
+        text = await box_api.extracted_text(file_info)
+    else:
+        # TODO:return file object or file mini with id, name, type, description
+        text = await call_box_api(ctx, box_file_text_extract, box_client, file_id)
 
+    # Empty text may only mean the representation is not ready yet
+    if sha1 and text:
+        await call_box_api(ctx, text_cache.put, file_id, sha1, text)
+    return text
 
-async def box_read_tool(ctx: Context, file_id: str) -> str:
+
+@coalesce
+async def box_read_tool(
+    ctx: Context, file_id: str, offset: int = 0, length: int = 0
+) -> str:
     """
     Read the text content of a file in Box.
+    The text is cached by file version, so an unchanged file is only
+    extracted once. Large documents can be read a window at a time with
+    offset and length; later windows are served from the cache.
 
     Args:
         file_id (str): The ID of the file to read.
+        offset (int): Character offset where the window starts. Defaults to 0.
+        length (int): Number of characters to return. If 0, returns the rest of the text.
     return:
         str: The text content of the file.
+             When reading a window, it starts with a header line giving the
+             window's range, the total length and the offset of the next window.
     """
     # check if file id isn't a string and convert to a string
     if not isinstance(file_id, str):
         file_id = str(file_id)
 
-    box_client = get_box_client(ctx)
-    # TODO:return file object or file mini with id, name, type, description
-    response = box_file_text_extract(box_client, file_id)
-    return response
+    if offset < 0 or length < 0:
+        return "Error: offset and length must not be negative."
+
+    text = await read_file_text(ctx, file_id)
+    if not offset and not length:
+        return text
+
+    total = len(text)
+    start = min(offset, total)
+    end = min(start + length, total) if length else total
+    if end < total:
+        where_next = f"next offset {end}"
+    else:
+        where_next = "end of text"
+    return f"[Characters {start}-{end} of {total}; {where_next}]\n{text[start:end]}"
+
+
+def _truncate_utf8(text: str, max_bytes: int) -> tuple[str, bool]:
+    """Cut text to at most max_bytes of UTF-8, on a character boundary"""
+    data = text.encode("utf-8")
+    if len(data) <= max_bytes:
+        return text, False
+    return data[:max_bytes].decode("utf-8", errors="ignore"), True
+
+
+@coalesce
+async def box_read_multiple_tool(
+    ctx: Context,
+    file_ids: List[str],
+    max_bytes_per_file: int = 0,
+    max_parallel: int = 0,
+) -> List[dict]:
+    """
+    Read the text content of several files in Box at once.
+    The files are read concurrently, and a file that cannot be read is
+    reported in its result without failing the others.
+
+    Args:
+        file_ids (List[str]): The IDs of the files to read.
+        max_bytes_per_file (int): Largest number of bytes of text returned per file.
+                                  If 0, returns the whole text.
+        max_parallel (int): Files read at the same time. If 0, uses the server's setting.
+
+    return:
+        List[dict]: One result per file ID, in order, with the "file_id" and either its
+                    "text" and whether it was "truncated", or an "error".
+    """
+    if max_bytes_per_file < 0 or max_parallel < 0:
+        return [{"error": "max_bytes_per_file and max_parallel must not be negative."}]
+    file_ids = [str(file_id) for file_id in file_ids]
+    limit = asyncio.Semaphore(max_parallel or get_transfer_concurrency())
+
+    async def read(file_id: str) -> dict:
+        async with limit:
+            try:
+                text = await read_file_text(ctx, file_id)
+            except Exception as e:
+                return {"file_id": file_id, "error": str(e)}
+        truncated = False
+        if max_bytes_per_file:
+            text, truncated = _truncate_utf8(text, max_bytes_per_file)
+        return {"file_id": file_id, "text": text, "truncated": truncated}
+
+    # Each file is read once, however many times it is listed
+    unique_ids = list(dict.fromkeys(file_ids))
+    results = dict(zip(unique_ids, await asyncio.gather(*map(read, unique_ids))))
+    return [results[file_id] for file_id in file_ids]
+
+
+def _uploaded_message(result: dict, new_version: bool) -> str:
+    if new_version:
+        return (
+            "File content changed, uploaded as a new version. "
+            f"File ID: {result['id']}, Name: {result['name']}"
+        )
+    return (
+        f"File uploaded successfully. File ID: {result['id']}, Name: {result['name']}"
+    )
+
+
+def _unchanged_message(file_id: str, file_name: str) -> str:
+    return (
+        "File already in Box with the same content, upload skipped. "
+        f"File ID: {file_id}, Name: {file_name}"
+    )
 
 
 async def box_upload_file_from_path_tool(
@@ -37,14 +194,20 @@ async def box_upload_file_from_path_tool(
     file_path: str,
     folder_id: str = "0",
     new_file_name: str = "",
+    upload_session_id: str = "",
 ) -> str:
     """
     Upload a file to Box from a filesystem path.
+    Large files are uploaded in parallel parts, and an interrupted upload
+    resumes from the parts already uploaded when the tool is called again.
+    If the folder already has a file of the same name, identical content is
+    not uploaded again, and changed content is uploaded as a new version.
 
     Args:
         file_path (str): Path on the *server* filesystem to the file to upload.
         folder_id (str): The ID of the destination folder. Defaults to root ("0").
         new_file_name (str): Optional new name to give the file in Box. If empty, uses the original filename.
+        upload_session_id (str): Optional upload session of an interrupted large upload to resume.
 
     return:
         str: Information about the uploaded file (ID and name).
@@ -59,34 +222,116 @@ async def box_upload_file_from_path_tool(
 
         # Determine the file name to use
         actual_file_name = new_file_name.strip() or os.path.basename(file_path_expanded)
-        # Determine file extension to detect binary types
-        _, ext = os.path.splitext(actual_file_name)
-        binary_exts = {
-            ".docx",
-            ".pptx",
-            ".xlsx",
-            ".pdf",
-            ".jpg",
-            ".jpeg",
-            ".png",
-            ".gif",
-        }
-        # Read file content as bytes for binary types, else as text
-        if ext.lower() in binary_exts:
-            # Binary file: read raw bytes
-            with open(file_path_expanded, "rb") as f:
-                content = f.read()
+        file_size = os.path.getsize(file_path_expanded)
+
+        # Ask Box about the destination before sending any content
+        existing = await call_box_api(
+            ctx,
+            find_conflicting_file,
+            box_client,
+            folder_id,
+            actual_file_name,
+            file_size,
+        )
+        file_id = None
+        sha1 = None
+        if existing is not None:
+            # Hashed once, for the comparison and the upload
+            sha1 = await call_box_api(ctx, file_sha1, file_path_expanded)
+            if sha1 == existing["sha1"]:
+                return _unchanged_message(existing["id"], actual_file_name)
+            file_id = existing["id"]
+
+        if file_size >= CHUNKED_UPLOAD_THRESHOLD:
+            result = await call_box_api(
+                ctx,
+                upload_file_chunked,
+                box_client,
+                file_path_expanded,
+                folder_id,
+                actual_file_name,
+                concurrency=get_upload_concurrency(),
+                state_dir=get_upload_state_dir(),
+                upload_session_id=upload_session_id or None,
+                file_id=file_id,
+                sha1=sha1,
+            )
         else:
-            # Text file: read as UTF-8
-            with open(file_path_expanded, "r", encoding="utf-8") as f:
-                content = f.read()
-        # Upload using toolkit (supports str or bytes)
-        result = box_upload_file(box_client, content, actual_file_name, folder_id)
-        return f"File uploaded successfully. File ID: {result['id']}, Name: {result['name']}"
+            # Stream the bytes from disk as they are, whatever the file type
+            result = await call_box_api(
+                ctx,
+                upload_file_from_path,
+                box_client,
+                file_path_expanded,
+                actual_file_name,
+                folder_id,
+                file_id=file_id,
+                sha1=sha1,
+            )
+        return _uploaded_message(result, file_id is not None)
     except Exception as e:
         return f"Error uploading file: {str(e)}"
 
 
+def _transfer_concurrency(max_parallel: int) -> int:
+    """Files a bulk transfer handles at a time, never above the server's setting"""
+    return min(max_parallel or get_transfer_concurrency(), get_transfer_concurrency())
+
+
+async def box_upload_folder_tool(
+    ctx: Context,
+    local_path: str,
+    folder_id: str = "0",
+    max_parallel: int = 0,
+) -> dict:
+    """
+    Upload a whole directory tree to Box in one call.
+    The directory's contents are mirrored into the folder: sub-directories
+    become sub-folders, reusing folders that already exist, and files are
+    uploaded in parallel. Files already in Box with the same content are
+    skipped, and changed ones are uploaded as new versions, so an interrupted
+    upload can be resumed by calling the tool again.
+
+    Args:
+        local_path (str): Path on the *server* filesystem to the directory to upload.
+        folder_id (str): The ID of the destination folder. Defaults to root ("0").
+        max_parallel (int): Files uploaded at the same time, up to the server's setting. If 0, uses the server's setting.
+
+    return:
+        dict: Counts of folders created and reused, files uploaded, skipped
+              and failed, bytes uploaded, seconds taken, and the first errors.
+              If an error occurs, contains an "error" key with the error message.
+    """
+    box_client = get_box_client(ctx)
+
+    if not isinstance(folder_id, str):
+        folder_id = str(folder_id)
+
+    if max_parallel < 0:
+        return {"error": "max_parallel must be at least 1, or 0 for the default."}
+    local_dir = os.path.expanduser(local_path)
+    if not os.path.isdir(local_dir):
+        return {"error": f"directory '{local_path}' not found."}
+
+    started = time.monotonic()
+    try:
+        summary = await call_box_api(
+            ctx,
+            upload_directory,
+            box_client,
+            local_dir,
+            folder_id,
+            concurrency=_transfer_concurrency(max_parallel),
+            upload_concurrency=get_upload_concurrency(),
+            state_dir=get_upload_state_dir(),
+            executor=get_box_executor(ctx),
+        )
+    except Exception as e:
+        return {"error": f"Error uploading directory: {str(e)}"}
+    summary["seconds"] = round(time.monotonic() - started, 2)
+    return summary
+
+
 async def box_upload_file_from_content_tool(
     ctx: Context,
     content: str | bytes,  # Accept both string and bytes
@@ -95,7 +340,11 @@ async def box_upload_file_from_content_tool(
     is_base64: bool = False,  # New parameter to indicate if content is base64 encoded
 ) -> str:
     """
-    Upload content as a file to Box using the toolkit.
+    Upload content as a file to Box.
+    The content is decoded into a temporary buffer, which moves from memory
+    to disk as it grows, and streamed to Box from there.
+    If the folder already has a file of the same name, identical content is
+    not uploaded again, and changed content is uploaded as a new version.
 
     Args:
         content (str | bytes): The content to upload. Can be text or binary data.
@@ -106,24 +355,85 @@ async def box_upload_file_from_content_tool(
     box_client = get_box_client(ctx)
 
     try:
-        # Handle base64 encoded content
-        if is_base64 and isinstance(content, str):
-            content = base64.b64decode(content)
-
-        # Upload using toolkit
-        result = box_upload_file(box_client, content, file_name, folder_id)
-        return f"File uploaded successfully. File ID: {result['id']}, Name: {result['name']}"
+        # Decode base64 or encode text a chunk at a time, hashing on the way
+        spool, size, sha1 = await call_box_api(
+            ctx, spool_content, content, is_base64 and isinstance(content, str)
+        )
+        with spool:
+            # Ask Box about the destination before sending any content
+            existing = await call_box_api(
+                ctx, find_conflicting_file, box_client, folder_id, file_name, size
+            )
+            file_id = None
+            if existing is not None:
+                if sha1 == existing["sha1"]:
+                    return _unchanged_message(existing["id"], file_name)
+                file_id = existing["id"]
+            result = await call_box_api(
+                ctx,
+                upload_stream,
+                box_client,
+                spool,
+                file_name,
+                folder_id,
+                sha1,
+                file_id,
+            )
+        return _uploaded_message(result, file_id is not None)
     except Exception as e:
         return f"Error uploading file: {str(e)}"
 
 
+async def _download_image_preview(
+    ctx: Context,
+    file_id: str,
+    file_info: Any,
+    save_file: bool,
+    save_path: str | None,
+    max_size: int,
+) -> str | list[str | Image]:
+    """Thumbnail of an image as image content, saving the original if asked"""
+    box_client = get_box_client(ctx)
+    file_name = file_info.name
+    response = ""
+    if save_file:
+        saved = await call_box_api(
+            ctx, download_file_to_path, box_client, file_id, save_path, file_info
+        )
+        response += f"File saved to: {saved['path']}\n\n"
+    thumbnail = await call_box_api(
+        ctx, download_thumbnail, box_client, file_id, max_size
+    )
+    if thumbnail is None:
+        return (
+            f"{response}No thumbnail of {file_name} is ready yet. "
+            "Try again shortly, or set original to download the full image."
+        )
+    content, image_format = thumbnail
+    response += (
+        f"Thumbnail of {file_name}, at most {max_size} pixels a side. "
+        "Set original to download the full image."
+    )
+    return [response, Image(data=content, format=image_format)]
+
+
 async def box_download_file_tool(
-    ctx: Context, file_id: str, save_file: bool = False, save_path: str | None = None
-) -> str:
+    ctx: Context,
+    file_id: str,
+    save_file: bool = False,
+    save_path: str | None = None,
+    stream: bool = False,
+    original: bool = False,
+    max_image_size: int = THUMBNAIL_MAX_SIZE,
+) -> str | list[str | Image]:
     """
-    Download a file from Box and return its content as a string.
-    Supports text files (returns content directly) and images (returns base64-encoded).
-    Other file types will return an error message.
+    Download a file from Box and return its content.
+    Supports text files (returns content directly) and images (returns an image).
+    Images are returned as a thumbnail unless the original is asked for.
+    Other file types, and files over the maximum inline size, will return an error
+    message without being downloaded.
+    Content is cached locally by file version, so an unchanged file is only
+    downloaded once.
     Optionally saves the file locally.
 
     Args:
@@ -131,12 +441,19 @@ async def box_download_file_tool(
         save_file (bool, optional): Whether to save the file locally. Defaults to False.
         save_path (str, optional): Path where to save the file. If not provided but save_file is True,
                                   uses a temporary directory. Defaults to None.
+        stream (bool, optional): Stream the file straight to disk without returning its content,
+                                 for large files. Implies save_file. Defaults to False.
+        original (bool, optional): Return the original image instead of a thumbnail.
+                                   Defaults to False.
+        max_image_size (int, optional): Largest width and height of the thumbnail, in pixels.
+                                        Defaults to 320.
 
     return:
-        str: For text files: content as string.
-             For images: base64-encoded string with metadata.
+        str | list: For text files: content as string.
+             For images: a line describing the image, and the image itself.
              For unsupported files: error message.
              If save_file is True, includes the path where the file was saved.
+             If stream is True, only the path, size and SHA1 of the saved file.
     """
     box_client = get_box_client(ctx)
 
@@ -144,21 +461,28 @@ async def box_download_file_tool(
     if not isinstance(file_id, str):
         file_id = str(file_id)
 
+    if stream:
+        try:
+            saved = await call_box_api(
+                ctx, download_file_to_path, box_client, file_id, save_path
+            )
+            return (
+                f"File saved to: {saved['path']}\n"
+                f"Size: {saved['size']} bytes\n"
+                f"SHA1: {saved['sha1']}"
+            )
+        except Exception as e:
+            return f"Error downloading file: {str(e)}"
+
     try:
-        # Use the box_api function for downloading
-        saved_path, file_content, mime_type = box_file_download(
-            client=box_client, file_id=file_id, save_file=save_file, save_path=save_path
+        # Decide from the file info whether the content can be returned,
+        # before transferring any of it
+        file_info = await call_box_api(
+            ctx, box_client.files.get_file_by_id, file_id, fields=FILE_INFO_FIELDS
         )
-
-        # Get file info to include name in response
-        file_info = box_client.files.get_file_by_id(file_id)
         file_name = file_info.name
         file_extension = file_name.split(".")[-1].lower() if "." in file_name else ""
-
-        # Prepare response based on content type
-        response = ""
-        if saved_path:
-            response += f"File saved to: {saved_path}\n\n"
+        mime_type, _ = mimetypes.guess_type(file_name)
 
         # Check if file is a document (text-based file)
         is_document = (
@@ -174,6 +498,54 @@ async def box_download_file_tool(
             or file_extension in [e.value for e in ImageFiles]
         )
 
+        if is_image and not original:
+            # Previewed from a thumbnail, whatever the size of the original
+            return await _download_image_preview(
+                ctx, file_id, file_info, save_file, save_path, max_image_size
+            )
+
+        max_inline_size = get_max_inline_size()
+        if not (is_document or is_image):
+            reason = f"File {file_name} has unsupported type ({mime_type or 'unknown'})"
+            hint = "Only text and image files are supported for content display."
+        elif file_info.size is not None and file_info.size > max_inline_size:
+            reason = (
+                f"File {file_name} is {file_info.size} bytes, over the "
+                f"{max_inline_size} byte limit"
+            )
+            hint = "Use save_file or stream to save it locally."
+        else:
+            reason = None
+
+        if reason is not None:
+            # Not returned inline, so only downloaded to be saved, straight to disk
+            if not save_file:
+                return f"{reason}. {hint}"
+            saved = await call_box_api(
+                ctx, download_file_to_path, box_client, file_id, save_path, file_info
+            )
+            return (
+                f"File saved to: {saved['path']}\n\n"
+                f"{reason} for content display, but was saved successfully."
+            )
+
+        saved_path, file_content = await call_box_api(
+            ctx,
+            download_file_content,
+            box_client,
+            file_id,
+            file_name,
+            save_file=save_file,
+            save_path=save_path,
+            sha1=file_info.sha1,
+            cache=get_content_cache(),
+        )
+
+        # Prepare response based on content type
+        response = ""
+        if saved_path:
+            response += f"File saved to: {saved_path}\n\n"
+
         if is_document:
             # Text file - return content directly
             try:
@@ -186,18 +558,60 @@ async def box_download_file_tool(
                 response += f"File {file_name} is a document but couldn't be decoded as text. It may be in a binary format."
 
         elif is_image:
-            # Image file - return base64 encoded
-            base64_data = base64.b64encode(file_content).decode("utf-8")
-            response += f"Image downloaded successfully: {file_name}\nMIME type: {mime_type}\nBase64 encoded data:\n{base64_data}"
-
-        else:
-            # Unsupported file type for content display (but still saved if requested)
-            if not saved_path:
-                response += f"File {file_name} has unsupported type ({mime_type or 'unknown'}). Only text and image files are supported for content display."
-            else:
-                response += f"File {file_name} has unsupported type ({mime_type or 'unknown'}) for content display, but was saved successfully."
+            # Image file - return the original as image content
+            response += f"Image downloaded successfully: {file_name}"
+            image_format = mime_type.split("/")[1] if mime_type else file_extension
+            return [response, Image(data=file_content, format=image_format)]
 
         return response
 
     except Exception as e:
         return f"Error downloading file: {str(e)}"
+
+
+async def box_download_folder_tool(
+    ctx: Context,
+    folder_id: str,
+    local_path: str,
+    max_parallel: int = 0,
+) -> dict:
+    """
+    Download a whole Box folder tree to a local directory in one call.
+    Files are streamed to disk in parallel and checked against their SHA1.
+    Files already on disk with the same SHA1 are skipped, so calling the tool
+    again resumes an interrupted download.
+
+    Args:
+        folder_id (str): The ID of the Box folder to download.
+        local_path (str): Path on the *server* filesystem to the directory to download into.
+                          It is created if it does not exist.
+        max_parallel (int): Files downloaded at the same time, up to the server's setting. If 0, uses the server's setting.
+
+    return:
+        dict: Counts of folders, files downloaded, skipped and failed,
+              bytes downloaded, seconds taken, the manifest path, and the first errors.
+              If an error occurs, contains an "error" key with the error message.
+    """
+    box_client = get_box_client(ctx)
+
+    if not isinstance(folder_id, str):
+        folder_id = str(folder_id)
+
+    if max_parallel < 0:
+        return {"error": "max_parallel must be at least 1, or 0 for the default."}
+
+    started = time.monotonic()
+    try:
+        summary = await call_box_api(
+            ctx,
+            download_directory,
+            box_client,
+            folder_id,
+            os.path.expanduser(local_path),
+            concurrency=_transfer_concurrency(max_parallel),
+            executor=get_box_executor(ctx),
+        )
+    except Exception as e:
+        return {"error": f"Error downloading folder: {str(e)}"}
+    summary["seconds"] = round(time.monotonic() - started, 2)
+    return summary
@@ -1,32 +1,69 @@
-from typing import List, Union
+from typing import Any, List, Optional
 
 from box_ai_agents_toolkit import (
-    File,
-    Folder,
+    BoxClient,
     box_create_folder,
     box_delete_folder,
-    box_folder_list_content,
     box_update_folder,
 )
 from mcp.server.fastmcp import Context
 
-from box_tools_generic import get_box_client
+from box_tools_generic import call_box_api, coalesce, get_box_async_api, get_box_client
+from box_transfer import (
+    FOLDER_CONTENT_FIELDS,
+    FOLDER_ITEMS_PAGE_SIZE,
+    list_folder_items,
+    list_folder_page,
+)
+
+
+def _project(item: Any, fields: List[str]) -> dict:
+    """The ID, type and given fields of an item listed by either API"""
+    if not isinstance(item, dict):
+        item = item.to_dict()
+    return {field: item.get(field) for field in dict.fromkeys(["id", "type", *fields])}
 
 
+def _list_folder_content(
+    client: BoxClient, folder_id: str, fields: List[str]
+) -> List[Any]:
+    """Every file and folder under a folder, each folder after its content"""
+    result: List[Any] = []
+    for item in list_folder_items(client, folder_id, fields):
+        if item.type == "web_link":
+            continue
+        if item.type == "folder":
+            result.extend(_list_folder_content(client, item.id, fields))
+        result.append(item)
+    return result
+
+
+@coalesce
 async def box_list_folder_content_by_folder_id(
     ctx: Context,
     folder_id: str,
     is_recursive: bool = False,
-) -> dict:
+    limit: int = 0,
+    marker: str = "",
+    fields: Optional[List[str]] = None,
+) -> dict | list:
     """
     List the content of a folder in Box by its ID.
 
+    Large folders should be listed a page at a time: pass a limit, then the
+    returned "next_marker" as the marker of the next call, until it is null.
+
     Args:
         folder_id (str): The ID of the folder to list the content of.
-        is_recursive (bool): Whether to list the content recursively.
+        is_recursive (bool): Whether to list the content recursively. Recursive listings are not paginated.
+        limit (int): Maximum number of items in a page, up to 1000. 0 lists every item.
+        marker (str): The "next_marker" of the previous page, empty for the first page.
+        fields (List[str], optional): The Box fields of each item to return, besides its "id" and "type". Defaults to "name" and "description".
 
     return:
-        dict: The content of the folder in a json string format, including the "id", "name", "type", and "description".
+        list | dict: The items of the folder, each with its "id", "type" and requested fields.
+                     When paginated, a dict with the page's "entries" and the "next_marker".
+                     If an error occurs, a dict with an "error" key and the error message.
     """
     box_client = get_box_client(ctx)
 
@@ -34,22 +71,58 @@ async def box_list_folder_content_by_folder_id(
     if not isinstance(folder_id, str):
         folder_id = str(folder_id)
 
-    response: List[Union[File, Folder]] = box_folder_list_content(
-        box_client, folder_id, is_recursive
-    )
-
-    # Convert the response to a json string
-    response = [
-        {
-            "id": item.id,
-            "name": item.name,
-            "type": item.type,
-            "description": item.description if hasattr(item, "description") else None,
+    if limit < 0:
+        return {"error": "limit must not be negative."}
+    paginated = limit > 0 or bool(marker)
+    if paginated and is_recursive:
+        return {"error": "Recursive listings cannot be paginated."}
+    fields = list(fields) if fields else FOLDER_CONTENT_FIELDS
+    # Box only sends the requested fields, and always the ID and type
+    query_fields = list(dict.fromkeys(["type", *fields]))
+    page_size = min(limit, FOLDER_ITEMS_PAGE_SIZE) or FOLDER_ITEMS_PAGE_SIZE
+
+    box_api = get_box_async_api(ctx)
+    if box_api is not None:
+        if paginated:
+            page = await box_api.folder_list_page(
+                folder_id, query_fields, page_size, marker or None
+            )
+            return {
+                "entries": [_project(item, fields) for item in page["entries"]],
+                "next_marker": page["next_marker"],
+            }
+        items = await box_api.folder_list_content(folder_id, is_recursive, query_fields)
+        return [_project(item, fields) for item in items]
+
+    if paginated:
+        entries, next_marker = await call_box_api(
+            ctx,
+            list_folder_page,
+            box_client,
+            folder_id,
+            query_fields,
+            page_size,
+            marker or None,
+        )
+        return {
+            "entries": [
+                _project(item, fields) for item in entries if item.type != "web_link"
+            ],
+            "next_marker": next_marker,
         }
-        for item in response
-    ]
-    return response
-    # return json.dumps(response)
+    if is_recursive:
+        items = await call_box_api(
+            ctx, _list_folder_content, box_client, folder_id, query_fields
+        )
+    else:
+        items = [
+            item
+            for item in await call_box_api(
+                ctx, list_folder_items, box_client, folder_id, query_fields
+            )
+            if item.type != "web_link"
+        ]
+    return [_project(item, fields) for item in items]
 
 
 async def box_manage_folder_tool(
@@ -100,8 +173,12 @@ async def box_manage_folder_tool(
             # Default to root folder ("0") if no parent_id provided
             parent_id_str = parent_id or "0"
 
-            new_folder = box_create_folder(
-                client=box_client, name=name, parent_id=parent_id_str
+            new_folder = await call_box_api(
+                ctx,
+                box_create_folder,
+                client=box_client,
+                name=name,
+                parent_id=parent_id_str,
             )
             return f"Folder created successfully. Folder ID: {new_folder.id}, Name: {new_folder.name}"
         except Exception as e:
@@ -113,8 +190,12 @@ async def box_manage_folder_tool(
             return "Error: folder_id is required for delete action"
 
         try:
-            box_delete_folder(
-                client=box_client, folder_id=folder_id, recursive=recursive
+            await call_box_api(
+                ctx,
+                box_delete_folder,
+                client=box_client,
+                folder_id=folder_id,
+                recursive=recursive,
             )
             return f"Folder with ID {folder_id} deleted successfully"
         except Exception as e:
@@ -126,7 +207,9 @@ async def box_manage_folder_tool(
             return "Error: folder_id is required for update action"
 
         try:
-            updated_folder = box_update_folder(
+            updated_folder = await call_box_api(
+                ctx,
+                box_update_folder,
                 client=box_client,
                 folder_id=folder_id,
                 name=name,
@@ -1,19 +1,155 @@
-from typing import cast
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar, cast
 
-from box_ai_agents_toolkit import BoxClient, get_ccg_client
+import httpx
+from box_ai_agents_toolkit import BoxClient
 from mcp.server.fastmcp import Context
 
-from server_context import BoxContext
+from box_api_async import BoxAsyncAPI
+from server_context import USER_ID_HEADER, BoxContext, UserClientPool, get_executor
+
+T = TypeVar("T")
+
+
+def get_request_user_id(ctx: Context) -> str | None:
+    """Helper function to get the Box user id sent with the HTTP request, if any"""
+    request = getattr(ctx.request_context, "request", None)
+    headers = getattr(request, "headers", None)
+    if headers is None:
+        return None
+    user_id = headers.get(USER_ID_HEADER)
+    return user_id if isinstance(user_id, str) and user_id else None
 
 
 def get_box_client(ctx: Context) -> BoxClient:
-    """Helper function to get Box client from context"""
-    client = cast(BoxContext, ctx.request_context.lifespan_context).client
+    """
+    Helper function to get Box client from context.
+    Requests carrying a user id get that user's client from the pool when
+    per-user clients are enabled; all others use the shared client.
+    """
+    box_context = cast(BoxContext, ctx.request_context.lifespan_context)
+    client = box_context.client
     if client is None:
         raise RuntimeError("Box client is not initialized in the context.")
+    user_clients = getattr(box_context, "user_clients", None)
+    if isinstance(user_clients, UserClientPool):
+        user_id = get_request_user_id(ctx)
+        if user_id is not None:
+            return user_clients.get(user_id)
     return client
 
 
+def get_box_executor(ctx: Context) -> Executor:
+    """Helper function to get the executor for blocking Box calls from context"""
+    executor = getattr(ctx.request_context.lifespan_context, "executor", None)
+    if isinstance(executor, Executor):
+        return executor
+    # Contexts not built by box_lifespan fall back to the shared pool
+    return get_executor()
+
+
+def get_box_async_api(ctx: Context) -> BoxAsyncAPI | None:
+    """
+    Helper function to get the native async Box API from context.
+    Returns None when the context has no async HTTP client, in which case
+    tools fall back to the sync toolkit.
+    """
+    http_client = getattr(ctx.request_context.lifespan_context, "http_client", None)
+    if not isinstance(http_client, httpx.AsyncClient):
+        return None
+    return BoxAsyncAPI(get_box_client(ctx), http_client)
+
+
+async def call_box_api(
+    ctx: Context, func: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """
+    Run a blocking Box API call on the executor so it does not stall the event loop.
+
+    Args:
+        ctx (Context): The context object containing the request and lifespan context.
+        func (Callable): The synchronous toolkit or SDK function to call.
+        *args, **kwargs: Arguments passed through to func.
+    return:
+        The value returned by func.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    return await loop.run_in_executor(
+        get_box_executor(ctx), contextvars.copy_context().run, call
+    )
+
+
+class CallCoalescer:
+    """
+    Shares one in-flight call among concurrent identical calls.
+
+    The first call for a key runs; calls with the same key that arrive while
+    it is in flight await its result (or exception) instead of repeating the
+    Box request. Results are not cached once the call completes.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        # Tasks are bound to their loop, so never share them across loops
+        key = (asyncio.get_running_loop(), key)
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(call())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # A cancelled caller must not cancel the call the others are waiting on
+        return await asyncio.shield(task)
+
+
+coalescer = CallCoalescer()
+
+
+def coalesce(tool: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """
+    Coalesce concurrent identical calls of a read-only tool.
+    Calls are identical when the tool, the requesting user and the arguments,
+    with defaults applied, are the same.
+    """
+    signature = inspect.signature(tool)
+
+    @functools.wraps(tool)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        ctx = arguments.pop("ctx")
+        key = (
+            tool.__module__,
+            tool.__name__,
+            get_request_user_id(ctx),
+            json.dumps(arguments, sort_keys=True, default=str),
+        )
+        return await coalescer.run(key, lambda: tool(*args, **kwargs))
+
+    return wrapper
+
+
+@coalesce
 async def box_who_am_i(ctx: Context) -> dict:
     """
     Get the current user's information.
@@ -22,12 +158,17 @@ async def box_who_am_i(ctx: Context) -> dict:
     return:
         dict: The current user's information.
     """
+    box_api = get_box_async_api(ctx)
+    if box_api is not None:
+        return await box_api.get_user_me()
+
     box_client = get_box_client(ctx)
-    return box_client.users.get_user_me().to_dict()
+    current_user = await call_box_api(ctx, box_client.users.get_user_me)
+    return current_user.to_dict()
     # return f"Authenticated as: {current_user.name}"
 
 
-async def box_authorize_app_tool() -> str:
+async def box_authorize_app_tool(ctx: Context) -> str:
     """
     Authorize the Box application.
     Start the Box app authorization process
@@ -35,7 +176,11 @@ async def box_authorize_app_tool() -> str:
     return:
         str: Message
     """
-    result = get_ccg_client()
+    token_manager = cast(BoxContext, ctx.request_context.lifespan_context).token_manager
+    if token_manager is None:
+        return "Box application not authorized"
+
+    result = await call_box_api(ctx, token_manager.revalidate)
     if result:
         return "Box application authorized successfully"
     else:
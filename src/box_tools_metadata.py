@@ -11,7 +11,7 @@ from box_ai_agents_toolkit import (
 )
 from mcp.server.fastmcp import Context
 
-from box_tools_generic import get_box_client
+from box_tools_generic import call_box_api, coalesce, get_box_client
 
 
 async def box_metadata_template_create_tool(
@@ -71,11 +71,17 @@ async def box_metadata_template_create_tool(
         dict: The created metadata template.
     """
     box_client = get_box_client(ctx)
-    return box_metadata_template_create(
-        box_client, display_name, fields, template_key=template_key
+    return await call_box_api(
+        ctx,
+        box_metadata_template_create,
+        box_client,
+        display_name,
+        fields,
+        template_key=template_key,
     )
 
 
+@coalesce
 async def box_metadata_template_get_by_key_tool(
     ctx: Context, template_name: str
 ) -> dict:
@@ -90,9 +96,12 @@ async def box_metadata_template_get_by_key_tool(
         dict: The metadata template associated with the provided key.
     """
     box_client = get_box_client(ctx)
-    return box_metadata_template_get_by_key(box_client, template_name)
+    return await call_box_api(
+        ctx, box_metadata_template_get_by_key, box_client, template_name
+    )
 
 
+@coalesce
 async def box_metadata_template_get_by_name_tool(
     ctx: Context, template_name: str
 ) -> dict:
@@ -107,7 +116,9 @@ async def box_metadata_template_get_by_name_tool(
         dict: The metadata template associated with the provided name.
     """
     box_client = get_box_client(ctx)
-    return box_metadata_template_get_by_name(box_client, template_name)
+    return await call_box_api(
+        ctx, box_metadata_template_get_by_name, box_client, template_name
+    )
 
 
 async def box_metadata_set_instance_on_file_tool(
@@ -131,11 +142,17 @@ async def box_metadata_set_instance_on_file_tool(
         dict: The response from the Box API after setting the metadata.
     """
     box_client = get_box_client(ctx)
-    return box_metadata_set_instance_on_file(
-        box_client, template_key, file_id, metadata
+    return await call_box_api(
+        ctx,
+        box_metadata_set_instance_on_file,
+        box_client,
+        template_key,
+        file_id,
+        metadata,
     )
 
 
+@coalesce
 async def box_metadata_get_instance_on_file_tool(
     ctx: Context,
     file_id: str,
@@ -153,7 +170,9 @@ async def box_metadata_get_instance_on_file_tool(
         dict: The metadata instance associated with the file.
     """
     box_client = get_box_client(ctx)
-    return box_metadata_get_instance_on_file(box_client, file_id, template_key)
+    return await call_box_api(
+        ctx, box_metadata_get_instance_on_file, box_client, file_id, template_key
+    )
 
 
 async def box_metadata_update_instance_on_file_tool(
@@ -177,7 +196,9 @@ async def box_metadata_update_instance_on_file_tool(
         dict: The response from the Box API after updating the metadata.
     """
     box_client = get_box_client(ctx)
-    return box_metadata_update_instance_on_file(
+    return await call_box_api(
+        ctx,
+        box_metadata_update_instance_on_file,
         box_client,
         file_id,
         template_key,
@@ -203,4 +224,6 @@ async def box_metadata_delete_instance_on_file_tool(
         dict: The response from the Box API after deleting the metadata.
     """
     box_client = get_box_client(ctx)
-    return box_metadata_delete_instance_on_file(box_client, file_id, template_key)
+    return await call_box_api(
+        ctx, box_metadata_delete_instance_on_file, box_client, file_id, template_key
+    )
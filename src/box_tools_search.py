@@ -7,9 +7,10 @@ from box_ai_agents_toolkit import (
 )
 from mcp.server.fastmcp import Context
 
-from box_tools_generic import get_box_client
+from box_tools_generic import call_box_api, coalesce, get_box_async_api, get_box_client
 
 
+@coalesce
 async def box_search_tool(
     ctx: Context,
     query: str,
@@ -41,14 +42,27 @@ async def box_search_tool(
         for content_type in where_to_look_for_query:
             content_types.append(SearchForContentContentTypes[content_type])
 
+    box_api = get_box_async_api(ctx)
+    if box_api is not None:
+        return await box_api.search(
+            query, file_extensions, content_types, ancestor_folder_ids
+        )
+
     # Search for files with the query
-    search_results = box_search(
-        box_client, query, file_extensions, content_types, ancestor_folder_ids
+    search_results = await call_box_api(
+        ctx,
+        box_search,
+        box_client,
+        query,
+        file_extensions,
+        content_types,
+        ancestor_folder_ids,
     )
 
     return [search_result.to_dict() for search_result in search_results]
 
 
+@coalesce
 async def box_search_folder_by_name_tool(ctx: Context, folder_name: str) -> List[dict]:
     """
     Locate a folder in Box by its name.
@@ -59,5 +73,7 @@ async def box_search_folder_by_name_tool(ctx: Context, folder_name: str) -> List
         List[dict]: The folder ID.
     """
     box_client = get_box_client(ctx)
-    search_results = box_locate_folder_by_name(box_client, folder_name)
+    search_results = await call_box_api(
+        ctx, box_locate_folder_by_name, box_client, folder_name
+    )
     return [search_result.to_dict() for search_result in search_results]
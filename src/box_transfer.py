@@ -0,0 +1,1063 @@
+"""
+Streaming transfers of file content between Box and the local filesystem.
+
+Content is copied in chunks straight between the network and the file, so
+memory stays flat whatever the size of the file. Its SHA1 is computed on the
+way through and checked against the one Box holds.
+
+Large files are uploaded in parts through a Box upload session. Parts are sent
+in parallel, and the session is recorded on disk so that an interrupted upload
+resumes with the parts Box already has.
+
+Whole directory trees are mirrored into Box, and whole Box folders to disk, with
+one call, transferring many files at a time on the shared executor.
+"""
+
+import base64
+import functools
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import ExitStack, suppress
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from box_ai_agents_toolkit import BoxClient, box_create_folder
+from box_sdk_gen import (
+    BoxAPIError,
+    GetFileThumbnailByIdExtension,
+    PreflightFileUploadCheckParent,
+    UploadFileAttributes,
+    UploadFileAttributesParentField,
+    UploadFileVersionAttributes,
+    UploadPart,
+    UploadSession,
+)
+
+if TYPE_CHECKING:
+    from content_cache import ContentCache
+
+# Fields needed to name, size and verify a download, to decide whether a file
+# can be returned inline, and whether a cached copy is current
+FILE_INFO_FIELDS = ["name", "size", "sha1"]
+# Files this large go through upload sessions (the smallest size Box accepts)
+CHUNKED_UPLOAD_THRESHOLD = 20 * 1024 * 1024
+# Page size when listing the parts of an upload session (Box maximum)
+UPLOAD_PARTS_PAGE_SIZE = 1000
+# Size of the reads that hash a local file
+HASH_CHUNK_SIZE = 1024 * 1024
+# Page size when listing the items of a folder (Box maximum)
+FOLDER_ITEMS_PAGE_SIZE = 1000
+# Fields of each listed item, besides its ID and type, unless others are asked for
+FOLDER_CONTENT_FIELDS = ["name", "description"]
+# Content uploads are buffered in memory up to this size, then on disk
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+# Characters of content uploads decoded or encoded at a time (a multiple of 4)
+SPOOL_CHUNK_SIZE = 1024 * 1024
+# Failures listed in the summary of a directory transfer
+SUMMARY_MAX_ERRORS = 10
+# Default largest side of an image preview, in pixels
+THUMBNAIL_MAX_SIZE = 320
+# Box makes JPG thumbnails of 32 to 320 pixels, and PNG ones of 1024 and 2048
+THUMBNAIL_MIN_SIZE = 32
+THUMBNAIL_PNG_MIN_SIZE = 1024
+# Fields needed to mirror a folder's items to disk
+FOLDER_DOWNLOAD_FIELDS = ["name", "type", "size", "sha1"]
+# Record of the files a folder download has completed, in its local directory
+DOWNLOAD_MANIFEST_NAME = ".box-download.json"
+# Seconds between saves of the manifest while a folder download runs
+MANIFEST_SAVE_INTERVAL = 1.0
+
+
+class BoundedTasks:
+    """
+    Tasks run on a shared executor, at most `limit` of them at a time.
+
+    The submitting thread is usually a worker of the same executor. While it
+    waits for a slot or a result, it takes back a task no worker has started
+    and runs it itself, so the tasks finish even when every worker is busy.
+    """
+
+    def __init__(self, executor: Executor, limit: int):
+        self.executor = executor
+        self.limit = limit
+        self._queued: Dict[Future, Tuple[Future, Callable[[], None]]] = {}
+        self._finished: Deque[Future] = deque()
+
+    @staticmethod
+    def _run(result: Future, fn: Callable[..., Any], args: tuple) -> None:
+        try:
+            result.set_result(fn(*args))
+        except BaseException as e:
+            result.set_exception(e)
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Queue a task, first waiting for a slot if `limit` are in flight"""
+        while len(self._queued) >= self.limit:
+            self._wait()
+        result: Future = Future()
+        run = functools.partial(self._run, result, fn, args)
+        self._queued[result] = (self.executor.submit(run), run)
+        return result
+
+    def _collect(self) -> None:
+        for result in [result for result in self._queued if result.done()]:
+            del self._queued[result]
+            self._finished.append(result)
+
+    def _wait(self) -> None:
+        """Run a task no worker has started, or else wait for one to finish"""
+        for job, run in self._queued.values():
+            if job.cancel():
+                run()
+                break
+        else:
+            wait(list(self._queued), return_when=FIRST_COMPLETED)
+        self._collect()
+
+    def finished(self) -> List[Future]:
+        """The futures of the tasks finished since the last call, without waiting"""
+        self._collect()
+        finished = list(self._finished)
+        self._finished.clear()
+        return finished
+
+    def as_completed(self) -> Iterator[Future]:
+        """The future of each submitted task, as it finishes"""
+        while self._queued or self._finished:
+            if not self._finished:
+                self._wait()
+            while self._finished:
+                yield self._finished.popleft()
+
+
+class HashingWriter:
+    """Output stream that hashes and counts the bytes written to a file"""
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.sha1 = hashlib.sha1()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.sha1.update(data)
+        self.size += len(data)
+        return self.file.write(data)
+
+
+def resolve_save_path(save_path: Optional[str], file_name: str) -> str:
+    """
+    Where to save a download, as box_file_download does: the given file path,
+    the file's name in the given directory, or the file's name in the
+    temporary directory.
+    """
+    if not save_path:
+        return os.path.join(tempfile.gettempdir(), file_name)
+    if os.path.isdir(save_path):
+        return os.path.join(save_path, file_name)
+    return save_path
+
+
+def stream_file_to_path(
+    client: BoxClient, file_id: str, path: str, expected_sha1: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Stream a file's content to a partial file next to the path, which only
+    replaces the path once its SHA1 matches the expected one.
+
+    Returns:
+        dict: The path, size and SHA1 of the saved file.
+    """
+    partial_path = f"{path}.part"
+    try:
+        with open(partial_path, "wb") as f:
+            writer = HashingWriter(f)
+            client.downloads.download_file_to_output_stream(file_id, writer)
+        sha1 = writer.sha1.hexdigest()
+        if expected_sha1 and sha1 != expected_sha1:
+            raise ValueError(
+                f"SHA1 mismatch for file {file_id}: "
+                f"expected {expected_sha1}, downloaded {sha1}"
+            )
+        os.replace(partial_path, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(partial_path)
+        raise
+    return {"path": path, "size": writer.size, "sha1": sha1}
+
+
+def download_file_to_path(
+    client: BoxClient,
+    file_id: str,
+    save_path: Optional[str] = None,
+    file_info: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """
+    Stream a file from Box to disk, verifying its SHA1.
+
+    The content is written to a partial file next to the destination, which
+    only replaces the destination once its SHA1 matches the one Box holds.
+    The file's name and SHA1 are read from the given file info, with at least
+    FILE_INFO_FIELDS, or fetched when there is none.
+
+    Returns:
+        dict: The path, size and SHA1 of the saved file.
+    """
+    if file_info is None:
+        file_info = client.files.get_file_by_id(file_id, fields=FILE_INFO_FIELDS)
+    path = resolve_save_path(save_path, file_info.name)
+    return stream_file_to_path(client, file_id, path, file_info.sha1)
+
+
+def download_file_content(
+    client: BoxClient,
+    file_id: str,
+    file_name: str,
+    save_file: bool = False,
+    save_path: Optional[str] = None,
+    sha1: Optional[str] = None,
+    cache: Optional["ContentCache"] = None,
+) -> Tuple[Optional[str], bytes]:
+    """
+    Download a file into memory, for content returned inline.
+    Optionally saves it as well, see resolve_save_path.
+    Given the SHA1 of the file's current version and a cache, the content is
+    served from the cache when it holds that version.
+
+    Returns:
+        tuple: The path the file was saved to, or None, and its content.
+    """
+    if cache is not None and sha1:
+        with cache.open_content(client, file_id, sha1) as f:
+            content = f.read()
+    else:
+        content = client.downloads.download_file(file_id).read()
+    saved_path = None
+    if save_file:
+        saved_path = resolve_save_path(save_path, file_name)
+        with open(saved_path, "wb") as f:
+            f.write(content)
+    return saved_path, content
+
+
+def download_thumbnail(
+    client: BoxClient, file_id: str, max_size: int = THUMBNAIL_MAX_SIZE
+) -> Optional[Tuple[bytes, str]]:
+    """
+    Download the largest thumbnail of an image that fits in max_size pixels
+    on each side. Thumbnails of 1024 pixels and up are PNG, smaller ones JPEG.
+
+    Returns:
+        tuple: The thumbnail's content and image format, or None if Box has
+               no thumbnail ready yet.
+    """
+    max_size = max(max_size, THUMBNAIL_MIN_SIZE)
+    if max_size >= THUMBNAIL_PNG_MIN_SIZE:
+        extension, image_format = GetFileThumbnailByIdExtension.PNG, "png"
+    else:
+        extension, image_format = GetFileThumbnailByIdExtension.JPG, "jpeg"
+    content = client.files.get_file_thumbnail_by_id(
+        file_id, extension, max_width=max_size, max_height=max_size
+    )
+    if content is None:
+        return None
+    return content.read(), image_format
+
+
+def file_sha1(file_path: str) -> str:
+    """SHA1 of a local file, read in chunks"""
+    sha1 = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def _conflict(error: BoxAPIError, item_type: str) -> Optional[Dict[str, Any]]:
+    """The item of a type that made a request fail with 409, if any"""
+    if error.response_info.status_code != 409:
+        return None
+    conflicts = (error.response_info.context_info or {}).get("conflicts") or []
+    if isinstance(conflicts, dict):
+        conflicts = [conflicts]
+    for conflict in conflicts:
+        if conflict.get("type") == item_type:
+            return conflict
+    return None
+
+
+def find_conflicting_file(
+    client: BoxClient, folder_id: str, file_name: str, file_size: int
+) -> Optional[Dict[str, Any]]:
+    """
+    Check with Box whether a file can be uploaded, without sending it.
+
+    Returns:
+        dict: The ID and SHA1 of the file of the same name already in the
+              folder, or None if there is none.
+    """
+    try:
+        client.uploads.preflight_file_upload_check(
+            name=file_name,
+            size=file_size,
+            parent=PreflightFileUploadCheckParent(id=folder_id),
+        )
+    except BoxAPIError as e:
+        conflict = _conflict(e, "file")
+        if conflict is None:
+            raise
+        sha1 = conflict.get("sha1")
+        if sha1 is None:
+            sha1 = client.files.get_file_by_id(conflict["id"], fields=["sha1"]).sha1
+        return {"id": conflict["id"], "sha1": sha1}
+    return None
+
+
+def upload_stream(
+    client: BoxClient,
+    stream: BinaryIO,
+    file_name: str,
+    folder_id: str,
+    sha1: str,
+    file_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Upload content in a single request, streaming it from a file object.
+    Box checks the bytes against their SHA1. Given a file ID, they are
+    uploaded as a new version of that file.
+
+    Returns:
+        dict: The ID, name and type of the uploaded file, as box_upload_file.
+    """
+    if file_id is not None:
+        files = client.uploads.upload_file_version(
+            file_id,
+            UploadFileVersionAttributes(name=file_name),
+            stream,
+            content_md_5=sha1,
+        )
+    else:
+        files = client.uploads.upload_file(
+            UploadFileAttributes(
+                name=file_name, parent=UploadFileAttributesParentField(id=folder_id)
+            ),
+            stream,
+            content_md_5=sha1,
+        )
+    entry = files.entries[0]
+    return {"id": entry.id, "name": entry.name, "type": entry.type}
+
+
+def upload_file_from_path(
+    client: BoxClient,
+    file_path: str,
+    file_name: str,
+    folder_id: str,
+    file_id: Optional[str] = None,
+    sha1: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Upload a file in a single request, streaming its bytes from disk.
+    The bytes are sent as they are, whatever the file type. See upload_stream.
+    The file is only hashed when its SHA1 is not given.
+
+    Returns:
+        dict: The ID, name and type of the uploaded file, as box_upload_file.
+    """
+    if sha1 is None:
+        sha1 = file_sha1(file_path)
+    with open(file_path, "rb") as f:
+        return upload_stream(client, f, file_name, folder_id, sha1, file_id)
+
+
+def _base64_alphabet_filter() -> bytes:
+    """Bytes that are not base64, for bytes.translate to delete"""
+    alphabet = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+    return bytes(b for b in range(256) if b not in alphabet)
+
+
+_NOT_BASE64 = _base64_alphabet_filter()
+
+
+def spool_content(
+    content: str | bytes, is_base64: bool = False
+) -> Tuple[BinaryIO, int, str]:
+    """
+    Copy content to upload into a temporary file, in chunks, hashing it on
+    the way. Base64 is decoded a chunk at a time and text encoded as UTF-8.
+    The file stays in memory up to SPOOL_MAX_MEMORY bytes and then moves to
+    disk, so the decoded content is never held in memory alongside the
+    original.
+
+    Returns:
+        tuple: The file, positioned at its start, its size and its SHA1.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    sha1 = hashlib.sha1()
+    pending = b""
+    try:
+        for start in range(0, len(content), SPOOL_CHUNK_SIZE):
+            chunk = content[start : start + SPOOL_CHUNK_SIZE]
+            if isinstance(chunk, str):
+                chunk = chunk.encode("ascii" if is_base64 else "utf-8")
+            if is_base64:
+                # Whitespace and other characters are skipped, as b64decode
+                # does, so whole groups of 4 are decoded at a time
+                pending += chunk.translate(None, _NOT_BASE64)
+                whole = len(pending) - len(pending) % 4
+                chunk, pending = base64.b64decode(pending[:whole]), pending[whole:]
+            sha1.update(chunk)
+            spool.write(chunk)
+        if pending:
+            # Raises like b64decode on incorrect padding
+            chunk = base64.b64decode(pending)
+            sha1.update(chunk)
+            spool.write(chunk)
+        size = spool.tell()
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool, size, sha1.hexdigest()
+
+
+class ChunkedUploadError(Exception):
+    """A chunked upload failed; it can be resumed with its upload session"""
+
+    def __init__(self, upload_session_id: str, error: Exception):
+        super().__init__(f"{error} (resume with upload_session_id={upload_session_id})")
+        self.upload_session_id = upload_session_id
+
+
+def sha1_digest(sha1: bytes) -> str:
+    """RFC 3230 digest header of a SHA1, as Box expects it"""
+    return f"sha={base64.b64encode(sha1).decode('ascii')}"
+
+
+def _upload_state_path(state_dir: str, file_path: str) -> str:
+    key = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()
+    return os.path.join(state_dir, f"{key}.json")
+
+
+def _upload_state(
+    file_path: str, folder_id: str, file_name: str, file_id: Optional[str] = None
+) -> Dict[str, Any]:
+    stat = os.stat(file_path)
+    state = {
+        "folder_id": folder_id,
+        "file_name": file_name,
+        "file_size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+    if file_id is not None:
+        state["file_id"] = file_id
+    return state
+
+
+def _load_upload_session_id(state_path: str, state: Dict[str, Any]) -> Optional[str]:
+    """Session recorded for the same file, destination and file version"""
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            recorded = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    session_id = recorded.pop("upload_session_id", None)
+    return session_id if recorded == state else None
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    """Replace a JSON file atomically, so a crash never leaves it truncated"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _save_upload_session_id(state_path: str, state: Dict[str, Any]) -> None:
+    _write_json(state_path, state)
+
+
+def list_upload_session_parts(
+    client: BoxClient, upload_session_id: str
+) -> List[UploadPart]:
+    """Every part already uploaded to an upload session"""
+    parts: List[UploadPart] = []
+    while True:
+        page = client.chunked_uploads.get_file_upload_session_parts(
+            upload_session_id, offset=len(parts), limit=UPLOAD_PARTS_PAGE_SIZE
+        )
+        parts.extend(page.entries or [])
+        if not page.entries or len(parts) >= (page.total_count or 0):
+            return parts
+
+
+def upload_part(
+    client: BoxClient, upload_session_id: str, data: bytes, offset: int, file_size: int
+) -> UploadPart:
+    """Upload one part with its SHA1 digest, checking Box received it intact"""
+    sha1 = hashlib.sha1(data)
+    uploaded = client.chunked_uploads.upload_file_part(
+        upload_session_id,
+        io.BytesIO(data),
+        sha1_digest(sha1.digest()),
+        f"bytes {offset}-{offset + len(data) - 1}/{file_size}",
+    )
+    if uploaded.part.sha_1 != sha1.hexdigest():
+        raise ValueError(f"SHA1 mismatch for the part at offset {offset}")
+    return uploaded.part
+
+
+def _open_upload_session(
+    client: BoxClient,
+    state_path: str,
+    state: Dict[str, Any],
+    upload_session_id: Optional[str],
+) -> UploadSession:
+    """
+    Resume the given or recorded upload session, or start a new one.
+    A recorded session that Box no longer knows is replaced.
+    """
+    recorded_id = upload_session_id or _load_upload_session_id(state_path, state)
+    if recorded_id:
+        try:
+            return client.chunked_uploads.get_file_upload_session_by_id(recorded_id)
+        except BoxAPIError:
+            if upload_session_id:
+                raise
+    if "file_id" in state:
+        session = client.chunked_uploads.create_file_upload_session_for_existing_file(
+            state["file_id"], state["file_size"], file_name=state["file_name"]
+        )
+    else:
+        session = client.chunked_uploads.create_file_upload_session(
+            state["folder_id"], state["file_size"], state["file_name"]
+        )
+    _save_upload_session_id(state_path, {**state, "upload_session_id": session.id})
+    return session
+
+
+def upload_file_chunked(
+    client: BoxClient,
+    file_path: str,
+    folder_id: str,
+    file_name: str,
+    concurrency: int,
+    state_dir: str,
+    upload_session_id: Optional[str] = None,
+    file_id: Optional[str] = None,
+    executor: Optional[Executor] = None,
+    sha1: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Upload a large file in parts through a Box upload session.
+    Given a file ID, the file is uploaded as a new version of that file.
+
+    The file is read once, in order, hashing it for the whole-file SHA1 unless
+    that is given, and each part is sent with its own SHA1 digest,
+    `concurrency` at a time, so at most that many parts are held in memory.
+    Parts are sent on the given executor, or on a pool of their own without
+    one. Parts Box already has for the session, from an interrupted attempt,
+    are verified and not sent again.
+
+    Returns:
+        dict: The uploaded file's ID, name, size and SHA1, the upload session,
+        and how many parts were uploaded and resumed.
+    """
+    state = _upload_state(file_path, folder_id, file_name, file_id)
+    state_path = _upload_state_path(state_dir, file_path)
+    file_size = state["file_size"]
+    session = _open_upload_session(client, state_path, state, upload_session_id)
+    try:
+        uploaded = {
+            part.offset: part for part in list_upload_session_parts(client, session.id)
+        }
+        whole_sha1 = hashlib.sha1() if sha1 is None else None
+        parts: List[UploadPart] = []
+        futures: List[Future] = []
+        with open(file_path, "rb") as f, ExitStack() as stack:
+            if executor is None:
+                executor = stack.enter_context(
+                    ThreadPoolExecutor(concurrency, thread_name_prefix="box-upload")
+                )
+            tasks = BoundedTasks(executor, concurrency)
+            for offset in range(0, file_size, session.part_size):
+                data = f.read(session.part_size)
+                if whole_sha1 is not None:
+                    whole_sha1.update(data)
+                part = uploaded.get(offset)
+                if part is not None and part.sha_1 == hashlib.sha1(data).hexdigest():
+                    parts.append(part)
+                    continue
+                futures.append(
+                    tasks.submit(
+                        upload_part, client, session.id, data, offset, file_size
+                    )
+                )
+                # Stop at the first failed part instead of sending the rest
+                for future in tasks.finished():
+                    future.result()
+            for future in tasks.as_completed():
+                future.result()
+            resumed = len(parts)
+            parts.extend(future.result() for future in futures)
+
+        parts.sort(key=lambda part: part.offset)
+        if whole_sha1 is not None:
+            sha1 = whole_sha1.hexdigest()
+        committed = client.chunked_uploads.create_file_upload_session_commit(
+            session.id, parts, sha1_digest(bytes.fromhex(sha1))
+        )
+        if committed is None:
+            raise RuntimeError("Box has not finished processing the upload")
+    except Exception as e:
+        raise ChunkedUploadError(session.id, e) from e
+
+    with suppress(FileNotFoundError):
+        os.remove(state_path)
+    file = committed.entries[0]
+    return {
+        "id": file.id,
+        "name": file.name,
+        "size": file_size,
+        "sha1": sha1,
+        "upload_session_id": session.id,
+        "parts_uploaded": len(futures),
+        "parts_resumed": resumed,
+    }
+
+
+def list_folder_page(
+    client: BoxClient,
+    folder_id: str,
+    fields: List[str],
+    limit: int = FOLDER_ITEMS_PAGE_SIZE,
+    marker: Optional[str] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """One page of the items of a Box folder, and the marker of the next page"""
+    page = client.folders.get_folder_items(
+        folder_id,
+        fields=fields,
+        usemarker=True,
+        marker=marker,
+        limit=limit,
+    )
+    return page.entries or [], page.next_marker or None
+
+
+def list_folder_items(
+    client: BoxClient, folder_id: str, fields: List[str]
+) -> List[Any]:
+    """Every item of a Box folder, following markers across pages"""
+    items: List[Any] = []
+    marker = None
+    while True:
+        entries, marker = list_folder_page(
+            client, folder_id, fields, FOLDER_ITEMS_PAGE_SIZE, marker
+        )
+        items.extend(entries)
+        if not marker:
+            return items
+
+
+def list_subfolders(client: BoxClient, folder_id: str) -> Dict[str, str]:
+    """IDs of the sub-folders of a Box folder, by name"""
+    return {
+        item.name: item.id
+        for item in list_folder_items(client, folder_id, ["name", "type"])
+        if item.type == "folder"
+    }
+
+
+def _conflicting_folder_id(error: BoxAPIError) -> Optional[str]:
+    """ID of the folder that made a folder creation fail with 409, if any"""
+    conflict = _conflict(error, "folder")
+    return conflict.get("id") if conflict is not None else None
+
+
+def create_or_reuse_folder(
+    client: BoxClient, name: str, parent_id: str
+) -> Tuple[str, bool]:
+    """
+    Create a sub-folder, or find the one created with the same name since the
+    parent was listed.
+
+    Returns:
+        tuple: The folder's ID, and whether it was created.
+    """
+    try:
+        return box_create_folder(client, name, parent_id).id, True
+    except BoxAPIError as e:
+        folder_id = _conflicting_folder_id(e)
+        if folder_id is None:
+            raise
+        return folder_id, False
+
+
+def _upload_tree_file(
+    client: BoxClient,
+    file_path: str,
+    folder_id: str,
+    upload_concurrency: int,
+    state_dir: str,
+    executor: Executor,
+    check_existing: bool,
+) -> Tuple[bool, int]:
+    """
+    Upload one file of a directory tree. A file of the same name already in
+    the folder is left alone when its content is the same, and gets a new
+    version when it differs.
+
+    Returns:
+        tuple: Whether the file was uploaded, and its size.
+    """
+    file_name = os.path.basename(file_path)
+    file_size = os.path.getsize(file_path)
+    file_id = None
+    sha1 = None
+    if check_existing:
+        existing = find_conflicting_file(client, folder_id, file_name, file_size)
+        if existing is not None:
+            sha1 = file_sha1(file_path)
+            if sha1 == existing["sha1"]:
+                return False, file_size
+            file_id = existing["id"]
+    if file_size >= CHUNKED_UPLOAD_THRESHOLD:
+        upload_file_chunked(
+            client,
+            file_path,
+            folder_id,
+            file_name,
+            upload_concurrency,
+            state_dir,
+            file_id=file_id,
+            executor=executor,
+            sha1=sha1,
+        )
+    else:
+        upload_file_from_path(client, file_path, file_name, folder_id, file_id, sha1)
+    return True, file_size
+
+
+def upload_directory(
+    client: BoxClient,
+    local_dir: str,
+    folder_id: str,
+    concurrency: int,
+    upload_concurrency: int,
+    state_dir: str,
+    executor: Executor,
+) -> Dict[str, Any]:
+    """
+    Mirror a local directory tree into a Box folder.
+
+    The directory is walked top-down. Each sub-directory is matched by name
+    with the sub-folders already in Box, and only the missing ones are
+    created. The files of a directory are queued on the executor,
+    `concurrency` at a time, as soon as its folder is known, so uploads start
+    while the rest of the tree is still being mirrored. Files already in an
+    existing folder are skipped when unchanged and uploaded as a new version
+    otherwise, so a partly uploaded tree can be uploaded again. Large files
+    go through upload sessions, `upload_concurrency` parts at a time. A file
+    or folder that fails is reported and does not stop the others.
+
+    Returns:
+        dict: Counts of folders created and reused, files uploaded, skipped
+        and failed, bytes uploaded, and the first failures.
+    """
+    summary: Dict[str, Any] = {
+        "folders_created": 0,
+        "folders_reused": 0,
+        "files_uploaded": 0,
+        "files_skipped": 0,
+        "files_failed": 0,
+        "bytes_uploaded": 0,
+        "errors": [],
+    }
+
+    def record_error(path: str, error: Exception) -> None:
+        if len(summary["errors"]) < SUMMARY_MAX_ERRORS:
+            summary["errors"].append(
+                {"path": os.path.relpath(path, local_dir), "error": str(error)}
+            )
+
+    def collect(future: Future) -> None:
+        path = futures.pop(future)
+        try:
+            uploaded, size = future.result()
+        except Exception as e:
+            summary["files_failed"] += 1
+            record_error(path, e)
+            return
+        if uploaded:
+            summary["files_uploaded"] += 1
+            summary["bytes_uploaded"] += size
+        else:
+            summary["files_skipped"] += 1
+
+    folder_ids = {local_dir: folder_id}
+    # Folders created by this run cannot hold a file of the same name yet
+    created = set()
+    futures: Dict[Future, str] = {}
+    tasks = BoundedTasks(executor, concurrency)
+    for dir_path, dir_names, file_names in os.walk(local_dir):
+        parent_id = folder_ids[dir_path]
+        # Symbolic links to directories are not followed by the walk
+        dir_names[:] = [
+            name
+            for name in sorted(dir_names)
+            if not os.path.islink(os.path.join(dir_path, name))
+        ]
+        existing = (
+            list_subfolders(client, parent_id)
+            if dir_names and dir_path not in created
+            else {}
+        )
+        for name in list(dir_names):
+            path = os.path.join(dir_path, name)
+            if name in existing:
+                folder_ids[path] = existing[name]
+                summary["folders_reused"] += 1
+                continue
+            try:
+                folder_ids[path], is_new = create_or_reuse_folder(
+                    client, name, parent_id
+                )
+            except Exception as e:
+                # Nothing under it is uploaded; its files count as failed
+                dir_names.remove(name)
+                record_error(path, e)
+                summary["files_failed"] += sum(
+                    len(files) for _, _, files in os.walk(path)
+                )
+                continue
+            if is_new:
+                summary["folders_created"] += 1
+                created.add(path)
+            else:
+                summary["folders_reused"] += 1
+
+        for name in sorted(file_names):
+            path = os.path.join(dir_path, name)
+            future = tasks.submit(
+                _upload_tree_file,
+                client,
+                path,
+                parent_id,
+                upload_concurrency,
+                state_dir,
+                executor,
+                dir_path not in created,
+            )
+            futures[future] = path
+        for future in tasks.finished():
+            collect(future)
+
+    for future in tasks.as_completed():
+        collect(future)
+    return summary
+
+
+def _load_download_manifest(manifest_path: str, folder_id: str) -> Dict[str, Any]:
+    """Files recorded by an earlier download of the same folder, by file ID"""
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if manifest.get("folder_id") != folder_id:
+        return {}
+    return manifest.get("files") or {}
+
+
+def _is_downloaded(path: str, sha1: Optional[str], recorded: Optional[dict]) -> bool:
+    """
+    Whether the local file already holds this content. A file recorded in
+    the manifest and untouched since is trusted; any other is hashed.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+    if (
+        recorded
+        and recorded.get("sha1") == sha1
+        and recorded.get("size") == stat.st_size
+        and recorded.get("mtime_ns") == stat.st_mtime_ns
+    ):
+        return True
+    return bool(sha1) and file_sha1(path) == sha1
+
+
+def _is_plain_name(name: str) -> bool:
+    """Whether an item's name stays inside its directory once joined to it"""
+    return (
+        name not in ("", ".", "..")
+        and os.sep not in name
+        and not (os.altsep and os.altsep in name)
+    )
+
+
+def _download_tree_file(
+    client: BoxClient,
+    file_id: str,
+    path: str,
+    sha1: Optional[str],
+    recorded: Optional[dict],
+) -> Tuple[bool, Dict[str, Any]]:
+    """
+    Download one file of a folder tree unless it is already on disk.
+
+    Returns:
+        tuple: Whether it was downloaded, and its manifest entry.
+    """
+    downloaded = not _is_downloaded(path, sha1, recorded)
+    if downloaded:
+        stream_file_to_path(client, file_id, path, sha1)
+    stat = os.stat(path)
+    return downloaded, {
+        "path": path,
+        "sha1": sha1,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def download_directory(
+    client: BoxClient,
+    folder_id: str,
+    local_dir: str,
+    concurrency: int,
+    executor: Executor,
+) -> Dict[str, Any]:
+    """
+    Mirror a Box folder tree into a local directory.
+
+    The folder is listed top-down, and each file is queued on the executor,
+    `concurrency` at a time, as soon as its folder has been listed. Files are
+    streamed to disk and verified like download_file_to_path. A file whose
+    local copy already has Box's SHA1 is skipped. Completed files are recorded
+    in a manifest in the directory, so a run that is interrupted and started
+    again skips them without hashing them again. A file or folder that fails
+    is reported and does not stop the others.
+
+    Returns:
+        dict: Counts of folders, of files downloaded, skipped and failed,
+        bytes downloaded, the manifest's path, and the first failures.
+    """
+    local_dir = os.path.abspath(local_dir)
+    manifest_path = os.path.join(local_dir, DOWNLOAD_MANIFEST_NAME)
+    recorded = _load_download_manifest(manifest_path, folder_id)
+    files: Dict[str, Any] = {}
+    summary: Dict[str, Any] = {
+        "folders": 0,
+        "files_downloaded": 0,
+        "files_skipped": 0,
+        "files_failed": 0,
+        "bytes_downloaded": 0,
+        "manifest": manifest_path,
+        "errors": [],
+    }
+
+    def record_error(path: str, error: Exception) -> None:
+        if len(summary["errors"]) < SUMMARY_MAX_ERRORS:
+            summary["errors"].append(
+                {"path": os.path.relpath(path, local_dir), "error": str(error)}
+            )
+
+    def save_manifest() -> None:
+        _write_json(manifest_path, {"folder_id": folder_id, "files": files})
+
+    def collect(future: Future, file_id: str, path: str) -> None:
+        try:
+            downloaded, entry = future.result()
+        except Exception as e:
+            summary["files_failed"] += 1
+            record_error(path, e)
+            return
+        entry["path"] = os.path.relpath(entry["path"], local_dir)
+        files[file_id] = entry
+        if downloaded:
+            summary["files_downloaded"] += 1
+            summary["bytes_downloaded"] += entry["size"]
+        else:
+            summary["files_skipped"] += 1
+
+    os.makedirs(local_dir, exist_ok=True)
+    futures: Dict[Future, Tuple[str, str]] = {}
+    last_save = time.monotonic()
+
+    def collect_finished(finished: Iterable[Future]) -> None:
+        nonlocal last_save
+        for future in finished:
+            collect(future, *futures.pop(future))
+            if time.monotonic() - last_save >= MANIFEST_SAVE_INTERVAL:
+                save_manifest()
+                last_save = time.monotonic()
+
+    try:
+        tasks = BoundedTasks(executor, concurrency)
+        folders = deque([(folder_id, local_dir)])
+        while folders:
+            current_id, current_dir = folders.popleft()
+            try:
+                items = list_folder_items(client, current_id, FOLDER_DOWNLOAD_FIELDS)
+            except Exception as e:
+                record_error(current_dir, e)
+                continue
+            for item in items:
+                path = os.path.join(current_dir, item.name)
+                if not _is_plain_name(item.name):
+                    record_error(path, ValueError("invalid item name"))
+                    continue
+                if item.type == "folder":
+                    try:
+                        os.makedirs(path, exist_ok=True)
+                    except OSError as e:
+                        record_error(path, e)
+                        continue
+                    summary["folders"] += 1
+                    folders.append((item.id, path))
+                elif item.type == "file":
+                    # An entry only vouches for the path it was saved to
+                    entry = recorded.get(item.id)
+                    if entry and entry.get("path") != os.path.relpath(path, local_dir):
+                        entry = None
+                    future = tasks.submit(
+                        _download_tree_file,
+                        client,
+                        item.id,
+                        path,
+                        item.sha1,
+                        entry,
+                    )
+                    futures[future] = (item.id, path)
+            collect_finished(tasks.finished())
+
+        collect_finished(tasks.as_completed())
+    finally:
+        save_manifest()
+    return summary
@@ -0,0 +1,264 @@
+"""
+Local caches of Box file content, keyed by file version.
+
+Entries are named after the file ID and the SHA1 of its content, so a new
+version of a file never matches an old entry. Callers check freshness with the
+file's info, which is a cheap call that also confirms the caller may still
+read the file. The content is only downloaded, or its text extracted, on a
+miss.
+"""
+
+import os
+import tempfile
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import suppress
+from threading import Lock
+from typing import Any, BinaryIO, Dict, Optional
+
+from box_ai_agents_toolkit import BoxClient
+
+from box_transfer import stream_file_to_path
+
+# Suffix of the files an entry is written to before it is added
+PARTIAL_SUFFIX = ".part"
+# Partial files untouched for this many seconds were left by a crash
+STALE_PARTIAL_AGE = 3600
+# zlib level of cached text: the fastest, since text compresses well anyway
+TEXT_COMPRESSION_LEVEL = 1
+
+
+def cache_key(file_id: str, sha1: str) -> str:
+    return f"{file_id}-{sha1}"
+
+
+def _file_id_of(key: str) -> str:
+    return key.split("-", 1)[0]
+
+
+class DiskCache:
+    """
+    Directory of files, bounded in size and evicted least recently used first.
+
+    Each entry is a file named after its key. Its modification time is
+    updated on every hit, so the order survives restarts, and worker
+    processes sharing the directory pick up each other's entries. Adding a
+    version of a file removes the entries of its other versions.
+    """
+
+    def __init__(self, directory: str, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        """Index the entries already on disk, oldest first"""
+        found = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and "-" in entry.name:
+                stat = entry.stat()
+                if entry.name.endswith(PARTIAL_SUFFIX):
+                    # Left behind by an interrupted write
+                    if time.time() - stat.st_mtime > STALE_PARTIAL_AGE:
+                        with suppress(OSError):
+                            os.remove(entry.path)
+                    continue
+                found.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._size += size
+        with self._lock:
+            self._evict()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def partial_path(self, key: str) -> str:
+        """New file to write an entry to before it is added"""
+        fd, path = tempfile.mkstemp(
+            prefix=f"{key}.", suffix=PARTIAL_SUFFIX, dir=self.directory
+        )
+        os.close(fd)
+        return path
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries until the cache fits"""
+        while self._size > self.max_size and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+            # Readers keep their open handle on POSIX systems
+            with suppress(OSError):
+                os.remove(self.path(key))
+
+    def _index(self, key: str, size: int) -> None:
+        file_id = _file_id_of(key)
+        # Older versions of the file will not be asked for again
+        for stale in [k for k in self._entries if _file_id_of(k) == file_id]:
+            if stale != key:
+                self._size -= self._entries.pop(stale)
+                with suppress(OSError):
+                    os.remove(self.path(stale))
+        if key not in self._entries:
+            self._entries[key] = size
+            self._size += size
+        self._entries.move_to_end(key)
+
+    def get(self, key: str) -> Optional[BinaryIO]:
+        """Open an entry and mark it as used, or None on a miss"""
+        path = self.path(key)
+        with self._lock:
+            if key not in self._entries and os.path.isfile(path):
+                # Added by another process
+                self._index(key, os.path.getsize(path))
+            try:
+                f = open(path, "rb") if key in self._entries else None
+            except FileNotFoundError:
+                # Evicted by another process
+                self._size -= self._entries.pop(key)
+                f = None
+            if f is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+        with suppress(OSError):
+            os.utime(path)
+        return f
+
+    def add(self, key: str, partial_path: str) -> BinaryIO:
+        """Add the entry written to a partial file and open it"""
+        path = self.path(key)
+        with self._lock:
+            os.replace(partial_path, path)
+            f = open(path, "rb")
+            self._index(key, os.path.getsize(path))
+            self._evict()
+        return f
+
+    def stats(self) -> Dict[str, int]:
+        """Entries, size, and hits, misses and evictions since the start"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size": self._size,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class ContentCache(DiskCache):
+    """Downloaded file content, verified against the version's SHA1"""
+
+    def open_content(self, client: BoxClient, file_id: str, sha1: str) -> BinaryIO:
+        """Open the content of a file version, downloading it on a miss"""
+        key = cache_key(file_id, sha1)
+        f = self.get(key)
+        if f is not None:
+            return f
+        partial_path = self.partial_path(key)
+        try:
+            # Checked against the SHA1 before it is added
+            stream_file_to_path(client, file_id, partial_path, sha1)
+            return self.add(key, partial_path)
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.remove(partial_path)
+            raise
+
+
+class TextCache:
+    """
+    Extracted text of file versions, in two tiers.
+
+    Recently read texts are kept in memory, up to `memory_size` bytes of
+    UTF-8. Every text is also written compressed to a DiskCache, which
+    outlives the process and refills the memory tier on a hit.
+    """
+
+    def __init__(self, directory: str, memory_size: int, disk_size: int):
+        self.memory_size = memory_size
+        self.disk = DiskCache(directory, disk_size)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = Lock()
+
+    def _remember(self, key: str, text: str, size: int) -> None:
+        with self._lock:
+            file_id = _file_id_of(key)
+            for stale in [k for k in self._memory if _file_id_of(k) == file_id]:
+                self._memory_bytes -= self._memory.pop(stale)[1]
+            self._memory[key] = (text, size)
+            self._memory_bytes += size
+            while self._memory_bytes > self.memory_size and self._memory:
+                self._memory_bytes -= self._memory.popitem(last=False)[1][1]
+
+    def get(self, file_id: str, sha1: str) -> Optional[str]:
+        """The cached text of a file version, or None on a miss"""
+        key = cache_key(file_id, sha1)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+        f = self.disk.get(key)
+        if f is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        with f:
+            data = zlib.decompress(f.read())
+        text = data.decode("utf-8")
+        with self._lock:
+            self.disk_hits += 1
+        self._remember(key, text, len(data))
+        return text
+
+    def put(self, file_id: str, sha1: str, text: str) -> None:
+        """Cache the text of a file version in both tiers"""
+        key = cache_key(file_id, sha1)
+        data = text.encode("utf-8")
+        self._remember(key, text, len(data))
+        partial_path = self.disk.partial_path(key)
+        try:
+            with open(partial_path, "wb") as f:
+                f.write(zlib.compress(data, TEXT_COMPRESSION_LEVEL))
+            self.disk.add(key, partial_path).close()
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.remove(partial_path)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Hits per tier, misses, and the size of each tier"""
+        with self._lock:
+            stats = {
+                "hits": self.memory_hits + self.disk_hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory": {
+                    "entries": len(self._memory),
+                    "size": self._memory_bytes,
+                    "max_size": self.memory_size,
+                },
+            }
+        disk = self.disk.stats()
+        stats["disk"] = {
+            name: disk[name] for name in ("entries", "size", "max_size", "evictions")
+        }
+        return stats
@@ -1,60 +1,13 @@
 import argparse
 import logging
+import os
+import tempfile
 
-from fastapi import FastAPI
+import uvicorn
 from mcp.server.fastmcp import FastMCP
+from starlette.applications import Starlette
 
-# from box_tools_ai_deprecated import (
-#     box_ai_extract_tool,
-#     box_ask_ai_tool,
-#     box_ask_ai_tool_multi_file,
-#     box_hubs_ask_ai_tool,
-# )
-from box_tools_ai import (
-    box_ai_ask_file_multi_tool,
-    box_ai_ask_file_single_tool,
-    box_ai_ask_hub_tool,
-    box_ai_extract_freeform_tool,
-    box_ai_extract_structured_enhanced_using_fields_tool,
-    box_ai_extract_structured_enhanced_using_template_tool,
-    box_ai_extract_structured_using_fields_tool,
-    box_ai_extract_structured_using_template_tool,
-)
-from box_tools_docgen import (
-    box_docgen_create_batch_tool,
-    box_docgen_create_single_file_from_user_input_tool,
-    box_docgen_get_job_by_id_tool,
-    box_docgen_list_jobs_by_batch_tool,
-    box_docgen_list_jobs_tool,
-    box_docgen_template_create_tool,
-    box_docgen_template_get_by_id_tool,
-    box_docgen_template_get_by_name_tool,
-    box_docgen_template_list_jobs_tool,
-    # box_docgen_template_delete_tool, # very dangerous tool, use with caution
-    box_docgen_template_list_tags_tool,
-    box_docgen_template_list_tool,
-)
-from box_tools_files import (
-    box_download_file_tool,
-    box_read_tool,
-    box_upload_file_from_content_tool,
-    box_upload_file_from_path_tool,
-)
-from box_tools_folders import (
-    box_list_folder_content_by_folder_id,
-    box_manage_folder_tool,
-)
-from box_tools_generic import box_authorize_app_tool, box_who_am_i
-from box_tools_metadata import (
-    box_metadata_delete_instance_on_file_tool,
-    box_metadata_get_instance_on_file_tool,
-    box_metadata_set_instance_on_file_tool,
-    box_metadata_template_create_tool,
-    box_metadata_template_get_by_name_tool,
-    box_metadata_update_instance_on_file_tool,
-)
-from box_tools_search import box_search_folder_by_name_tool, box_search_tool
-from server_context import box_lifespan
+from tool_registry import lazy_box_lifespan, register_box_resources, register_box_tools
 
 # Disable all logging
 logging.basicConfig(level=logging.CRITICAL)
@@ -75,67 +28,98 @@ def get_mcp_server(
     # Initialize FastMCP server
 
     if transport == "stdio":
-        return FastMCP(server_name, lifespan=box_lifespan)
+        return FastMCP(server_name, lifespan=lazy_box_lifespan)
     else:
         return FastMCP(
             server_name,
             stateless_http=True,
             host=host,
             port=port,
-            lifespan=box_lifespan,
+            lifespan=lazy_box_lifespan,
         )
 
 
 def register_tools(mcp: FastMCP):
-    # Generic tools
-    mcp.tool()(box_who_am_i)
-    mcp.tool()(box_authorize_app_tool)
-
-    # Search Tools
-    mcp.tool()(box_search_tool)
-    mcp.tool()(box_search_folder_by_name_tool)
-
-    # AI Tools
-    mcp.tool()(box_ai_ask_file_single_tool)
-    mcp.tool()(box_ai_ask_file_multi_tool)
-    mcp.tool()(box_ai_ask_hub_tool)
-    mcp.tool()(box_ai_extract_freeform_tool)
-    mcp.tool()(box_ai_extract_structured_using_fields_tool)
-    mcp.tool()(box_ai_extract_structured_using_template_tool)
-    mcp.tool()(box_ai_extract_structured_enhanced_using_fields_tool)
-    mcp.tool()(box_ai_extract_structured_enhanced_using_template_tool)
-
-    # Document Generation Tools
-    mcp.tool()(box_docgen_create_batch_tool)
-    mcp.tool()(box_docgen_get_job_by_id_tool)
-    mcp.tool()(box_docgen_list_jobs_tool)
-    mcp.tool()(box_docgen_list_jobs_by_batch_tool)
-    mcp.tool()(box_docgen_template_create_tool)
-    mcp.tool()(box_docgen_template_list_tool)
-    # mcp.tool()(box_docgen_template_delete_tool) # very dangerous tool, use with caution
-    mcp.tool()(box_docgen_template_get_by_id_tool)
-    mcp.tool()(box_docgen_template_list_tags_tool)
-    mcp.tool()(box_docgen_template_list_jobs_tool)
-    mcp.tool()(box_docgen_template_get_by_name_tool)
-    mcp.tool()(box_docgen_create_single_file_from_user_input_tool)
-
-    # File Tools
-    mcp.tool()(box_read_tool)
-    mcp.tool()(box_upload_file_from_path_tool)
-    mcp.tool()(box_upload_file_from_content_tool)
-    mcp.tool()(box_download_file_tool)
-
-    # Folder Tools
-    mcp.tool()(box_list_folder_content_by_folder_id)
-    mcp.tool()(box_manage_folder_tool)
-
-    # Metadata Template Tools
-    mcp.tool()(box_metadata_template_get_by_name_tool)
-    mcp.tool()(box_metadata_set_instance_on_file_tool)
-    mcp.tool()(box_metadata_get_instance_on_file_tool)
-    mcp.tool()(box_metadata_delete_instance_on_file_tool)
-    mcp.tool()(box_metadata_update_instance_on_file_tool)
-    mcp.tool()(box_metadata_template_create_tool)
+    # Tools are listed from the manifest and imported on first call
+    register_box_tools(mcp)
+    # So are the file resources
+    register_box_resources(mcp)
+
+
+def create_server(transport: str, host: str, port: int) -> FastMCP:
+    # Initialize FastMCP server
+    mcp = get_mcp_server(
+        server_name=f"Box MCP {transport.upper()} Server",
+        transport=transport,
+        host=host,
+        port=port,
+    )
+    register_tools(mcp)
+
+    @mcp.tool()
+    def mcp_server_info():
+        """Returns information about the MCP server."""
+        from box_tools_generic import coalescer
+        from server_context import (
+            get_content_cache,
+            get_rate_limiter,
+            get_text_cache,
+        )
+
+        # stdio has no address to report
+        listening = transport != "stdio"
+        return {
+            "server_name": mcp.name,
+            "transport": transport,
+            "host": host if listening else "N/A",
+            "port": port if listening else "N/A",
+            "coalescing": coalescer.stats(),
+            "rate_limits": get_rate_limiter().stats(),
+            "content_cache": get_content_cache().stats(),
+            "text_cache": get_text_cache().stats(),
+        }
+
+    return mcp
+
+
+def create_http_app() -> Starlette:
+    """
+    Build the streamable-http app inside a worker process.
+    Used by uvicorn as the app factory when running with --workers.
+    """
+    mcp = create_server(
+        "http", os.environ["BOX_MCP_HOST"], int(os.environ["BOX_MCP_PORT"])
+    )
+    return mcp.streamable_http_app()
+
+
+def run_http_workers(host: str, port: int, workers: int) -> None:
+    """
+    Serve streamable-http from several worker processes.
+
+    Stateless HTTP lets any worker answer any request. The workers share the
+    CCG token through a lock-protected file, so they do not each exchange
+    credentials. Unless BOX_MCP_TOKEN_CACHE is set, the file is temporary.
+    """
+    os.environ["BOX_MCP_HOST"] = host
+    os.environ["BOX_MCP_PORT"] = str(port)
+    token_cache_dir = None
+    if not os.getenv("BOX_MCP_TOKEN_CACHE"):
+        token_cache_dir = tempfile.TemporaryDirectory(prefix="box-mcp-")
+        os.environ["BOX_MCP_TOKEN_CACHE"] = os.path.join(
+            token_cache_dir.name, "token.json"
+        )
+    try:
+        uvicorn.run(
+            "mcp_server_box:create_http_app",
+            factory=True,
+            host=host,
+            port=port,
+            workers=workers,
+        )
+    finally:
+        if token_cache_dir is not None:
+            token_cache_dir.cleanup()
 
 
 if __name__ == "__main__":
@@ -157,43 +141,159 @@ if __name__ == "__main__":
         default=8000,
         help="Port for SSE/HTTP transport (default: 8000)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes serving the HTTP transport (default: 1)",
+    )
+    parser.add_argument(
+        "--token-cache",
+        default=None,
+        help="File sharing the CCG token between processes (default: BOX_MCP_TOKEN_CACHE, or a temporary file with --workers)",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="Threads for blocking Box API calls (default: BOX_MCP_MAX_WORKERS or min(32, cpus + 4))",
+    )
+    parser.add_argument(
+        "--max-inline-size",
+        type=int,
+        default=None,
+        help="Largest file in bytes whose content is returned inline (default: BOX_MCP_MAX_INLINE_SIZE or 10 MiB)",
+    )
+    parser.add_argument(
+        "--upload-concurrency",
+        type=int,
+        default=None,
+        help="Parts of a chunked upload sent at the same time (default: BOX_MCP_UPLOAD_CONCURRENCY or 4)",
+    )
+    parser.add_argument(
+        "--transfer-concurrency",
+        type=int,
+        default=None,
+        help="Files a bulk tool transfers or reads, and folders a recursive listing fetches, at the same time (default: BOX_MCP_TRANSFER_CONCURRENCY or 8)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory of the local content caches (default: BOX_MCP_CACHE_DIR or a temporary directory)",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        type=int,
+        default=None,
+        help="Largest size in bytes of the file content cache (default: BOX_MCP_CACHE_MAX_SIZE or 1 GiB)",
+    )
+    parser.add_argument(
+        "--text-cache-memory-size",
+        type=int,
+        default=None,
+        help="Bytes of extracted text kept in memory (default: BOX_MCP_TEXT_CACHE_MEMORY_SIZE or 64 MiB)",
+    )
+    parser.add_argument(
+        "--text-cache-disk-size",
+        type=int,
+        default=None,
+        help="Bytes of compressed extracted text kept on disk (default: BOX_MCP_TEXT_CACHE_DISK_SIZE or 256 MiB)",
+    )
+    parser.add_argument(
+        "--http-pool-size",
+        type=int,
+        default=None,
+        help="Connections of the async client across all Box hosts (default: BOX_MCP_HTTP_POOL_SIZE or 100)",
+    )
+    parser.add_argument(
+        "--http-max-per-host",
+        type=int,
+        default=None,
+        help="Connections the sync client keeps alive per Box host (default: BOX_MCP_HTTP_MAX_PER_HOST or 32)",
+    )
+    parser.add_argument(
+        "--http-keepalive",
+        type=float,
+        default=None,
+        help="Seconds an idle connection is kept alive (default: BOX_MCP_HTTP_KEEPALIVE or 30)",
+    )
+    parser.add_argument(
+        "--http-connect-timeout",
+        type=float,
+        default=None,
+        help="Connect timeout in seconds (default: BOX_MCP_HTTP_CONNECT_TIMEOUT or 5)",
+    )
+    parser.add_argument(
+        "--http-read-timeout",
+        type=float,
+        default=None,
+        help="Read timeout in seconds (default: BOX_MCP_HTTP_READ_TIMEOUT or 60)",
+    )
+    parser.add_argument(
+        "--user-mode",
+        choices=["as-user", "user-token"],
+        default=None,
+        help="Act as the user named in the X-Box-User-Id header (default: BOX_MCP_USER_MODE or disabled)",
+    )
+    parser.add_argument(
+        "--user-pool-size",
+        type=int,
+        default=None,
+        help="Per-user clients kept in the pool (default: BOX_MCP_USER_POOL_SIZE or 256)",
+    )
+    parser.add_argument(
+        "--user-idle-timeout",
+        type=float,
+        default=None,
+        help="Seconds before an idle per-user client is evicted (default: BOX_MCP_USER_IDLE_TIMEOUT or 900)",
+    )
 
     args = parser.parse_args()
 
-    # Initialize FastMCP server
-    mcp = get_mcp_server(
-        server_name=f"Box MCP {args.transport.upper()} Server",
-        transport=args.transport,
-        host=args.host,
-        port=args.port,
-    )
-    register_tools(mcp)
+    if args.workers < 1:
+        parser.error("--workers must be a positive integer")
+    if args.workers > 1 and args.transport != "http":
+        parser.error("--workers requires --transport http")
 
-    @mcp.tool()
-    def mcp_server_info():
-        """Returns information about the MCP server."""
-        if args.transport == "stdio":
-            return {
-                "server_name": mcp.name,
-                "transport": args.transport,
-                "host": "N/A",
-                "port": "N/A",
-            }
+    # Settings are read from the environment by server_context
+    for option, env_var in (
+        ("token_cache", "BOX_MCP_TOKEN_CACHE"),
+        ("max_workers", "BOX_MCP_MAX_WORKERS"),
+        ("max_inline_size", "BOX_MCP_MAX_INLINE_SIZE"),
+        ("upload_concurrency", "BOX_MCP_UPLOAD_CONCURRENCY"),
+        ("transfer_concurrency", "BOX_MCP_TRANSFER_CONCURRENCY"),
+        ("cache_dir", "BOX_MCP_CACHE_DIR"),
+        ("cache_max_size", "BOX_MCP_CACHE_MAX_SIZE"),
+        ("text_cache_memory_size", "BOX_MCP_TEXT_CACHE_MEMORY_SIZE"),
+        ("text_cache_disk_size", "BOX_MCP_TEXT_CACHE_DISK_SIZE"),
+        ("http_pool_size", "BOX_MCP_HTTP_POOL_SIZE"),
+        ("http_max_per_host", "BOX_MCP_HTTP_MAX_PER_HOST"),
+        ("http_keepalive", "BOX_MCP_HTTP_KEEPALIVE"),
+        ("http_connect_timeout", "BOX_MCP_HTTP_CONNECT_TIMEOUT"),
+        ("http_read_timeout", "BOX_MCP_HTTP_READ_TIMEOUT"),
+        ("user_mode", "BOX_MCP_USER_MODE"),
+        ("user_pool_size", "BOX_MCP_USER_POOL_SIZE"),
+        ("user_idle_timeout", "BOX_MCP_USER_IDLE_TIMEOUT"),
+    ):
+        value = getattr(args, option)
+        if value is not None:
+            os.environ[env_var] = str(value)
 
-        return {
-            "server_name": mcp.name,
-            "transport": args.transport,
-            "host": args.host,
-            "port": args.port,
-        }
+    if args.workers > 1:
+        run_http_workers(args.host, args.port, args.workers)
+    else:
+        mcp = create_server(args.transport, args.host, args.port)
 
-    if args.transport == "sse":
-        # Create FastAPI app and mount MCP SSE endpoint
-        app = FastAPI()
-        app.mount("/", mcp.sse_app())
-        mcp.run(transport="sse")
+        if args.transport == "sse":
+            # FastAPI is only needed by the SSE transport
+            from fastapi import FastAPI
 
-    elif args.transport == "http":
-        mcp.run(transport="streamable-http")
-    else:
-        mcp.run(transport="stdio")
+            # Create FastAPI app and mount MCP SSE endpoint
+            app = FastAPI()
+            app.mount("/", mcp.sse_app())
+            mcp.run(transport="sse")
+
+        elif args.transport == "http":
+            mcp.run(transport="streamable-http")
+        else:
+            mcp.run(transport="stdio")
@@ -0,0 +1,324 @@
+"""
+Client-side scheduling of Box API calls around Box's rate limits.
+
+Every request of the Box clients, sync and async, takes a token from the bucket
+of its endpoint class before it is sent. Calls over the rate wait in the bucket
+instead of drawing 429s from Box. When Box still answers 429, the whole class
+is paused for the Retry-After and the call is queued behind it, instead of
+failing once the SDK's retry budget is spent.
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from threading import Lock, local
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from box_sdk_gen import BoxNetworkClient, BoxRetryStrategy, FetchOptions, FetchResponse
+
+# Requests per second allowed for each endpoint class
+RATE_LIMITS: Dict[str, float] = {
+    "search": 6.0,
+    "ai": 4.0,
+    "upload": 4.0,
+    "metadata": 16.0,
+    "docgen": 4.0,
+}
+# Calls outside the rate-limited classes are only paused on 429
+DEFAULT_CLASS = "default"
+# Times a call is queued again after a 429 before the error is raised
+RATE_LIMIT_RETRIES = 20
+# Same backoff as the SDK's BoxRetryStrategy, used when there is no Retry-After
+RETRY_BASE_INTERVAL = 1.0
+
+
+def endpoint_class(url: str) -> str:
+    """Rate limit class of a Box API URL"""
+    parts = urlsplit(url)
+    if parts.hostname and parts.hostname.startswith("upload."):
+        return "upload"
+    segments = parts.path.split("/")
+    resource = segments[2] if len(segments) > 2 and segments[1] == "2.0" else ""
+    if resource == "search":
+        return "search"
+    if resource == "ai":
+        return "ai"
+    if resource.startswith("docgen"):
+        return "docgen"
+    if resource.startswith("metadata") or "metadata" in segments[3:]:
+        return "metadata"
+    return DEFAULT_CLASS
+
+
+def _parse_retry_after(retry_after: str) -> Optional[float]:
+    """Seconds of a Retry-After in seconds or as an HTTP date, None if invalid"""
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def retry_after_seconds(retry_after: Optional[str], attempt: int) -> float:
+    """Seconds to wait before a retry: the Retry-After, or exponential backoff"""
+    if retry_after is not None:
+        seconds = _parse_retry_after(retry_after)
+        if seconds is not None:
+            return seconds
+    return (2**attempt) * RETRY_BASE_INTERVAL * random.uniform(0.5, 1.5)
+
+
+def request_streams(options: FetchOptions) -> List[Any]:
+    """The streamed bodies of a request, plain or in multipart parts"""
+    streams = [options.file_stream] if options.file_stream else []
+    streams.extend(
+        part.file_stream for part in options.multipart_data or [] if part.file_stream
+    )
+    return streams
+
+
+def can_rewind(options: FetchOptions) -> bool:
+    """Whether every streamed body of a request can be sent again"""
+    return all(stream.seekable() for stream in request_streams(options))
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out send times instead of blocking.
+
+    Each reservation takes a token and returns how long the caller has to wait
+    for it, so callers queue in arrival order and can wait on a thread or on
+    the event loop. A bucket without a rate never runs dry and only waits out
+    pauses.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float],
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate or 1.0)
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+        self._lock = Lock()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            if self.rate is not None:
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated) * self.rate
+                )
+            self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token, returning the seconds to wait before using it"""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            delay = max(0.0, self.updated - now)
+            if self.rate is not None:
+                self.tokens -= 1
+                delay += max(0.0, -self.tokens) / self.rate
+            return delay
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for the given time, then resume without a burst"""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self.tokens = min(self.tokens, 1.0)
+            self.updated = max(self.updated, now + seconds)
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    queued: int = 0
+    throttled: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+
+
+@dataclass
+class RequestBodies:
+    """Start positions of the streamed bodies of a request being fetched"""
+
+    options: FetchOptions
+    positions: List[Tuple[Any, int]]
+    sent: bool = False
+
+
+class RateLimitScheduler:
+    """Token buckets per endpoint class, shared by every Box client"""
+
+    def __init__(
+        self,
+        rates: Optional[Dict[str, float]] = None,
+        max_retries: int = RATE_LIMIT_RETRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        rates = RATE_LIMITS if rates is None else rates
+        self.buckets: Dict[str, TokenBucket] = {
+            name: TokenBucket(rate, clock=clock) for name, rate in rates.items()
+        }
+        self.buckets[DEFAULT_CLASS] = TokenBucket(None, clock=clock)
+        self.max_retries = max_retries
+        self._stats = {name: EndpointStats() for name in self.buckets}
+        self._lock = Lock()
+
+    def _reserve(self, url: str) -> tuple[EndpointStats, float]:
+        name = endpoint_class(url)
+        delay = self.buckets[name].reserve()
+        stats = self._stats[name]
+        with self._lock:
+            stats.requests += 1
+            stats.wait_total += delay
+            stats.wait_max = max(stats.wait_max, delay)
+            if delay > 0:
+                stats.queued += 1
+        return stats, delay
+
+    def _dequeue(self, stats: EndpointStats) -> None:
+        with self._lock:
+            stats.queued -= 1
+
+    def acquire(self, url: str) -> float:
+        """Wait on this thread until the request may be sent"""
+        stats, delay = self._reserve(url)
+        if delay > 0:
+            try:
+                time.sleep(delay)
+            finally:
+                self._dequeue(stats)
+        return delay
+
+    async def acquire_async(self, url: str) -> float:
+        """Wait on the event loop until the request may be sent"""
+        stats, delay = self._reserve(url)
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self._dequeue(stats)
+        return delay
+
+    def throttle(self, url: str, seconds: float) -> None:
+        """Pause the URL's endpoint class after Box answered 429"""
+        name = endpoint_class(url)
+        self.buckets[name].pause(seconds)
+        with self._lock:
+            self._stats[name].throttled += 1
+
+    def stats(self) -> Dict[str, dict]:
+        """Rate, queue depth, 429s and wait times of each endpoint class"""
+        with self._lock:
+            return {
+                name: {
+                    "rate": self.buckets[name].rate,
+                    "queued": stats.queued,
+                    "requests": stats.requests,
+                    "throttled": stats.throttled,
+                    "wait_avg": (
+                        stats.wait_total / stats.requests if stats.requests else 0.0
+                    ),
+                    "wait_max": stats.wait_max,
+                }
+                for name, stats in self._stats.items()
+            }
+
+
+class RateLimitedNetworkClient(BoxNetworkClient):
+    """
+    SDK network client that waits for the scheduler before each attempt.
+
+    The SDK only rewinds streamed bodies after a network error, so a retry
+    after a 429 would send what is left of the stream: nothing. The client
+    seeks each body back to where it started before every later attempt.
+    """
+
+    def __init__(self, requests_session, scheduler: RateLimitScheduler):
+        super().__init__(requests_session)
+        self.scheduler = scheduler
+        # Start positions of the bodies of the request fetched on each thread
+        self._bodies = local()
+
+    def fetch(self, options: FetchOptions) -> FetchResponse:
+        previous = getattr(self._bodies, "current", None)
+        self._bodies.current = RequestBodies(
+            options,
+            [
+                (stream, stream.tell())
+                for stream in request_streams(options)
+                if stream.seekable()
+            ],
+        )
+        try:
+            return super().fetch(options)
+        finally:
+            self._bodies.current = previous
+
+    def _prepare_request(self, options: FetchOptions, reauthenticate: bool = False):
+        bodies: Optional[RequestBodies] = getattr(self._bodies, "current", None)
+        if bodies is not None and bodies.options is options:
+            if bodies.sent:
+                for stream, position in bodies.positions:
+                    stream.seek(position)
+            bodies.sent = True
+        return super()._prepare_request(options, reauthenticate)
+
+    def _make_request(self, request):
+        self.scheduler.acquire(request.url)
+        return super()._make_request(request)
+
+
+class RateLimitRetryStrategy(BoxRetryStrategy):
+    """
+    The SDK's retry strategy, with 429s queued in the scheduler.
+    A 429 pauses its endpoint class for the Retry-After and is retried up to
+    the scheduler's max_retries; the wait happens in the network client.
+    Requests whose body is a stream that cannot be rewound are not retried.
+    """
+
+    def __init__(self, scheduler: RateLimitScheduler, **kwargs):
+        super().__init__(**kwargs)
+        self.scheduler = scheduler
+
+    def should_retry(
+        self,
+        fetch_options: FetchOptions,
+        fetch_response: FetchResponse,
+        attempt_number: int,
+    ) -> bool:
+        if not can_rewind(fetch_options):
+            return False
+        if fetch_response.status == 429:
+            return attempt_number <= self.scheduler.max_retries
+        return super().should_retry(fetch_options, fetch_response, attempt_number)
+
+    def retry_after(
+        self,
+        fetch_options: FetchOptions,
+        fetch_response: FetchResponse,
+        attempt_number: int,
+    ) -> float:
+        if fetch_response.status == 429:
+            self.scheduler.throttle(
+                fetch_options.url,
+                retry_after_seconds(
+                    fetch_response.headers.get("Retry-After"), attempt_number
+                ),
+            )
+            return 0.0
+        return super().retry_after(fetch_options, fetch_response, attempt_number)
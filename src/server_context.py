@@ -1,22 +1,855 @@
-from contextlib import asynccontextmanager
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
 from dataclasses import dataclass
-from typing import AsyncIterator
+from threading import Event, Lock, Thread, local
+from typing import AsyncIterator, Callable, Iterator, Optional, TypeVar
 
-from box_ai_agents_toolkit import BoxClient, get_ccg_client
+import httpx
+import requests
+from box_ai_agents_toolkit import BoxClient, get_ccg_config
+from box_ai_agents_toolkit.box_authentication import add_extra_header_to_box_client
+from box_sdk_gen import (
+    AccessToken,
+    BoxCCGAuth,
+    CCGConfig,
+    NetworkSession,
+    TokenStorage,
+)
 from mcp.server.fastmcp import FastMCP
+from requests.adapters import HTTPAdapter
+
+from content_cache import ContentCache, TextCache
+from rate_limits import (
+    RATE_LIMIT_RETRIES,
+    RATE_LIMITS,
+    RateLimitedNetworkClient,
+    RateLimitRetryStrategy,
+    RateLimitScheduler,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Refresh the CCG token this many seconds before it expires
+TOKEN_REFRESH_MARGIN = 300
+# Wait this long before retrying a failed background refresh
+TOKEN_REFRESH_RETRY_INTERVAL = 30
+
+# Defaults for the HTTP connection pools of the Box clients: connections of
+# the async client across all hosts, and of the sync client per host
+HTTP_POOL_SIZE = 100
+HTTP_MAX_PER_HOST = 32
+# Hosts whose connection pools the sync client keeps (API, upload, download
+# and auth hosts, with room to spare)
+HTTP_HOST_POOLS = 10
+HTTP_KEEPALIVE_EXPIRY = 30.0
+# Same connect and read timeouts as the SDK's network client
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_READ_TIMEOUT = 60.0
+
+# Per-user clients, resolved from a request header set by a trusted gateway
+USER_ID_HEADER = "x-box-user-id"
+USER_MODES = ("as-user", "user-token")
+USER_POOL_SIZE = 256
+USER_IDLE_TIMEOUT = 900.0
+
+# Largest file whose content a tool returns inline, in bytes
+MAX_INLINE_SIZE = 10 * 1024 * 1024
+# Parts of one chunked upload sent at the same time
+UPLOAD_CONCURRENCY = 4
+# Files a bulk tool transfers or reads at the same time
+TRANSFER_CONCURRENCY = 8
+# Largest total size of the local cache of file content, in bytes
+CACHE_MAX_SIZE = 1024 * 1024 * 1024
+# Largest size of the extracted text kept in memory, and compressed on disk
+TEXT_CACHE_MEMORY_SIZE = 64 * 1024 * 1024
+TEXT_CACHE_DISK_SIZE = 256 * 1024 * 1024
+
+N = TypeVar("N", int, float)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = Lock()
+
+_client: BoxClient | None = None
+_client_lock = Lock()
+
+_token_manager: "TokenManager | None" = None
+_token_manager_lock = Lock()
+
+_http_client: httpx.AsyncClient | None = None
+_http_client_loop: asyncio.AbstractEventLoop | None = None
+_http_client_lock = Lock()
+
+_user_clients: "UserClientPool | None" = None
+_user_clients_lock = Lock()
+
+_rate_limiter: RateLimitScheduler | None = None
+_rate_limiter_lock = Lock()
+
+_content_cache: ContentCache | None = None
+_content_cache_lock = Lock()
+
+_text_cache: TextCache | None = None
+_text_cache_lock = Lock()
+
+
+class SharedTokenStorage(TokenStorage):
+    """
+    Token storage shared by processes through a lock-protected file.
+
+    Workers of a multi-process server point their CCG auth at the same file.
+    The file records when the token expires, and lock() serializes token
+    exchanges across processes, so a token obtained by one worker is reused
+    by all of them. The file is only readable by its owner.
+    """
+
+    def __init__(self, path: str):
+        if fcntl is None:
+            raise RuntimeError("A shared token cache requires a POSIX system")
+        self.path = path
+        self._lock_path = f"{path}.lock"
+        self._cache_key: tuple[int, int, int] | None = None
+        self._token: AccessToken | None = None
+        self._expires_at: float | None = None
+        self._cache_lock = Lock()
+
+    def _read(self) -> None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._cache_key, self._token, self._expires_at = None, None, None
+            return
+        # Each store replaces the file, so a new inode marks a new token
+        cache_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if cache_key == self._cache_key:
+            return
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        self._token = AccessToken.from_dict(data["token"])
+        self._expires_at = data.get("expires_at")
+        self._cache_key = cache_key
+
+    def get(self) -> Optional[AccessToken]:
+        with self._cache_lock:
+            self._read()
+            return self._token
+
+    def expires_at(self) -> float | None:
+        """Time at which the stored token expires, if known"""
+        with self._cache_lock:
+            self._read()
+            return self._expires_at
+
+    def store(self, token: AccessToken) -> None:
+        expires_at = time.time() + token.expires_in if token.expires_in else None
+        data = {"token": token.to_dict(), "expires_at": expires_at}
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold the exclusive cross-process lock on the token"""
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+
+class SingleFlightCCGAuth(BoxCCGAuth):
+    """
+    CCG authentication that lets only one thread at a time exchange credentials.
+
+    Concurrent callers that find the token missing, or that hit a 401 with a
+    token that has since been replaced, wait for the in-flight exchange or
+    reuse its result instead of each requesting a new token. The expiry of
+    each token obtained is recorded so it can be refreshed ahead of time. With
+    a SharedTokenStorage the exchange is also single-flight across processes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._token_lock = Lock()
+        # Access token last sent from each thread, the one a 401 there rejected
+        self._sent = local()
+        self.issued_at: float | None = None
+        self.expires_in: float | None = None
+
+    @property
+    def expires_at(self) -> float | None:
+        """Time at which the current token expires, if known"""
+        if isinstance(self.token_storage, SharedTokenStorage):
+            return self.token_storage.expires_at()
+        if self.issued_at is None or self.expires_in is None:
+            return None
+        return self.issued_at + self.expires_in
+
+    def is_expired(self) -> bool:
+        expires_at = self.expires_at
+        return expires_at is not None and time.time() >= expires_at
+
+    @contextmanager
+    def _exchange_lock(self) -> Iterator[None]:
+        with self._token_lock:
+            if isinstance(self.token_storage, SharedTokenStorage):
+                with self.token_storage.lock():
+                    yield
+            else:
+                yield
+
+    def cached_token(self) -> AccessToken | None:
+        """Return the cached token if it is still valid, without any exchange"""
+        token = self.token_storage.get()
+        if token is None or self.is_expired():
+            return None
+        return token
+
+    def retrieve_token(
+        self, *, network_session: Optional[NetworkSession] = None
+    ) -> AccessToken:
+        token = self.token_storage.get()
+        if token is not None and not self.is_expired():
+            return token
+        with self._exchange_lock():
+            token = self.token_storage.get()
+            if token is None or self.is_expired():
+                token = self._exchange_token(network_session)
+            return token
+
+    def retrieve_authorization_header(
+        self, *, network_session: Optional[NetworkSession] = None
+    ) -> str:
+        token = self.retrieve_token(network_session=network_session)
+        self._sent.access_token = token.access_token
+        return f"Bearer {token.access_token}"
+
+    def refresh_token(
+        self,
+        *,
+        network_session: Optional[NetworkSession] = None,
+        rejected_token: Optional[str] = None,
+    ) -> AccessToken:
+        """
+        Replace the access token Box rejected, unless it was already replaced.
+        The SDK's 401 handling does not say which token was rejected, so it
+        defaults to the one last sent from this thread, or else to the one
+        cached when the call starts.
+        """
+        if rejected_token is None:
+            rejected_token = getattr(self._sent, "access_token", None)
+        if rejected_token is None:
+            stale_token = self.token_storage.get()
+            rejected_token = stale_token.access_token if stale_token else None
+        with self._exchange_lock():
+            current_token = self.token_storage.get()
+            if (
+                current_token is not None
+                and current_token.access_token != rejected_token
+            ):
+                # Another caller already replaced the rejected token
+                return current_token
+            return self._exchange_token(network_session)
+
+    def refresh_token_if_expiring(self, margin: float) -> AccessToken:
+        """Refresh unless the cached token stays valid for more than margin seconds"""
+        with self._exchange_lock():
+            token = self.token_storage.get()
+            expires_at = self.expires_at
+            if (
+                token is not None
+                and expires_at is not None
+                and expires_at - time.time() > margin
+            ):
+                return token
+            return self._exchange_token(None)
+
+    def _exchange_token(self, network_session: Optional[NetworkSession]) -> AccessToken:
+        issued_at = time.time()
+        token = super().refresh_token(network_session=network_session)
+        self.issued_at = issued_at
+        self.expires_in = token.expires_in
+        return token
+
+
+class TokenManager:
+    """
+    Keeps the CCG token of the shared client fresh.
+
+    A background thread refreshes the token shortly before it expires, so tool
+    calls always find a valid token in the cache instead of waiting on an
+    exchange. Refreshes go through SingleFlightCCGAuth, so a background refresh
+    and any number of concurrent revalidations collapse into one exchange.
+    """
+
+    def __init__(
+        self,
+        auth: SingleFlightCCGAuth,
+        refresh_margin: float = TOKEN_REFRESH_MARGIN,
+        retry_interval: float = TOKEN_REFRESH_RETRY_INTERVAL,
+    ):
+        self.auth = auth
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self._stop = Event()
+        self._thread: Thread | None = None
+        self._thread_lock = Lock()
+
+    def effective_margin(self) -> float:
+        """Refresh margin, capped at half the lifetime of short-lived tokens"""
+        if self.auth.expires_in is None:
+            return self.refresh_margin
+        return min(self.refresh_margin, self.auth.expires_in / 2)
+
+    def seconds_until_refresh(self) -> float:
+        """Seconds until the current token should be refreshed"""
+        expires_at = self.auth.expires_at
+        if expires_at is None:
+            # No token yet, or one loaded from storage with an unknown age
+            return 0
+        return max(0.0, expires_at - self.effective_margin() - time.time())
+
+    def refresh(self) -> AccessToken:
+        """Exchange credentials for a new token, joining any refresh in flight"""
+        token = self.auth.token_storage.get()
+        return self.auth.refresh_token(
+            rejected_token=token.access_token if token else None
+        )
+
+    def revalidate(self) -> bool:
+        """Confirm the app is still authorized by obtaining a fresh token"""
+        token = self.refresh()
+        return bool(token and token.access_token)
+
+    def start(self) -> None:
+        """Start the background refresh thread if it is not running"""
+        with self._thread_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = Thread(
+                target=self._run, name="box-token-refresh", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh thread"""
+        self._stop.set()
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.seconds_until_refresh()):
+            try:
+                self.auth.refresh_token_if_expiring(self.effective_margin())
+            except Exception as e:
+                logger.warning(f"Background Box token refresh failed: {e}")
+                if self._stop.wait(self.retry_interval):
+                    return
+
+
+@dataclass
+class _PooledClient:
+    client: BoxClient
+    last_used: float
+    refresh: Future | None = None
+
+
+class UserClientPool:
+    """
+    LRU pool of per-user Box clients.
+
+    Clients are built on first use and reused by later requests of the same
+    user. The pool holds at most max_size clients, evicting the least recently
+    used one when full, and drops clients idle for longer than idle_timeout.
+    Clients with their own token get it refreshed on the executor shortly
+    before it expires, so requests do not wait on the exchange.
+    """
+
+    def __init__(
+        self,
+        client: BoxClient,
+        factory: Callable[[str], BoxClient],
+        max_size: int = USER_POOL_SIZE,
+        idle_timeout: float = USER_IDLE_TIMEOUT,
+        refresh_margin: float = TOKEN_REFRESH_MARGIN,
+    ):
+        self.client = client
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.refresh_margin = refresh_margin
+        self.evictions = 0
+        self._clients: OrderedDict[str, _PooledClient] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._clients
+
+    def get(self, user_id: str) -> BoxClient:
+        """Return the client for a user, building it if it is not pooled"""
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(user_id)
+            if entry is None:
+                entry = _PooledClient(self.factory(user_id), now)
+                self._clients[user_id] = entry
+                while len(self._clients) > self.max_size:
+                    self._clients.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._clients.move_to_end(user_id)
+                entry.last_used = now
+            self._refresh_if_expiring(entry)
+            return entry.client
+
+    def _evict_idle(self, now: float) -> None:
+        # Entries are ordered by last use, so idle ones are at the front
+        while self._clients:
+            entry = next(iter(self._clients.values()))
+            if now - entry.last_used <= self.idle_timeout:
+                break
+            self._clients.popitem(last=False)
+            self.evictions += 1
+
+    def _refresh_if_expiring(self, entry: _PooledClient) -> None:
+        auth = entry.client.auth
+        if auth is self.client.auth or not isinstance(auth, SingleFlightCCGAuth):
+            # Shared auth is kept fresh by the token manager
+            return
+        if auth.expires_at is None or auth.expires_in is None:
+            return
+        margin = min(self.refresh_margin, auth.expires_in / 2)
+        if auth.expires_at - time.time() > margin:
+            return
+        if entry.refresh is None or entry.refresh.done():
+            entry.refresh = get_executor().submit(
+                auth.refresh_token_if_expiring, margin
+            )
+
+
+def _positive_env(name: str, convert: Callable[[str], N], default: N) -> N:
+    """Read a positive number from the environment, or return the default"""
+    value = os.getenv(name)
+    if not value:
+        return default
+    number = convert(value)
+    if number <= 0:
+        raise ValueError(f"{name} must be a positive number")
+    return number
+
+
+def get_max_workers() -> int:
+    """
+    Size of the thread pool used for blocking Box API calls.
+    Read from BOX_MCP_MAX_WORKERS, defaulting to the standard library heuristic.
+    """
+    return _positive_env("BOX_MCP_MAX_WORKERS", int, min(32, (os.cpu_count() or 1) + 4))
+
+
+def get_max_inline_size() -> int:
+    """
+    Largest file, in bytes, whose content tools return inline.
+    Read from BOX_MCP_MAX_INLINE_SIZE.
+    """
+    return _positive_env("BOX_MCP_MAX_INLINE_SIZE", int, MAX_INLINE_SIZE)
+
+
+def get_upload_concurrency() -> int:
+    """
+    Parts of a chunked upload sent at the same time.
+    Read from BOX_MCP_UPLOAD_CONCURRENCY.
+    """
+    return _positive_env("BOX_MCP_UPLOAD_CONCURRENCY", int, UPLOAD_CONCURRENCY)
+
+
+def get_transfer_concurrency() -> int:
+    """
+    Files a bulk tool handles at the same time: directory uploads and
+    downloads, and multi-file reads. Also bounds the folders a recursive
+    listing fetches at once. Read from BOX_MCP_TRANSFER_CONCURRENCY.
+    """
+    return _positive_env("BOX_MCP_TRANSFER_CONCURRENCY", int, TRANSFER_CONCURRENCY)
+
+
+def get_upload_state_dir() -> str:
+    """
+    Directory where chunked uploads record their upload session, so an
+    interrupted upload can be resumed. Read from BOX_MCP_UPLOAD_STATE_DIR,
+    defaulting to a directory in the system's temporary directory.
+    """
+    return os.getenv("BOX_MCP_UPLOAD_STATE_DIR") or os.path.join(
+        tempfile.gettempdir(), "mcp-server-box-uploads"
+    )
+
+
+def get_cache_dir() -> str:
+    """
+    Directory of the local caches of Box content. Read from BOX_MCP_CACHE_DIR,
+    defaulting to a directory in the system's temporary directory.
+    """
+    return os.getenv("BOX_MCP_CACHE_DIR") or os.path.join(
+        tempfile.gettempdir(), "mcp-server-box-cache"
+    )
+
+
+def get_content_cache() -> ContentCache:
+    """
+    Return the process-wide cache of downloaded file content.
+    Its total size, in bytes, is read from BOX_MCP_CACHE_MAX_SIZE.
+    """
+    global _content_cache
+    if _content_cache is None:
+        with _content_cache_lock:
+            if _content_cache is None:
+                _content_cache = ContentCache(
+                    os.path.join(get_cache_dir(), "content"),
+                    _positive_env("BOX_MCP_CACHE_MAX_SIZE", int, CACHE_MAX_SIZE),
+                )
+    return _content_cache
+
+
+def get_text_cache() -> TextCache:
+    """
+    Return the process-wide cache of extracted text.
+    The sizes of its tiers, in bytes, are read from
+    BOX_MCP_TEXT_CACHE_MEMORY_SIZE and BOX_MCP_TEXT_CACHE_DISK_SIZE.
+    """
+    global _text_cache
+    if _text_cache is None:
+        with _text_cache_lock:
+            if _text_cache is None:
+                _text_cache = TextCache(
+                    os.path.join(get_cache_dir(), "text"),
+                    memory_size=_positive_env(
+                        "BOX_MCP_TEXT_CACHE_MEMORY_SIZE", int, TEXT_CACHE_MEMORY_SIZE
+                    ),
+                    disk_size=_positive_env(
+                        "BOX_MCP_TEXT_CACHE_DISK_SIZE", int, TEXT_CACHE_DISK_SIZE
+                    ),
+                )
+    return _text_cache
+
+
+@dataclass(frozen=True)
+class HttpSettings:
+    """
+    Connection pooling and timeouts for the HTTP clients that talk to Box.
+
+    Neither HTTP library supports both limits, so each applies to one client:
+    pool_size caps the connections of the async httpx client across all
+    hosts, and max_per_host the connections the sync requests client keeps
+    alive per host. The keep-alive expiry and timeouts apply to both.
+    """
+
+    pool_size: int = HTTP_POOL_SIZE
+    max_per_host: int = HTTP_MAX_PER_HOST
+    keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY
+    connect_timeout: float = HTTP_CONNECT_TIMEOUT
+    read_timeout: float = HTTP_READ_TIMEOUT
+
+
+def get_http_settings() -> HttpSettings:
+    """
+    HTTP pool settings, read from the environment:
+    BOX_MCP_HTTP_POOL_SIZE, BOX_MCP_HTTP_MAX_PER_HOST, BOX_MCP_HTTP_KEEPALIVE,
+    BOX_MCP_HTTP_CONNECT_TIMEOUT and BOX_MCP_HTTP_READ_TIMEOUT.
+    """
+    return HttpSettings(
+        pool_size=_positive_env("BOX_MCP_HTTP_POOL_SIZE", int, HTTP_POOL_SIZE),
+        max_per_host=_positive_env("BOX_MCP_HTTP_MAX_PER_HOST", int, HTTP_MAX_PER_HOST),
+        keepalive_expiry=_positive_env(
+            "BOX_MCP_HTTP_KEEPALIVE", float, HTTP_KEEPALIVE_EXPIRY
+        ),
+        connect_timeout=_positive_env(
+            "BOX_MCP_HTTP_CONNECT_TIMEOUT", float, HTTP_CONNECT_TIMEOUT
+        ),
+        read_timeout=_positive_env(
+            "BOX_MCP_HTTP_READ_TIMEOUT", float, HTTP_READ_TIMEOUT
+        ),
+    )
+
+
+class KeepAliveSession(requests.Session):
+    """
+    requests session for the sync Box client with configurable pooling.
+
+    Each host keeps up to max_per_host connections alive, so concurrent calls
+    from the executor reuse TLS connections instead of handshaking again.
+    requests has no limit across hosts, so pool_size does not apply here.
+    The configured timeouts replace the ones hard-coded in the SDK's network
+    client, and pooled connections are dropped once the session has been idle
+    for longer than the keep-alive expiry, before Box closes them on its side.
+    """
+
+    def __init__(self, settings: HttpSettings):
+        super().__init__()
+        self.settings = settings
+        self._last_used: float | None = None
+        adapter = HTTPAdapter(
+            # The number of per-host pools cached, not of connections
+            pool_connections=HTTP_HOST_POOLS,
+            pool_maxsize=settings.max_per_host,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        now = time.monotonic()
+        last_used, self._last_used = self._last_used, now
+        if last_used is not None and now - last_used > self.settings.keepalive_expiry:
+            self.close()
+        kwargs["timeout"] = (self.settings.connect_timeout, self.settings.read_timeout)
+        return super().request(method, url, *args, **kwargs)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Return the process-wide executor for blocking Box API calls.
+
+    In stateless HTTP mode the lifespan is entered once per request, so the pool
+    is created on first use and shared instead of being built per lifespan.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_max_workers(), thread_name_prefix="box-api"
+                )
+    return _executor
+
+
+def get_rate_limiter() -> RateLimitScheduler:
+    """
+    Return the process-wide scheduler of Box API calls.
+    The rate of each endpoint class, in requests per second, is read from
+    BOX_MCP_RATE_LIMIT_SEARCH, _AI, _UPLOAD, _METADATA and _DOCGEN, and the
+    number of times a throttled call is queued again from
+    BOX_MCP_RATE_LIMIT_RETRIES.
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimitScheduler(
+                    {
+                        name: _positive_env(
+                            f"BOX_MCP_RATE_LIMIT_{name.upper()}", float, rate
+                        )
+                        for name, rate in RATE_LIMITS.items()
+                    },
+                    max_retries=_positive_env(
+                        "BOX_MCP_RATE_LIMIT_RETRIES", int, RATE_LIMIT_RETRIES
+                    ),
+                )
+    return _rate_limiter
+
+
+def create_network_session(settings: HttpSettings) -> NetworkSession:
+    """
+    Build an SDK network session backed by a pooled keep-alive session,
+    whose requests are scheduled around Box's rate limits.
+    """
+    scheduler = get_rate_limiter()
+    return NetworkSession(
+        network_client=RateLimitedNetworkClient(KeepAliveSession(settings), scheduler),
+        retry_strategy=RateLimitRetryStrategy(scheduler),
+    )
+
+
+def create_ccg_client() -> BoxClient:
+    """
+    Build a pooled CCG Box client whose token exchanges are single-flight.
+    When BOX_MCP_TOKEN_CACHE names a file, the token is shared through it
+    with every other process using the same file.
+    """
+    config = get_ccg_config()
+    token_cache = os.getenv("BOX_MCP_TOKEN_CACHE")
+    if token_cache:
+        config.token_storage = SharedTokenStorage(token_cache)
+    auth = SingleFlightCCGAuth(config)
+    network_session = create_network_session(get_http_settings())
+    return add_extra_header_to_box_client(
+        BoxClient(auth, network_session=network_session)
+    )
+
+
+def get_shared_client() -> BoxClient:
+    """
+    Return the process-wide Box client.
+
+    The client, and with it the access-token cache held by its auth, is built
+    once and reused by every lifespan, so stateless HTTP requests do not pay
+    for a new client or a new token exchange each time.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_ccg_client()
+    return _client
+
+
+def get_user_mode() -> str | None:
+    """
+    How per-user clients are built, read from BOX_MCP_USER_MODE:
+    "as-user" impersonates the user with the shared client's token, and
+    "user-token" gives each user a CCG token of their own.
+    Per-user clients are disabled when the variable is unset.
+    """
+    mode = os.getenv("BOX_MCP_USER_MODE")
+    if not mode:
+        return None
+    if mode not in USER_MODES:
+        raise ValueError(f"BOX_MCP_USER_MODE must be one of {', '.join(USER_MODES)}")
+    return mode
+
+
+def create_user_client(client: BoxClient, mode: str, user_id: str) -> BoxClient:
+    """Build a client acting as the given user, sharing the client's connections"""
+    if mode == "as-user":
+        return client.with_as_user_header(user_id)
+    config = CCGConfig(
+        client_id=client.auth.config.client_id,
+        client_secret=client.auth.config.client_secret,
+        user_id=user_id,
+    )
+    return BoxClient(
+        SingleFlightCCGAuth(config), network_session=client.network_session
+    )
+
+
+def get_user_client_pool(client: BoxClient | None) -> UserClientPool | None:
+    """
+    Return the per-user client pool built on the given (shared) client.
+    Returns None when per-user clients are disabled.
+    """
+    global _user_clients
+    mode = get_user_mode()
+    if mode is None or client is None:
+        return None
+    with _user_clients_lock:
+        if _user_clients is None or _user_clients.client is not client:
+            _user_clients = UserClientPool(
+                client,
+                lambda user_id: create_user_client(client, mode, user_id),
+                max_size=_positive_env("BOX_MCP_USER_POOL_SIZE", int, USER_POOL_SIZE),
+                idle_timeout=_positive_env(
+                    "BOX_MCP_USER_IDLE_TIMEOUT", float, USER_IDLE_TIMEOUT
+                ),
+            )
+        return _user_clients
+
+
+def get_token_manager(client: BoxClient | None) -> TokenManager | None:
+    """
+    Return the running token manager for the given (shared) client.
+    Returns None when the client does not use single-flight CCG auth.
+    """
+    global _token_manager
+    auth = getattr(client, "auth", None)
+    if not isinstance(auth, SingleFlightCCGAuth):
+        return None
+    with _token_manager_lock:
+        if _token_manager is None or _token_manager.auth is not auth:
+            if _token_manager is not None:
+                _token_manager.stop()
+            _token_manager = TokenManager(auth)
+        _token_manager.start()
+        return _token_manager
+
+
+def get_http_client(
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+) -> httpx.AsyncClient:
+    """
+    Return the pooled async HTTP client for an event loop, by default the
+    running one. Threads outside the loop must name it.
+
+    Connections are kept alive and shared by every request on the loop, up to
+    pool_size across all hosts; httpx has no per-host limit, so max_per_host
+    does not apply here. The client is bound to the loop it was built for, so
+    a new one is built if the server runs on a different loop.
+    """
+    global _http_client, _http_client_loop
+    if loop is None:
+        loop = asyncio.get_running_loop()
+    with _http_client_lock:
+        if _http_client is None or _http_client_loop is not loop:
+            settings = get_http_settings()
+            _http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.pool_size,
+                    max_keepalive_connections=settings.pool_size,
+                    keepalive_expiry=settings.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(
+                    settings.read_timeout, connect=settings.connect_timeout
+                ),
+            )
+            _http_client_loop = loop
+        return _http_client
 
 
 @dataclass
 class BoxContext:
     client: BoxClient | None = None
+    executor: ThreadPoolExecutor | None = None
+    token_manager: TokenManager | None = None
+    http_client: httpx.AsyncClient | None = None
+    user_clients: UserClientPool | None = None
+
+
+def create_box_context(
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+) -> BoxContext:
+    """
+    Build a context holding the shared Box client and resources, for an
+    event loop, by default the running one
+    """
+    client = get_shared_client()
+    return BoxContext(
+        client=client,
+        executor=get_executor(),
+        token_manager=get_token_manager(client),
+        http_client=get_http_client(loop),
+        user_clients=get_user_client_pool(client),
+    )
 
 
 @asynccontextmanager
 async def box_lifespan(server: FastMCP) -> AsyncIterator[BoxContext]:
     """Manage Box client lifecycle with OAuth handling"""
     try:
-        client = get_ccg_client()
-        yield BoxContext(client=client)
+        yield create_box_context()
     finally:
-        # Cleanup (if needed)
+        # The executor, token manager and HTTP client outlive the lifespan;
+        # they are shared by every request and released when the process exits
         pass
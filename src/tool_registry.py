@@ -0,0 +1,235 @@
+"""
+Lazy registration of the Box tools and resources.
+
+The tool modules import the Box AI Agents Toolkit and the Box SDK, which
+dominate the server's cold start. Tools are listed from a manifest generated
+from the real functions, and a tool's module is only imported the first time
+the tool is called. The Box context is likewise built on first use instead
+of when the server starts.
+
+Regenerate the manifest after adding or changing a tool:
+
+    python src/tool_registry.py
+"""
+
+import asyncio
+import importlib
+import json
+import os
+from contextlib import asynccontextmanager
+from threading import Lock
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.tools import Tool
+
+TOOL_MANIFEST_PATH = os.path.join(os.path.dirname(__file__), "tool_manifest.json")
+
+# (module, function) of every tool, in registration order
+BOX_TOOLS: List[Tuple[str, str]] = [
+    # Generic tools
+    ("box_tools_generic", "box_who_am_i"),
+    ("box_tools_generic", "box_authorize_app_tool"),
+    # Search Tools
+    ("box_tools_search", "box_search_tool"),
+    ("box_tools_search", "box_search_folder_by_name_tool"),
+    # AI Tools
+    ("box_tools_ai", "box_ai_ask_file_single_tool"),
+    ("box_tools_ai", "box_ai_ask_file_multi_tool"),
+    ("box_tools_ai", "box_ai_ask_hub_tool"),
+    ("box_tools_ai", "box_ai_extract_freeform_tool"),
+    ("box_tools_ai", "box_ai_extract_structured_using_fields_tool"),
+    ("box_tools_ai", "box_ai_extract_structured_using_template_tool"),
+    ("box_tools_ai", "box_ai_extract_structured_enhanced_using_fields_tool"),
+    ("box_tools_ai", "box_ai_extract_structured_enhanced_using_template_tool"),
+    # Document Generation Tools
+    ("box_tools_docgen", "box_docgen_create_batch_tool"),
+    ("box_tools_docgen", "box_docgen_get_job_by_id_tool"),
+    ("box_tools_docgen", "box_docgen_list_jobs_tool"),
+    ("box_tools_docgen", "box_docgen_list_jobs_by_batch_tool"),
+    ("box_tools_docgen", "box_docgen_template_create_tool"),
+    ("box_tools_docgen", "box_docgen_template_list_tool"),
+    # ("box_tools_docgen", "box_docgen_template_delete_tool"), # very dangerous tool, use with caution
+    ("box_tools_docgen", "box_docgen_template_get_by_id_tool"),
+    ("box_tools_docgen", "box_docgen_template_list_tags_tool"),
+    ("box_tools_docgen", "box_docgen_template_list_jobs_tool"),
+    ("box_tools_docgen", "box_docgen_template_get_by_name_tool"),
+    ("box_tools_docgen", "box_docgen_create_single_file_from_user_input_tool"),
+    # File Tools
+    ("box_tools_files", "box_read_tool"),
+    ("box_tools_files", "box_read_multiple_tool"),
+    ("box_tools_files", "box_upload_file_from_path_tool"),
+    ("box_tools_files", "box_upload_folder_tool"),
+    ("box_tools_files", "box_upload_file_from_content_tool"),
+    ("box_tools_files", "box_download_file_tool"),
+    ("box_tools_files", "box_download_folder_tool"),
+    # Folder Tools
+    ("box_tools_folders", "box_list_folder_content_by_folder_id"),
+    ("box_tools_folders", "box_manage_folder_tool"),
+    # Metadata Template Tools
+    ("box_tools_metadata", "box_metadata_template_get_by_name_tool"),
+    ("box_tools_metadata", "box_metadata_set_instance_on_file_tool"),
+    ("box_tools_metadata", "box_metadata_get_instance_on_file_tool"),
+    ("box_tools_metadata", "box_metadata_delete_instance_on_file_tool"),
+    ("box_tools_metadata", "box_metadata_update_instance_on_file_tool"),
+    ("box_tools_metadata", "box_metadata_template_create_tool"),
+]
+
+# Tools returning MCP content, such as images, that is not structured output
+UNSTRUCTURED_TOOLS = {"box_download_file_tool"}
+
+
+def _structured_output(name: str) -> bool | None:
+    """False for tools that must not return structured output, else inferred"""
+    return False if name in UNSTRUCTURED_TOOLS else None
+
+
+class LazyTool:
+    """
+    A tool listed from its manifest entry.
+    The tool's module is imported, and the real Tool built, on the first call.
+    """
+
+    def __init__(self, module: str, entry: Dict[str, Any]):
+        self.module = module
+        self.name: str = entry["name"]
+        self.title: str | None = entry.get("title")
+        self.description: str = entry.get("description", "")
+        self.parameters: Dict[str, Any] = entry["inputSchema"]
+        self.output_schema: Dict[str, Any] | None = entry.get("outputSchema")
+        self.annotations = None
+        self._tool: Tool | None = None
+
+    def resolve(self) -> Tool:
+        """Import the tool's module and build the real Tool"""
+        if self._tool is None:
+            fn = getattr(importlib.import_module(self.module), self.name)
+            self._tool = Tool.from_function(
+                fn, structured_output=_structured_output(self.name)
+            )
+        return self._tool
+
+    async def run(
+        self,
+        arguments: Dict[str, Any],
+        context: Any = None,
+        convert_result: bool = False,
+    ) -> Any:
+        return await self.resolve().run(
+            arguments, context=context, convert_result=convert_result
+        )
+
+
+def load_tool_manifest(path: str = TOOL_MANIFEST_PATH) -> Dict[str, Dict[str, Any]]:
+    """Load the tool manifest, keyed by tool name. Empty if there is none."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {entry["name"]: entry for entry in json.load(f)}
+    except FileNotFoundError:
+        return {}
+
+
+def register_box_tools(mcp: FastMCP, lazy: bool = True) -> None:
+    """
+    Register every Box tool on the server.
+    Tools without a manifest entry are imported and registered eagerly.
+    """
+    manifest = load_tool_manifest() if lazy else {}
+    for module, name in BOX_TOOLS:
+        entry = manifest.get(name)
+        if entry is not None and entry.get("module") == module:
+            # FastMCP has no public API to add a prebuilt tool; the tool
+            # registry tests fail if its private tool table changes
+            mcp._tool_manager._tools[name] = LazyTool(module, entry)
+        else:
+            mcp.tool(structured_output=_structured_output(name))(
+                getattr(importlib.import_module(module), name)
+            )
+
+
+def register_box_resources(mcp: FastMCP) -> None:
+    """
+    Register the box://file resource templates on the server.
+    Like the tools, their implementation in box_resources is only imported
+    the first time a resource is read.
+    """
+
+    def reader(name: str) -> Any:
+        return getattr(importlib.import_module("box_resources"), name)
+
+    @mcp.resource("box://file/{file_id}", name="box_file", mime_type="application/json")
+    async def box_file(file_id: str) -> str:
+        """
+        The current version of a Box file: its name, size, SHA1, version ID
+        and modification time, and the URIs to read its content and text by
+        range. Ranges read earlier are current while the SHA1 is unchanged.
+        """
+        return await reader("read_file_info")(mcp.get_context(), file_id)
+
+    @mcp.resource(
+        "box://file/{file_id}/bytes/{start}-{end}",
+        name="box_file_bytes",
+        mime_type="application/octet-stream",
+    )
+    async def box_file_bytes(file_id: str, start: int, end: int) -> bytes:
+        """Bytes start to end (excluded) of a Box file's content"""
+        return await reader("read_file_bytes")(mcp.get_context(), file_id, start, end)
+
+    @mcp.resource("box://file/{file_id}/text", name="box_file_text")
+    async def box_file_text(file_id: str) -> str:
+        """The whole extracted text of a Box file"""
+        return await reader("read_file_text")(mcp.get_context(), file_id)
+
+    @mcp.resource("box://file/{file_id}/text/{start}-{end}", name="box_file_text_range")
+    async def box_file_text_range(file_id: str, start: int, end: int) -> str:
+        """Characters start to end (excluded) of a Box file's extracted text"""
+        return await reader("read_file_text_range")(
+            mcp.get_context(), file_id, start, end
+        )
+
+
+async def build_tool_manifest() -> List[Dict[str, Any]]:
+    """Import every tool and describe it the way tools/list does"""
+    mcp = FastMCP("Box MCP Server")
+    register_box_tools(mcp, lazy=False)
+    modules = {name: module for module, name in BOX_TOOLS}
+    return [
+        {"module": modules[tool.name], **tool.model_dump(exclude_none=True)}
+        for tool in await mcp.list_tools()
+    ]
+
+
+class LazyBoxContext:
+    """
+    Lifespan context that builds the Box context on first attribute access.
+    Starting the server does not build the Box client or import the SDK.
+    The first access may come from a worker thread, so the context is built
+    for the event loop that entered the lifespan rather than the running one.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._context = None
+        self._lock = Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        if self._context is None:
+            with self._lock:
+                if self._context is None:
+                    from server_context import create_box_context
+
+                    self._context = create_box_context(self._loop)
+        return getattr(self._context, name)
+
+
+@asynccontextmanager
+async def lazy_box_lifespan(server: FastMCP) -> AsyncIterator[LazyBoxContext]:
+    """Manage the Box context lazily, see server_context.box_lifespan"""
+    yield LazyBoxContext(asyncio.get_running_loop())
+
+
+if __name__ == "__main__":
+    manifest = asyncio.run(build_tool_manifest())
+    with open(TOOL_MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
@@ -0,0 +1,436 @@
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from box_ai_agents_toolkit import SearchForContentContentTypes
+from box_sdk_gen import AccessToken, CCGConfig, InMemoryTokenStorage
+
+from box_api_async import BoxAsyncAPI
+from rate_limits import RateLimitedNetworkClient, RateLimitScheduler
+from server_context import SingleFlightCCGAuth
+
+API_URL = "https://api.box.com/2.0"
+
+
+def make_token(access_token):
+    token = MagicMock()
+    token.access_token = access_token
+    return token
+
+
+@pytest.fixture
+def mock_box_client():
+    """Mock Box client fixture with a cached token"""
+    client = MagicMock()
+    client.network_session.base_urls.base_url = "https://api.box.com"
+    client.network_session.additional_headers = {"x-box-ai-library": "mcp-server-box"}
+    client.auth.cached_token.return_value = make_token("cached-token")
+    client.auth.refresh_token.return_value = make_token("refreshed-token")
+    return client
+
+
+def make_api(client, handler):
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return BoxAsyncAPI(client, http_client)
+
+
+@pytest.mark.asyncio
+async def test_request_sends_auth_and_extra_headers(mock_box_client):
+    """Test requests carry the cached token and the client's extra headers"""
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json={"id": "1", "type": "user"})
+
+    api = make_api(mock_box_client, handler)
+    result = await api.get_user_me()
+
+    assert result == {"id": "1", "type": "user"}
+    assert str(seen[0].url) == f"{API_URL}/users/me"
+    assert seen[0].headers["Authorization"] == "Bearer cached-token"
+    assert seen[0].headers["x-box-ai-library"] == "mcp-server-box"
+    mock_box_client.auth.retrieve_token.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_request_retrieves_token_when_not_cached(mock_box_client):
+    """Test a missing cached token is retrieved through the auth"""
+    mock_box_client.auth.cached_token.return_value = None
+    mock_box_client.auth.retrieve_token.return_value = make_token("new-token")
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers["Authorization"])
+        return httpx.Response(200, json={})
+
+    api = make_api(mock_box_client, handler)
+    await api.get_user_me()
+
+    assert seen == ["Bearer new-token"]
+    mock_box_client.auth.retrieve_token.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_request_refreshes_token_once_on_401(mock_box_client):
+    """Test a 401 refreshes the token and retries the request"""
+    tokens = [make_token("stale-token"), make_token("refreshed-token")]
+    mock_box_client.auth.cached_token.side_effect = tokens
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers["Authorization"])
+        if request.headers["Authorization"] == "Bearer stale-token":
+            return httpx.Response(401)
+        return httpx.Response(200, json={"id": "1"})
+
+    api = make_api(mock_box_client, handler)
+    result = await api.get_user_me()
+
+    assert result == {"id": "1"}
+    assert seen == ["Bearer stale-token", "Bearer refreshed-token"]
+    mock_box_client.auth.refresh_token.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_request_401_refreshes_the_rejected_token(mock_box_client):
+    """Test the token a 401 rejected is passed to single-flight auth"""
+    auth = MagicMock(spec=SingleFlightCCGAuth)
+    auth.cached_token.side_effect = [make_token("stale-token"), make_token("new")]
+    auth.refresh_token.return_value = make_token("new")
+    mock_box_client.auth = auth
+
+    def handler(request):
+        if request.headers["Authorization"] == "Bearer stale-token":
+            return httpx.Response(401)
+        return httpx.Response(200, json={"id": "1"})
+
+    api = make_api(mock_box_client, handler)
+    await api.get_user_me()
+
+    auth.refresh_token.assert_called_once_with(rejected_token="stale-token")
+
+
+@pytest.mark.asyncio
+async def test_burst_of_401s_exchanges_credentials_once(mock_box_client):
+    """Test requests rejected with the same token share one exchange"""
+    exchanges = []
+
+    def request_access_token(*args, **kwargs):
+        exchanges.append(1)
+        return AccessToken(access_token=f"token-{len(exchanges)}", expires_in=3600)
+
+    auth = SingleFlightCCGAuth(
+        CCGConfig(
+            client_id="client_id",
+            client_secret="client_secret",
+            enterprise_id="12345",
+            token_storage=InMemoryTokenStorage(),
+        )
+    )
+    mock_box_client.auth = auth
+
+    def handler(request):
+        if request.headers["Authorization"] == "Bearer token-1":
+            return httpx.Response(401)
+        return httpx.Response(200, json={"id": "1"})
+
+    api = make_api(mock_box_client, handler)
+    with patch("box_sdk_gen.box.ccg_auth.AuthorizationManager") as mock_manager:
+        mock_manager.return_value.request_access_token.side_effect = (
+            request_access_token
+        )
+        auth.retrieve_token()
+        results = await asyncio.gather(*(api.get_user_me() for _ in range(20)))
+
+    assert results == [{"id": "1"}] * 20
+    assert len(exchanges) == 2
+
+
+@pytest.mark.asyncio
+async def test_request_gives_up_after_second_401(mock_box_client):
+    """Test a persistent 401 is raised after one refresh"""
+    api = make_api(mock_box_client, lambda request: httpx.Response(401))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await api.get_user_me()
+
+    mock_box_client.auth.refresh_token.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("box_api_async.asyncio.sleep")
+async def test_request_honors_retry_after(mock_sleep, mock_box_client):
+    """Test 429 responses are retried after the server's Retry-After"""
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "2"}),
+        httpx.Response(200, json={"id": "1"}),
+    ]
+    api = make_api(mock_box_client, lambda request: responses.pop(0))
+
+    result = await api.get_user_me()
+
+    assert result == {"id": "1"}
+    mock_sleep.assert_awaited_once_with(2.0)
+
+
+@pytest.mark.asyncio
+@patch("box_api_async.asyncio.sleep")
+async def test_request_stops_retrying_after_max_attempts(mock_sleep, mock_box_client):
+    """Test server errors are raised once the retry budget is spent"""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    api = make_api(mock_box_client, handler)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await api.get_user_me()
+
+    assert len(calls) == 5
+    assert mock_sleep.await_count == 4
+
+
+@pytest.mark.asyncio
+@patch("rate_limits.asyncio.sleep")
+async def test_request_queues_429_in_rate_limiter(mock_sleep, mock_box_client):
+    """Test 429s pause the endpoint class and queue past the retry budget"""
+    scheduler = RateLimitScheduler()
+    mock_box_client.network_session.network_client = RateLimitedNetworkClient(
+        MagicMock(), scheduler
+    )
+    responses = [httpx.Response(429, headers={"Retry-After": "2"})] * 6 + [
+        httpx.Response(200, json={"entries": []})
+    ]
+    api = make_api(mock_box_client, lambda request: responses.pop(0))
+
+    result = await api.search("report")
+
+    assert result == []
+    stats = scheduler.stats()["search"]
+    assert stats["requests"] == 7
+    assert stats["throttled"] == 6
+    # Every retry waits out Retry-After in the queue, not in a retry backoff
+    assert mock_sleep.await_count == 6
+    assert all(call.args[0] > 1.9 for call in mock_sleep.await_args_list)
+
+
+@pytest.mark.asyncio
+@patch("rate_limits.asyncio.sleep")
+async def test_request_raises_after_rate_limit_retries(mock_sleep, mock_box_client):
+    """Test a call still throttled after max_retries raises the 429"""
+    scheduler = RateLimitScheduler(max_retries=2)
+    mock_box_client.network_session.network_client = RateLimitedNetworkClient(
+        MagicMock(), scheduler
+    )
+    api = make_api(mock_box_client, lambda request: httpx.Response(429))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await api.search("report")
+
+    assert scheduler.stats()["search"]["requests"] == 3
+
+
+@pytest.mark.asyncio
+async def test_search_params(mock_box_client):
+    """Test search sends the same filters and fields as box_search"""
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json={"entries": [{"id": "1", "type": "file"}]})
+
+    api = make_api(mock_box_client, handler)
+    result = await api.search(
+        "report",
+        file_extensions=["pdf", "docx"],
+        content_types=[SearchForContentContentTypes.NAME],
+        ancestor_folder_ids=["0"],
+    )
+
+    assert result == [{"id": "1", "type": "file"}]
+    params = seen[0].url.params
+    assert seen[0].url.path == "/2.0/search"
+    assert params["query"] == "report"
+    assert params["type"] == "file"
+    assert params["fields"] == "id,name,type,size,description"
+    assert params["file_extensions"] == "pdf,docx"
+    assert params["content_types"] == "name"
+    assert params["ancestor_folder_ids"] == "0"
+
+
+@pytest.mark.asyncio
+async def test_folder_list_content_follows_markers(mock_box_client):
+    """Test folder listings follow next_marker across pages and skip web links"""
+    pages = {
+        None: {
+            "entries": [
+                {"id": "1", "name": "a.txt", "type": "file"},
+                {"id": "2", "name": "link", "type": "web_link"},
+            ],
+            "next_marker": "m1",
+        },
+        "m1": {"entries": [{"id": "3", "name": "b.txt", "type": "file"}]},
+    }
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.params)
+        return httpx.Response(200, json=pages[request.url.params.get("marker")])
+
+    api = make_api(mock_box_client, handler)
+    result = await api.folder_list_content("0")
+
+    assert [item["id"] for item in result] == ["1", "3"]
+    assert seen[0]["usemarker"] == "true"
+    assert "marker" not in seen[0]
+    assert seen[1]["marker"] == "m1"
+
+
+@pytest.mark.asyncio
+async def test_folder_list_page_asks_for_one_page(mock_box_client):
+    """Test a page is fetched with its limit, marker and fields only"""
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.params)
+        return httpx.Response(
+            200,
+            json={
+                "entries": [
+                    {"id": "1", "type": "file", "size": 5},
+                    {"id": "2", "type": "web_link"},
+                ],
+                "next_marker": "",
+            },
+        )
+
+    api = make_api(mock_box_client, handler)
+    page = await api.folder_list_page("0", ["type", "size"], 50, "m1")
+
+    assert page == {
+        "entries": [{"id": "1", "type": "file", "size": 5}],
+        "next_marker": None,
+    }
+    assert seen[0]["fields"] == "type,size"
+    assert seen[0]["limit"] == "50"
+    assert seen[0]["marker"] == "m1"
+
+
+@pytest.mark.asyncio
+async def test_folder_list_content_recursive_order(mock_box_client):
+    """Test recursive listings keep the toolkit order: folder content first"""
+    folders = {
+        "0": [
+            {"id": "10", "name": "sub", "type": "folder"},
+            {"id": "1", "name": "a.txt", "type": "file"},
+        ],
+        "10": [{"id": "2", "name": "b.txt", "type": "file"}],
+    }
+
+    def handler(request):
+        folder_id = request.url.path.split("/")[3]
+        return httpx.Response(200, json={"entries": folders[folder_id]})
+
+    api = make_api(mock_box_client, handler)
+
+    flat = await api.folder_list_content("0")
+    recursive = await api.folder_list_content("0", is_recursive=True)
+
+    assert [item["id"] for item in flat] == ["10", "1"]
+    assert [item["id"] for item in recursive] == ["2", "10", "1"]
+
+
+@pytest.mark.asyncio
+@patch.dict("os.environ", {"BOX_MCP_TRANSFER_CONCURRENCY": "3"})
+async def test_folder_list_content_recursive_bounds_fan_out(mock_box_client):
+    """Test a wide tree is listed a bounded number of folders at a time"""
+    folders = {"0": [{"id": str(i), "type": "folder"} for i in range(1, 21)]}
+    active = 0
+    max_active = 0
+
+    async def handler(request):
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        folder_id = request.url.path.split("/")[3]
+        return httpx.Response(200, json={"entries": folders.get(folder_id, [])})
+
+    api = make_api(mock_box_client, handler)
+    items = await api.folder_list_content("0", is_recursive=True)
+
+    assert len(items) == 20
+    assert max_active == 3
+
+
+def representation(state):
+    return {
+        "representation": "extracted_text",
+        "info": {"url": f"{API_URL}/internal_files/1/versions/1/representations/text"},
+        "status": {"state": state},
+        "content": {"url_template": "https://dl.boxcloud.com/text/{+asset_path}"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_file_text_extract_ready(mock_box_client):
+    """Test a ready extracted text representation is downloaded directly"""
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        if request.url.host == "dl.boxcloud.com":
+            return httpx.Response(200, content="hello world".encode("utf-8"))
+        return httpx.Response(
+            200, json={"representations": {"entries": [representation("success")]}}
+        )
+
+    api = make_api(mock_box_client, handler)
+    result = await api.file_text_extract("1")
+
+    assert result == "hello world"
+    assert seen[0].headers["x-rep-hints"] == "[extracted_text]"
+    # The SHA1 comes with the representations, to key the text cache
+    assert "sha1" in seen[0].url.params["fields"].split(",")
+    assert str(seen[1].url) == "https://dl.boxcloud.com/text/"
+
+
+@pytest.mark.asyncio
+@patch("box_api_async.asyncio.sleep")
+async def test_file_text_extract_polls_until_success(mock_sleep, mock_box_client):
+    """Test a pending representation is polled until it is generated"""
+    states = ["pending", "success"]
+
+    def handler(request):
+        if request.url.host == "dl.boxcloud.com":
+            return httpx.Response(200, content=b"text")
+        if "representations" in request.url.path:
+            return httpx.Response(200, json={"status": {"state": states.pop(0)}})
+        return httpx.Response(
+            200, json={"representations": {"entries": [representation("none")]}}
+        )
+
+    api = make_api(mock_box_client, handler)
+    result = await api.file_text_extract("1")
+
+    assert result == "text"
+    assert states == []
+    mock_sleep.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_file_text_extract_unavailable(mock_box_client):
+    """Test files without an extracted text representation return empty text"""
+
+    def handler(request):
+        return httpx.Response(200, content=json.dumps({"representations": None}))
+
+    api = make_api(mock_box_client, handler)
+
+    assert await api.file_text_extract("1") == ""
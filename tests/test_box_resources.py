@@ -0,0 +1,111 @@
+import datetime
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from content_cache import TextCache
+from tool_registry import register_box_resources
+
+
+@pytest.fixture
+def client():
+    return MagicMock()
+
+
+@pytest.fixture
+def mcp(client):
+    """Server with the file resources, reading through the mock client"""
+    server = FastMCP("resources")
+    register_box_resources(server)
+    ctx = MagicMock()
+    ctx.request_context.lifespan_context.client = client
+    with patch.object(server, "get_context", return_value=ctx):
+        yield server
+
+
+@pytest.fixture(autouse=True)
+def text_cache(tmp_path):
+    cache = TextCache(str(tmp_path / "text"), 1024 * 1024, 1024 * 1024)
+    with patch("box_tools_files.get_text_cache", return_value=cache):
+        yield cache
+
+
+async def read(mcp, uri):
+    (contents,) = await mcp.read_resource(uri)
+    return contents
+
+
+@pytest.mark.asyncio
+async def test_file_resource_templates(mcp):
+    templates = await mcp.list_resource_templates()
+
+    assert {t.name: t.uriTemplate for t in templates} == {
+        "box_file": "box://file/{file_id}",
+        "box_file_bytes": "box://file/{file_id}/bytes/{start}-{end}",
+        "box_file_text": "box://file/{file_id}/text",
+        "box_file_text_range": "box://file/{file_id}/text/{start}-{end}",
+    }
+
+
+@pytest.mark.asyncio
+async def test_file_resource_reports_version(mcp, client):
+    file_info = MagicMock(
+        size=2048,
+        sha1="a" * 40,
+        etag="3",
+        modified_at=datetime.datetime(2025, 1, 2, tzinfo=datetime.timezone.utc),
+    )
+    file_info.name = "report.pdf"
+    file_info.file_version.id = "v42"
+    client.files.get_file_by_id.return_value = file_info
+
+    contents = await read(mcp, "box://file/123")
+
+    assert contents.mime_type == "application/json"
+    info = json.loads(contents.content)
+
+    assert info["sha1"] == "a" * 40
+    assert info["version_id"] == "v42"
+    assert info["modified_at"] == "2025-01-02T00:00:00+00:00"
+    assert info["bytes_uri"] == "box://file/123/bytes/{start}-{end}"
+    assert info["text_range_uri"] == "box://file/123/text/{start}-{end}"
+
+
+@pytest.mark.asyncio
+async def test_file_bytes_resource_downloads_only_the_range(mcp, client):
+    client.downloads.download_file.return_value.read.return_value = b"0123"
+
+    contents = await read(mcp, "box://file/123/bytes/100-104")
+
+    assert contents.content == b"0123"
+    assert contents.mime_type == "application/octet-stream"
+    client.downloads.download_file.assert_called_once_with("123", range="bytes=100-103")
+
+
+@pytest.mark.asyncio
+@patch.dict("os.environ", {"BOX_MCP_MAX_INLINE_SIZE": "1000"})
+async def test_file_bytes_resource_rejects_bad_ranges(mcp, client):
+    with pytest.raises(ValueError, match="end must be after start"):
+        await read(mcp, "box://file/123/bytes/10-10")
+    with pytest.raises(ValueError, match="over the 1000 byte limit"):
+        await read(mcp, "box://file/123/bytes/0-1001")
+
+    client.downloads.download_file.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.box_file_text_extract")
+async def test_file_text_resources_share_cached_text(mock_text_extract, mcp, client):
+    client.files.get_file_by_id.return_value = MagicMock(sha1="a" * 40)
+    mock_text_extract.return_value = "Section 1. Definitions."
+
+    whole = await read(mcp, "box://file/123/text")
+    window = await read(mcp, "box://file/123/text/11-22")
+    past_end = await read(mcp, "box://file/123/text/20-99")
+
+    assert whole.content == "Section 1. Definitions."
+    assert window.content == "Definitions"
+    assert past_end.content == "ns."
+    mock_text_extract.assert_called_once()
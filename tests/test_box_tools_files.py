@@ -1,11 +1,40 @@
+import asyncio
+import base64
+import hashlib
+import io
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
+from box_sdk_gen import BoxAPIError
 
 from box_tools_files import (
     box_download_file_tool,
+    box_download_folder_tool,
+    box_read_multiple_tool,
     box_read_tool,
     box_upload_file_from_content_tool,
     box_upload_file_from_path_tool,
+    box_upload_folder_tool,
 )
+from content_cache import ContentCache, TextCache
+from server_context import get_executor
+
+
+@pytest.fixture(autouse=True)
+def content_cache(tmp_path):
+    """Cache downloads in the test's directory instead of the shared one"""
+    cache = ContentCache(str(tmp_path / "cache"), 1024 * 1024)
+    with patch("box_tools_files.get_content_cache", return_value=cache):
+        yield cache
+
+
+@pytest.fixture(autouse=True)
+def text_cache(tmp_path):
+    """Cache extracted text in the test's directory instead of the shared one"""
+    cache = TextCache(str(tmp_path / "text"), 1024 * 1024, 1024 * 1024)
+    with patch("box_tools_files.get_text_cache", return_value=cache):
+        yield cache
 
 
 @pytest.mark.asyncio
@@ -17,6 +46,358 @@ async def test_box_read_tool(ctx):
     assert "HAB-1-01" in resp
 
 
+@pytest.mark.asyncio
+@patch("box_tools_files.box_file_text_extract")
+@patch("box_tools_files.get_box_async_api")
+async def test_box_read_tool_async_path(mock_get_async_api, mock_text_extract):
+    file_info = {"sha1": "a" * 40, "representations": {"entries": []}}
+    box_api = mock_get_async_api.return_value
+    box_api.file_text_info = AsyncMock(return_value=file_info)
+    box_api.extracted_text = AsyncMock(return_value="HAB-1-01 text")
+
+    resp = await box_read_tool(MagicMock(), "1728677291168")
+
+    assert resp == "HAB-1-01 text"
+    box_api.file_text_info.assert_awaited_once_with("1728677291168")
+    box_api.extracted_text.assert_awaited_once_with(file_info)
+    mock_text_extract.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.get_box_async_api")
+async def test_box_read_tool_caches_text_by_version(mock_get_async_api, text_cache):
+    file_info = {"sha1": "a" * 40}
+    box_api = mock_get_async_api.return_value
+    box_api.file_text_info = AsyncMock(return_value=file_info)
+    box_api.extracted_text = AsyncMock(return_value="contract text")
+
+    first = await box_read_tool(MagicMock(), "1")
+    second = await box_read_tool(MagicMock(), "1")
+
+    assert first == second == "contract text"
+    # The version is checked every time, the text extracted once
+    assert box_api.file_text_info.await_count == 2
+    box_api.extracted_text.assert_awaited_once()
+    assert text_cache.stats()["memory_hits"] == 1
+
+    file_info["sha1"] = "b" * 40
+    box_api.extracted_text.return_value = "amended contract text"
+    assert await box_read_tool(MagicMock(), "1") == "amended contract text"
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.get_box_async_api")
+async def test_box_read_tool_windows(mock_get_async_api):
+    text = "".join(f"Clause {i}. " for i in range(100))
+    box_api = mock_get_async_api.return_value
+    box_api.file_text_info = AsyncMock(return_value={"sha1": "a" * 40})
+    box_api.extracted_text = AsyncMock(return_value=text)
+
+    first = await box_read_tool(MagicMock(), "1", length=100)
+    second = await box_read_tool(MagicMock(), "1", offset=100, length=100)
+    last = await box_read_tool(MagicMock(), "1", offset=len(text) - 10)
+
+    assert first == f"[Characters 0-100 of {len(text)}; next offset 100]\n{text[:100]}"
+    assert second.splitlines()[1] == text[100:200]
+    assert last == (
+        f"[Characters {len(text) - 10}-{len(text)} of {len(text)}; end of text]\n"
+        f"{text[-10:]}"
+    )
+    # The text is extracted once and every window is cut from the cache
+    box_api.extracted_text.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.get_box_async_api")
+async def test_box_read_tool_window_bounds(mock_get_async_api):
+    box_api = mock_get_async_api.return_value
+    box_api.file_text_info = AsyncMock(return_value={"sha1": "a" * 40})
+    box_api.extracted_text = AsyncMock(return_value="short text")
+
+    past_end = await box_read_tool(MagicMock(), "1", offset=50, length=10)
+    negative = await box_read_tool(MagicMock(), "1", offset=-1)
+
+    assert past_end == "[Characters 10-10 of 10; end of text]\n"
+    assert negative == "Error: offset and length must not be negative."
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.get_box_async_api")
+async def test_box_read_tool_does_not_cache_empty_text(mock_get_async_api, text_cache):
+    box_api = mock_get_async_api.return_value
+    box_api.file_text_info = AsyncMock(return_value={"sha1": "a" * 40})
+    box_api.extracted_text = AsyncMock(side_effect=["", "ready now"])
+
+    assert await box_read_tool(MagicMock(), "1") == ""
+    assert await box_read_tool(MagicMock(), "1") == "ready now"
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.get_box_async_api")
+async def test_box_read_multiple_tool_bounds_concurrency(mock_get_async_api):
+    active = peak = 0
+
+    async def extracted_text(file_info):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return f"text of {file_info['id']}"
+
+    box_api = mock_get_async_api.return_value
+    box_api.file_text_info = AsyncMock(
+        side_effect=lambda file_id: {"id": file_id, "sha1": "a" * 40}
+    )
+    box_api.extracted_text = AsyncMock(side_effect=extracted_text)
+    file_ids = [str(i) for i in range(10)]
+
+    results = await box_read_multiple_tool(MagicMock(), file_ids, max_parallel=3)
+
+    assert [r["file_id"] for r in results] == file_ids
+    assert results[4] == {"file_id": "4", "text": "text of 4", "truncated": False}
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.get_box_async_api")
+async def test_box_read_multiple_tool_reports_failures_inline(mock_get_async_api):
+    def file_text_info(file_id):
+        if file_id == "2":
+            raise RuntimeError("Not Found")
+        return {"id": file_id, "sha1": "a" * 40}
+
+    box_api = mock_get_async_api.return_value
+    box_api.file_text_info = AsyncMock(side_effect=file_text_info)
+    box_api.extracted_text = AsyncMock(return_value="contract text")
+
+    results = await box_read_multiple_tool(MagicMock(), ["1", "2", "1"])
+
+    assert results == [
+        {"file_id": "1", "text": "contract text", "truncated": False},
+        {"file_id": "2", "error": "Not Found"},
+        {"file_id": "1", "text": "contract text", "truncated": False},
+    ]
+    # A file listed twice is read once
+    assert box_api.file_text_info.await_count == 2
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.get_box_async_api")
+async def test_box_read_multiple_tool_caps_bytes_per_file(mock_get_async_api):
+    box_api = mock_get_async_api.return_value
+    box_api.file_text_info = AsyncMock(return_value={"sha1": "a" * 40})
+    box_api.extracted_text = AsyncMock(return_value="Größe")
+
+    (result,) = await box_read_multiple_tool(MagicMock(), ["1"], max_bytes_per_file=3)
+    negative = await box_read_multiple_tool(MagicMock(), ["1"], max_parallel=-1)
+
+    # "ö" takes two bytes and is not cut in half
+    assert result == {"file_id": "1", "text": "Gr", "truncated": True}
+    assert negative == [
+        {"error": "max_bytes_per_file and max_parallel must not be negative."}
+    ]
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.box_file_text_extract")
+@patch("box_tools_files.get_box_async_api", return_value=None)
+@patch("box_tools_files.get_box_client")
+async def test_box_read_tool_toolkit_path_uses_cache(
+    mock_get_client, mock_get_async_api, mock_text_extract
+):
+    mock_get_client.return_value.files.get_file_by_id.return_value = MagicMock(
+        sha1="a" * 40
+    )
+    mock_text_extract.return_value = "report text"
+
+    assert await box_read_tool(MagicMock(), "1") == "report text"
+    assert await box_read_tool(MagicMock(), "1") == "report text"
+
+    mock_text_extract.assert_called_once_with(mock_get_client.return_value, "1")
+    mock_get_client.return_value.files.get_file_by_id.assert_called_with(
+        "1", fields=["sha1"]
+    )
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.download_file_content")
+@patch("box_tools_files.download_file_to_path")
+@patch("box_tools_files.get_box_client")
+async def test_box_download_file_tool_stream(
+    mock_get_client, mock_download_to_path, mock_download_content
+):
+    mock_download_to_path.return_value = {
+        "path": "/tmp/video.mp4",
+        "size": 2_000_000_000,
+        "sha1": "a" * 40,
+    }
+    resp = await box_download_file_tool(
+        MagicMock(), "1823610366483", save_path="/tmp", stream=True
+    )
+
+    assert resp == (
+        f"File saved to: /tmp/video.mp4\nSize: 2000000000 bytes\nSHA1: {'a' * 40}"
+    )
+    mock_download_to_path.assert_called_once_with(
+        mock_get_client.return_value, "1823610366483", "/tmp"
+    )
+    mock_download_content.assert_not_called()
+
+
+def mock_file_client(name, size, content=b""):
+    client = MagicMock()
+    client.files.get_file_by_id.return_value = MagicMock(
+        size=size, sha1=hashlib.sha1(content).hexdigest()
+    )
+    client.files.get_file_by_id.return_value.name = name
+    client.downloads.download_file.return_value.read.return_value = content
+    client.downloads.download_file_to_output_stream.side_effect = (
+        lambda file_id, output_stream: output_stream.write(content)
+    )
+    return client
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.get_box_client")
+async def test_box_download_file_tool_returns_small_text(mock_get_client):
+    mock_get_client.return_value = mock_file_client("notes.txt", 5, b"hello")
+
+    resp = await box_download_file_tool(MagicMock(), "1")
+
+    assert resp == "File downloaded successfully: notes.txt\n\nhello"
+    mock_get_client.return_value.files.get_file_by_id.assert_called_once_with(
+        "1", fields=["name", "size", "sha1"]
+    )
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.get_box_client")
+async def test_box_download_file_tool_serves_unchanged_file_from_cache(
+    mock_get_client, content_cache
+):
+    client = mock_file_client("notes.txt", 5, b"hello")
+    mock_get_client.return_value = client
+
+    first = await box_download_file_tool(MagicMock(), "1")
+    second = await box_download_file_tool(MagicMock(), "1")
+
+    assert first == second == "File downloaded successfully: notes.txt\n\nhello"
+    # The file's info is checked every time, the content downloaded once
+    assert client.files.get_file_by_id.call_count == 2
+    client.downloads.download_file_to_output_stream.assert_called_once()
+    assert content_cache.stats()["hits"] == 1
+
+    # A new version of the file is downloaded again
+    client.files.get_file_by_id.return_value.sha1 = hashlib.sha1(b"hello!").hexdigest()
+    client.downloads.download_file_to_output_stream.side_effect = (
+        lambda file_id, output_stream: output_stream.write(b"hello!")
+    )
+    third = await box_download_file_tool(MagicMock(), "1")
+
+    assert third == "File downloaded successfully: notes.txt\n\nhello!"
+    assert content_cache.stats()["entries"] == 1
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.get_box_client")
+async def test_box_download_file_tool_skips_unsupported_type(mock_get_client):
+    mock_get_client.return_value = mock_file_client("movie.mp4", 5_000_000)
+
+    resp = await box_download_file_tool(MagicMock(), "1")
+
+    assert "unsupported type (video/mp4)" in resp
+    mock_get_client.return_value.downloads.download_file.assert_not_called()
+    mock_get_client.return_value.downloads.download_file_to_output_stream.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch.dict("os.environ", {"BOX_MCP_MAX_INLINE_SIZE": "1000"})
+@patch("box_tools_files.get_box_client")
+async def test_box_download_file_tool_skips_oversized_file(mock_get_client):
+    mock_get_client.return_value = mock_file_client("photo.png", 1001)
+
+    resp = await box_download_file_tool(MagicMock(), "1", original=True)
+
+    assert resp == (
+        "File photo.png is 1001 bytes, over the 1000 byte limit. "
+        "Use save_file or stream to save it locally."
+    )
+    mock_get_client.return_value.downloads.download_file.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch.dict("os.environ", {"BOX_MCP_MAX_INLINE_SIZE": "1000"})
+@patch("box_tools_files.download_file_to_path")
+@patch("box_tools_files.get_box_client")
+async def test_box_download_file_tool_streams_oversized_file_to_save(
+    mock_get_client, mock_download_to_path
+):
+    mock_get_client.return_value = mock_file_client("photo.png", 1001)
+    mock_download_to_path.return_value = {"path": "/tmp/photo.png"}
+
+    resp = await box_download_file_tool(
+        MagicMock(), "1", save_file=True, save_path="/tmp", original=True
+    )
+
+    assert resp.startswith("File saved to: /tmp/photo.png\n\n")
+    assert resp.endswith("but was saved successfully.")
+    # Saved with the file info already fetched, without asking Box again
+    mock_download_to_path.assert_called_once_with(
+        mock_get_client.return_value,
+        "1",
+        "/tmp",
+        mock_get_client.return_value.files.get_file_by_id.return_value,
+    )
+    mock_get_client.return_value.files.get_file_by_id.assert_called_once()
+    mock_get_client.return_value.downloads.download_file.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch.dict("os.environ", {"BOX_MCP_MAX_INLINE_SIZE": "1000"})
+@patch("box_tools_files.get_box_client")
+async def test_box_download_file_tool_returns_image_thumbnail(mock_get_client):
+    client = mock_file_client("photo.png", 5_000_000)
+    client.files.get_file_thumbnail_by_id.return_value = io.BytesIO(b"thumbnail")
+    mock_get_client.return_value = client
+
+    text, image = await box_download_file_tool(MagicMock(), "1", max_image_size=160)
+
+    assert text.startswith("Thumbnail of photo.png, at most 160 pixels a side.")
+    assert image.to_image_content().mimeType == "image/jpeg"
+    assert image.data == b"thumbnail"
+    # The original is never downloaded, however large
+    client.downloads.download_file.assert_not_called()
+    client.downloads.download_file_to_output_stream.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.get_box_client")
+async def test_box_download_file_tool_thumbnail_not_ready(mock_get_client):
+    client = mock_file_client("photo.png", 5_000_000)
+    client.files.get_file_thumbnail_by_id.return_value = None
+    mock_get_client.return_value = client
+
+    resp = await box_download_file_tool(MagicMock(), "1")
+
+    assert resp.startswith("No thumbnail of photo.png is ready yet.")
+    client.downloads.download_file_to_output_stream.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.get_box_client")
+async def test_box_download_file_tool_returns_original_image(mock_get_client):
+    client = mock_file_client("photo.png", 5, b"\x89PNG")
+    mock_get_client.return_value = client
+
+    text, image = await box_download_file_tool(MagicMock(), "1", original=True)
+
+    assert text == "Image downloaded successfully: photo.png"
+    assert image.data == b"\x89PNG"
+    assert image.to_image_content().mimeType == "image/png"
+    client.files.get_file_thumbnail_by_id.assert_not_called()
+
+
 @pytest.mark.skip
 @pytest.mark.asyncio
 async def test_box_download_file_tool(ctx):
@@ -32,6 +413,209 @@ async def test_box_download_file_tool(ctx):
     assert len(file_content) > 0
 
 
+@pytest.mark.asyncio
+@patch.dict("os.environ", {"BOX_MCP_UPLOAD_CONCURRENCY": "2"})
+@patch("box_tools_files.CHUNKED_UPLOAD_THRESHOLD", 10)
+@patch("box_tools_files.upload_file_from_path")
+@patch("box_tools_files.upload_file_chunked")
+@patch("box_tools_files.get_box_client")
+async def test_box_upload_file_from_path_tool_chunked(
+    mock_get_client, mock_upload_chunked, mock_upload_file, tmp_path
+):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"0" * 10)
+    mock_upload_chunked.return_value = {"id": "12345", "name": "video.mp4"}
+
+    resp = await box_upload_file_from_path_tool(
+        MagicMock(), str(path), "0", upload_session_id="session-1"
+    )
+
+    assert resp == "File uploaded successfully. File ID: 12345, Name: video.mp4"
+    args, kwargs = mock_upload_chunked.call_args
+    assert args == (mock_get_client.return_value, str(path), "0", "video.mp4")
+    assert kwargs["concurrency"] == 2
+    assert kwargs["upload_session_id"] == "session-1"
+    mock_upload_file.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.upload_file_chunked")
+@patch("box_tools_files.get_box_client")
+async def test_box_upload_file_from_path_tool_streams_any_type(
+    mock_get_client, mock_upload_chunked, tmp_path
+):
+    # Latin-1 text and unknown binary types are uploaded byte for byte
+    files = [("prices.csv", "café".encode("latin-1")), ("a.zip", b"PK\x03\x04")]
+    for name, content in files:
+        path = tmp_path / name
+        path.write_bytes(content)
+        uploaded = []
+
+        def upload_file(attributes, file, content_md_5):
+            uploaded.append((attributes.name, file.read(), content_md_5))
+            entry = MagicMock(id="1", type="file")
+            entry.name = attributes.name
+            return MagicMock(entries=[entry])
+
+        mock_get_client.return_value.uploads.upload_file.side_effect = upload_file
+
+        resp = await box_upload_file_from_path_tool(MagicMock(), str(path))
+
+        assert resp == f"File uploaded successfully. File ID: 1, Name: {name}"
+        assert uploaded == [(name, content, hashlib.sha1(content).hexdigest())]
+    mock_upload_chunked.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.upload_file_from_path")
+@patch("box_tools_files.find_conflicting_file")
+@patch("box_tools_files.get_box_client")
+async def test_box_upload_file_from_path_tool_skips_unchanged_file(
+    mock_get_client, mock_find_conflict, mock_upload_file, tmp_path
+):
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"hello")
+    mock_find_conflict.return_value = {
+        "id": "777",
+        "sha1": hashlib.sha1(b"hello").hexdigest(),
+    }
+
+    resp = await box_upload_file_from_path_tool(MagicMock(), str(path), "5")
+
+    assert resp == (
+        "File already in Box with the same content, upload skipped. "
+        "File ID: 777, Name: notes.txt"
+    )
+    mock_find_conflict.assert_called_once_with(
+        mock_get_client.return_value, "5", "notes.txt", 5
+    )
+    mock_upload_file.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.upload_file_from_path")
+@patch("box_tools_files.find_conflicting_file")
+@patch("box_tools_files.get_box_client")
+async def test_box_upload_file_from_path_tool_uploads_changed_file_as_version(
+    mock_get_client, mock_find_conflict, mock_upload_file, tmp_path
+):
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"hello again")
+    mock_find_conflict.return_value = {"id": "777", "sha1": "a" * 40}
+    mock_upload_file.return_value = {"id": "777", "name": "notes.txt"}
+
+    resp = await box_upload_file_from_path_tool(MagicMock(), str(path), "5")
+
+    assert resp == (
+        "File content changed, uploaded as a new version. File ID: 777, Name: notes.txt"
+    )
+    # The file is not hashed again for the upload
+    mock_upload_file.assert_called_once_with(
+        mock_get_client.return_value,
+        str(path),
+        "notes.txt",
+        "5",
+        file_id="777",
+        sha1=hashlib.sha1(b"hello again").hexdigest(),
+    )
+
+
+def mock_upload_client():
+    """Mock Box client that records the content of each upload"""
+    client = MagicMock()
+    client.uploaded = []
+
+    def upload(name, stream, content_md_5, file_id=None):
+        client.uploaded.append((file_id, name, stream.read(), content_md_5))
+        entry = MagicMock(id=file_id or "778", type="file")
+        entry.name = name
+        return MagicMock(entries=[entry])
+
+    client.uploads.upload_file.side_effect = lambda attributes, stream, content_md_5: (
+        upload(attributes.name, stream, content_md_5)
+    )
+    client.uploads.upload_file_version.side_effect = (
+        lambda file_id, attributes, stream, content_md_5: upload(
+            attributes.name, stream, content_md_5, file_id
+        )
+    )
+    return client
+
+
+def file_conflict(content):
+    """Preflight error for a file of the same name with the given content"""
+    return BoxAPIError(
+        request_info=MagicMock(),
+        response_info=MagicMock(
+            status_code=409,
+            context_info={
+                "conflicts": {
+                    "type": "file",
+                    "id": "777",
+                    "sha1": hashlib.sha1(content).hexdigest(),
+                }
+            },
+        ),
+        message="Item with the same name already exists",
+    )
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.get_box_client")
+async def test_box_upload_file_from_content_tool_deduplicates(mock_get_client):
+    client = mock_upload_client()
+    mock_get_client.return_value = client
+    preflight = client.uploads.preflight_file_upload_check
+
+    preflight.side_effect = file_conflict(b"hello")
+    unchanged = await box_upload_file_from_content_tool(
+        MagicMock(), "hello", "notes.txt"
+    )
+    preflight.side_effect = file_conflict(b"older")
+    changed = await box_upload_file_from_content_tool(
+        MagicMock(), "aGVsbG8=", "notes.txt", is_base64=True
+    )
+    preflight.side_effect = None
+    new = await box_upload_file_from_content_tool(MagicMock(), "hello", "new.txt")
+
+    assert unchanged.startswith("File already in Box with the same content")
+    assert changed.startswith("File content changed, uploaded as a new version.")
+    assert new == "File uploaded successfully. File ID: 778, Name: new.txt"
+    sha1 = hashlib.sha1(b"hello").hexdigest()
+    assert client.uploaded == [
+        ("777", "notes.txt", b"hello", sha1),
+        (None, "new.txt", b"hello", sha1),
+    ]
+    assert preflight.call_args.kwargs["size"] == 5
+
+
+@pytest.mark.asyncio
+@patch("box_transfer.SPOOL_MAX_MEMORY", 1024)
+@patch("box_transfer.SPOOL_CHUNK_SIZE", 64)
+@patch("box_tools_files.get_box_client")
+async def test_box_upload_file_from_content_tool_decodes_in_chunks(mock_get_client):
+    client = mock_upload_client()
+    mock_get_client.return_value = client
+    content = os.urandom(5000)
+    # Line breaks every 76 characters, as MIME base64 has
+    encoded = base64.encodebytes(content).decode("ascii")
+
+    resp = await box_upload_file_from_content_tool(
+        MagicMock(), encoded, "blob.bin", is_base64=True
+    )
+    text = await box_upload_file_from_content_tool(MagicMock(), "café", "menu.txt")
+    bad = await box_upload_file_from_content_tool(
+        MagicMock(), "aGVsbG8", "x.bin", is_base64=True
+    )
+
+    assert resp == "File uploaded successfully. File ID: 778, Name: blob.bin"
+    assert client.uploaded[0][2:] == (content, hashlib.sha1(content).hexdigest())
+    assert text == "File uploaded successfully. File ID: 778, Name: menu.txt"
+    assert client.uploaded[1][2] == "café".encode("utf-8")
+    assert bad.startswith("Error uploading file:")
+    assert len(client.uploaded) == 2
+
+
 @pytest.mark.skip
 @pytest.mark.asyncio
 async def test_box_upload_file_from_path_tool(ctx):
@@ -56,3 +640,73 @@ async def test_box_upload_file_from_content_tool(ctx):
     assert resp is not None
     assert isinstance(resp, str)
     assert len(resp) > 0
+
+
+@pytest.mark.asyncio
+@patch.dict("os.environ", {"BOX_MCP_TRANSFER_CONCURRENCY": "3"})
+@patch("box_tools_files.upload_directory")
+@patch("box_tools_files.get_box_client")
+async def test_box_upload_folder_tool(mock_get_client, mock_upload_directory, tmp_path):
+    mock_upload_directory.return_value = {"files_uploaded": 2, "files_failed": 0}
+
+    resp = await box_upload_folder_tool(MagicMock(), str(tmp_path), 123)
+
+    assert resp["files_uploaded"] == 2
+    assert "seconds" in resp
+    args, kwargs = mock_upload_directory.call_args
+    assert args == (mock_get_client.return_value, str(tmp_path), "123")
+    assert kwargs["concurrency"] == 3
+    assert kwargs["executor"] is get_executor()
+
+    await box_upload_folder_tool(MagicMock(), str(tmp_path), max_parallel=2)
+    assert mock_upload_directory.call_args.kwargs["concurrency"] == 2
+
+    # Callers cannot go above the server's setting
+    await box_upload_folder_tool(MagicMock(), str(tmp_path), max_parallel=5000)
+    assert mock_upload_directory.call_args.kwargs["concurrency"] == 3
+
+    resp = await box_upload_folder_tool(MagicMock(), str(tmp_path), max_parallel=-1)
+    assert "max_parallel" in resp["error"]
+    assert mock_upload_directory.call_count == 3
+
+
+@pytest.mark.asyncio
+@patch("box_tools_files.upload_directory")
+@patch("box_tools_files.get_box_client")
+async def test_box_upload_folder_tool_missing_directory(
+    mock_get_client, mock_upload_directory, tmp_path
+):
+    resp = await box_upload_folder_tool(MagicMock(), str(tmp_path / "missing"))
+
+    assert "not found" in resp["error"]
+    mock_upload_directory.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch.dict("os.environ", {"BOX_MCP_TRANSFER_CONCURRENCY": "5"})
+@patch("box_tools_files.download_directory")
+@patch("box_tools_files.get_box_client")
+async def test_box_download_folder_tool(
+    mock_get_client, mock_download_directory, tmp_path
+):
+    mock_download_directory.return_value = {"files_downloaded": 3}
+
+    resp = await box_download_folder_tool(MagicMock(), 123, str(tmp_path))
+
+    assert resp["files_downloaded"] == 3
+    assert "seconds" in resp
+    args, kwargs = mock_download_directory.call_args
+    assert args == (mock_get_client.return_value, "123", str(tmp_path))
+    assert kwargs["concurrency"] == 5
+    assert kwargs["executor"] is get_executor()
+
+    await box_download_folder_tool(MagicMock(), "1", str(tmp_path), max_parallel=500)
+    assert mock_download_directory.call_args.kwargs["concurrency"] == 5
+
+    resp = await box_download_folder_tool(MagicMock(), "1", str(tmp_path), -2)
+    assert "max_parallel" in resp["error"]
+    assert mock_download_directory.call_count == 2
+
+    mock_download_directory.side_effect = PermissionError("read-only")
+    resp = await box_download_folder_tool(MagicMock(), "1", str(tmp_path))
+    assert resp == {"error": "Error downloading folder: read-only"}
@@ -1,3 +1,5 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
 
 from box_tools_folders import (
@@ -16,6 +18,121 @@ async def test_box_api_list_content_folders(ctx):
     assert all(item.get("type") in ["file", "folder"] for item in items)
 
 
+@pytest.mark.asyncio
+@patch("box_tools_folders.get_box_async_api")
+async def test_box_api_list_content_async_path(mock_get_async_api):
+    mock_get_async_api.return_value.folder_list_content = AsyncMock(
+        return_value=[
+            {"id": "1", "name": "a", "type": "folder", "etag": "0"},
+            {"id": "2", "name": "b.txt", "type": "file", "description": "B"},
+        ]
+    )
+
+    items = await box_list_folder_content_by_folder_id(MagicMock(), 298939523710, True)
+
+    assert items == [
+        {"id": "1", "type": "folder", "name": "a", "description": None},
+        {"id": "2", "type": "file", "name": "b.txt", "description": "B"},
+    ]
+    mock_get_async_api.return_value.folder_list_content.assert_awaited_once_with(
+        "298939523710", True, ["type", "name", "description"]
+    )
+
+
+@pytest.mark.asyncio
+@patch("box_tools_folders.get_box_async_api")
+async def test_box_api_list_content_page_async_path(mock_get_async_api):
+    """Test a paginated listing returns one page, its marker and the fields"""
+    mock_get_async_api.return_value.folder_list_page = AsyncMock(
+        return_value={
+            "entries": [{"id": "3", "type": "file", "size": 12}],
+            "next_marker": "m2",
+        }
+    )
+
+    page = await box_list_folder_content_by_folder_id(
+        MagicMock(), "0", limit=5000, marker="m1", fields=["size"]
+    )
+
+    assert page == {
+        "entries": [{"id": "3", "type": "file", "size": 12}],
+        "next_marker": "m2",
+    }
+    mock_get_async_api.return_value.folder_list_page.assert_awaited_once_with(
+        "0", ["type", "size"], 1000, "m1"
+    )
+
+
+def folder_item(**fields):
+    item = MagicMock(id=fields["id"], type=fields["type"])
+    item.to_dict.return_value = fields
+    return item
+
+
+@pytest.mark.asyncio
+@patch("box_tools_folders.get_box_async_api", return_value=None)
+async def test_box_api_list_content_page_sync_path(_):
+    """Test the SDK path asks Box for one page of the fields, skipping links"""
+    ctx = MagicMock()
+    client = ctx.request_context.lifespan_context.client
+    client.folders.get_folder_items.return_value = MagicMock(
+        entries=[
+            folder_item(id="1", type="file", name="a.txt"),
+            folder_item(id="2", type="web_link", name="link"),
+        ],
+        next_marker="",
+    )
+
+    page = await box_list_folder_content_by_folder_id(
+        ctx, "0", limit=2, fields=["name"]
+    )
+
+    assert page == {
+        "entries": [{"id": "1", "type": "file", "name": "a.txt"}],
+        "next_marker": None,
+    }
+    client.folders.get_folder_items.assert_called_once_with(
+        "0", fields=["type", "name"], usemarker=True, marker=None, limit=2
+    )
+
+
+@pytest.mark.asyncio
+@patch("box_tools_folders.get_box_async_api", return_value=None)
+async def test_box_api_list_content_recursive_sync_path(_):
+    """Test the SDK path lists sub-folders after their content"""
+    ctx = MagicMock()
+    client = ctx.request_context.lifespan_context.client
+    folders = {
+        "0": [
+            folder_item(id="10", type="folder", name="sub"),
+            folder_item(id="1", type="file", name="a.txt", description="A"),
+        ],
+        "10": [folder_item(id="2", type="file", name="b.txt")],
+    }
+    client.folders.get_folder_items.side_effect = lambda folder_id, **_: MagicMock(
+        entries=folders[folder_id], next_marker=None
+    )
+
+    items = await box_list_folder_content_by_folder_id(ctx, "0", True)
+
+    assert items == [
+        {"id": "2", "type": "file", "name": "b.txt", "description": None},
+        {"id": "10", "type": "folder", "name": "sub", "description": None},
+        {"id": "1", "type": "file", "name": "a.txt", "description": "A"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_box_api_list_content_rejects_bad_pages():
+    ctx = MagicMock()
+
+    assert "error" in await box_list_folder_content_by_folder_id(ctx, "0", limit=-1)
+    assert "error" in await box_list_folder_content_by_folder_id(
+        ctx, "0", True, limit=10
+    )
+    ctx.request_context.lifespan_context.client.folders.get_folder_items.assert_not_called()
+
+
 @pytest.mark.skip
 @pytest.mark.asyncio
 async def test_box_api_list_content_files(ctx):
@@ -1,13 +1,24 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
+from box_api_async import BoxAsyncAPI
 from box_tools_generic import (
+    CallCoalescer,
     box_authorize_app_tool,
     box_who_am_i,
+    call_box_api,
+    coalesce,
+    get_box_async_api,
     get_box_client,
+    get_box_executor,
 )
-from server_context import BoxContext
+from server_context import BoxContext, UserClientPool
 
 
 @pytest.fixture
@@ -57,6 +68,120 @@ def test_get_box_client_none_client(mock_ctx):
     assert str(exc_info.value) == "Box client is not initialized in the context."
 
 
+def test_get_box_client_from_user_pool(mock_ctx, mock_box_client):
+    """Test get_box_client resolves the requesting user's client from the pool"""
+    user_clients = UserClientPool(mock_box_client, lambda user_id: MagicMock())
+    mock_ctx.request_context.lifespan_context.client = mock_box_client
+    mock_ctx.request_context.lifespan_context.user_clients = user_clients
+    mock_ctx.request_context.request.headers = {"x-box-user-id": "42"}
+
+    result = get_box_client(mock_ctx)
+
+    assert result is not mock_box_client
+    assert get_box_client(mock_ctx) is result
+    assert "42" in user_clients
+
+
+def test_get_box_client_without_user_header(mock_ctx, mock_box_client):
+    """Test get_box_client uses the shared client for requests without a user"""
+    user_clients = UserClientPool(mock_box_client, lambda user_id: MagicMock())
+    mock_ctx.request_context.lifespan_context.client = mock_box_client
+    mock_ctx.request_context.lifespan_context.user_clients = user_clients
+    mock_ctx.request_context.request = None
+
+    assert get_box_client(mock_ctx) is mock_box_client
+    assert len(user_clients) == 0
+
+
+def test_get_box_client_ignores_user_header_without_pool(mock_ctx, mock_box_client):
+    """Test the user header is ignored when per-user clients are disabled"""
+    mock_ctx.request_context.lifespan_context.client = mock_box_client
+    mock_ctx.request_context.lifespan_context.user_clients = None
+    mock_ctx.request_context.request.headers = {"x-box-user-id": "42"}
+
+    assert get_box_client(mock_ctx) is mock_box_client
+
+
+def test_get_box_executor_from_context(mock_ctx):
+    """Test get_box_executor returns the executor held by the lifespan context"""
+    executor = ThreadPoolExecutor(max_workers=1)
+    mock_ctx.request_context.lifespan_context.executor = executor
+
+    try:
+        assert get_box_executor(mock_ctx) is executor
+    finally:
+        executor.shutdown()
+
+
+@patch("box_tools_generic.get_executor")
+def test_get_box_executor_fallback(mock_get_executor, mock_ctx):
+    """Test get_box_executor falls back to the shared pool without a context executor"""
+    mock_ctx.request_context.lifespan_context.executor = None
+
+    result = get_box_executor(mock_ctx)
+
+    mock_get_executor.assert_called_once()
+    assert result == mock_get_executor.return_value
+
+
+@pytest.mark.asyncio
+async def test_get_box_async_api_from_context(mock_ctx, mock_box_client):
+    """Test get_box_async_api wraps the context client and HTTP client"""
+    mock_box_client.network_session.base_urls.base_url = "https://api.box.com"
+    http_client = httpx.AsyncClient()
+    mock_ctx.request_context.lifespan_context.client = mock_box_client
+    mock_ctx.request_context.lifespan_context.http_client = http_client
+
+    try:
+        result = get_box_async_api(mock_ctx)
+    finally:
+        await http_client.aclose()
+
+    assert isinstance(result, BoxAsyncAPI)
+    assert result.client is mock_box_client
+    assert result.http_client is http_client
+    assert result.api_url == "https://api.box.com/2.0"
+
+
+def test_get_box_async_api_without_http_client(mock_ctx, mock_box_client):
+    """Test get_box_async_api returns None so tools use the sync toolkit"""
+    mock_ctx.request_context.lifespan_context.client = mock_box_client
+    mock_ctx.request_context.lifespan_context.http_client = None
+
+    assert get_box_async_api(mock_ctx) is None
+
+
+@pytest.mark.asyncio
+async def test_call_box_api_runs_off_event_loop(mock_ctx):
+    """Test call_box_api runs the blocking call on an executor thread"""
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="test-box-api")
+    mock_ctx.request_context.lifespan_context.executor = executor
+
+    def blocking_call(a, b=None):
+        return threading.current_thread().name, a, b
+
+    try:
+        thread_name, a, b = await call_box_api(mock_ctx, blocking_call, 1, b=2)
+    finally:
+        executor.shutdown()
+
+    assert thread_name.startswith("test-box-api")
+    assert (a, b) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_call_box_api_propagates_exception(mock_ctx):
+    """Test call_box_api re-raises exceptions from the blocking call"""
+    mock_ctx.request_context.lifespan_context.executor = None
+    failing_call = MagicMock(side_effect=ValueError("Box API Error"))
+
+    with pytest.raises(ValueError) as exc_info:
+        await call_box_api(mock_ctx, failing_call, "arg")
+
+    assert str(exc_info.value) == "Box API Error"
+    failing_call.assert_called_once_with("arg")
+
+
 @pytest.mark.asyncio
 async def test_box_who_am_i(mock_ctx, mock_box_client, sample_user_response):
     """Test box_who_am_i function"""
@@ -78,6 +203,23 @@ async def test_box_who_am_i(mock_ctx, mock_box_client, sample_user_response):
     assert result["type"] == "user"
 
 
+@pytest.mark.asyncio
+@patch("box_tools_generic.get_box_async_api")
+async def test_box_who_am_i_async_path(
+    mock_get_async_api, mock_ctx, mock_box_client, sample_user_response
+):
+    """Test box_who_am_i uses the native async API when available"""
+    mock_ctx.request_context.lifespan_context.client = mock_box_client
+    mock_get_async_api.return_value.get_user_me = AsyncMock(
+        return_value=sample_user_response
+    )
+
+    result = await box_who_am_i(mock_ctx)
+
+    assert result == sample_user_response
+    mock_box_client.users.get_user_me.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_box_who_am_i_with_none_client(mock_ctx):
     """Test box_who_am_i function with None client"""
@@ -90,38 +232,36 @@ async def test_box_who_am_i_with_none_client(mock_ctx):
 
 
 @pytest.mark.asyncio
-@patch('box_tools_generic.authorize_app')
-async def test_box_authorize_app_tool_success(mock_authorize_app):
+async def test_box_authorize_app_tool_success(mock_ctx):
     """Test box_authorize_app_tool function with successful authorization"""
-    mock_authorize_app.return_value = True
+    token_manager = mock_ctx.request_context.lifespan_context.token_manager
+    token_manager.revalidate.return_value = True
     
-    result = await box_authorize_app_tool()
+    result = await box_authorize_app_tool(mock_ctx)
     
-    mock_authorize_app.assert_called_once()
+    token_manager.revalidate.assert_called_once()
     assert result == "Box application authorized successfully"
 
 
 @pytest.mark.asyncio
-@patch('box_tools_generic.authorize_app')
-async def test_box_authorize_app_tool_failure(mock_authorize_app):
+async def test_box_authorize_app_tool_failure(mock_ctx):
     """Test box_authorize_app_tool function with failed authorization"""
-    mock_authorize_app.return_value = False
+    token_manager = mock_ctx.request_context.lifespan_context.token_manager
+    token_manager.revalidate.return_value = False
     
-    result = await box_authorize_app_tool()
+    result = await box_authorize_app_tool(mock_ctx)
     
-    mock_authorize_app.assert_called_once()
+    token_manager.revalidate.assert_called_once()
     assert result == "Box application not authorized"
 
 
 @pytest.mark.asyncio
-@patch('box_tools_generic.authorize_app')
-async def test_box_authorize_app_tool_none_return(mock_authorize_app):
-    """Test box_authorize_app_tool function with None return"""
-    mock_authorize_app.return_value = None
+async def test_box_authorize_app_tool_none_return(mock_ctx):
+    """Test box_authorize_app_tool function without a token manager"""
+    mock_ctx.request_context.lifespan_context.token_manager = None
     
-    result = await box_authorize_app_tool()
+    result = await box_authorize_app_tool(mock_ctx)
     
-    mock_authorize_app.assert_called_once()
     assert result == "Box application not authorized"
 
 
@@ -139,16 +279,16 @@ async def test_box_who_am_i_api_exception(mock_ctx, mock_box_client):
 
 
 @pytest.mark.asyncio
-@patch('box_tools_generic.authorize_app')
-async def test_box_authorize_app_tool_exception(mock_authorize_app):
+async def test_box_authorize_app_tool_exception(mock_ctx):
     """Test box_authorize_app_tool function with exception"""
-    mock_authorize_app.side_effect = Exception("Authorization Error")
+    token_manager = mock_ctx.request_context.lifespan_context.token_manager
+    token_manager.revalidate.side_effect = Exception("Authorization Error")
     
     with pytest.raises(Exception) as exc_info:
-        await box_authorize_app_tool()
+        await box_authorize_app_tool(mock_ctx)
     
     assert str(exc_info.value) == "Authorization Error"
-    mock_authorize_app.assert_called_once()
+    token_manager.revalidate.assert_called_once()
 
 
 def test_get_box_client_with_different_context_structure():
@@ -188,3 +328,132 @@ async def test_box_who_am_i_custom_user_data(mock_ctx, mock_box_client):
     assert result["id"] == "98765"
     assert result["name"] == "Jane Smith"
     assert result["enterprise"]["name"] == "Test Enterprise"
+
+
+@pytest.fixture
+def fresh_coalescer():
+    """Give each test its own coalescing counters"""
+    with patch("box_tools_generic.coalescer", CallCoalescer()) as coalescer:
+        yield coalescer
+
+
+@pytest.mark.asyncio
+async def test_coalescer_shares_in_flight_call():
+    """Test concurrent calls with the same key share one execution"""
+    coalescer = CallCoalescer()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"id": "1"}
+
+    results = await asyncio.gather(*(coalescer.run("key", call) for _ in range(10)))
+
+    assert len(calls) == 1
+    assert results == [{"id": "1"}] * 10
+    assert coalescer.stats() == {"calls": 10, "coalesced": 9, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_coalescer_does_not_cache_completed_calls():
+    """Test a call made after the previous one completed runs again"""
+    coalescer = CallCoalescer()
+    call = AsyncMock(return_value="result")
+
+    await coalescer.run("key", call)
+    await coalescer.run("key", call)
+
+    assert call.await_count == 2
+    assert coalescer.coalesced == 0
+
+
+@pytest.mark.asyncio
+async def test_coalescer_propagates_exception_to_all_callers():
+    """Test every coalesced caller receives the shared call's exception"""
+    coalescer = CallCoalescer()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise ValueError("Box API Error")
+
+    results = await asyncio.gather(
+        *(coalescer.run("key", call) for _ in range(3)), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert coalescer.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_coalescer_survives_cancelled_caller():
+    """Test cancelling one caller does not cancel the shared call"""
+    coalescer = CallCoalescer()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        return "result"
+
+    first = asyncio.ensure_future(coalescer.run("key", call))
+    second = asyncio.ensure_future(coalescer.run("key", call))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "result"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_box_who_am_i_coalesces_concurrent_calls(
+    mock_ctx, mock_box_client, sample_user_response, fresh_coalescer
+):
+    """Test concurrent box_who_am_i calls make one Box request"""
+    mock_ctx.request_context.lifespan_context.client = mock_box_client
+    mock_ctx.request_context.lifespan_context.http_client = None
+    mock_ctx.request_context.request = None
+    mock_user = MagicMock()
+    mock_user.to_dict.return_value = sample_user_response
+
+    def get_user_me():
+        time.sleep(0.05)
+        return mock_user
+
+    mock_box_client.users.get_user_me.side_effect = get_user_me
+
+    results = await asyncio.gather(*(box_who_am_i(mock_ctx) for _ in range(5)))
+
+    assert results == [sample_user_response] * 5
+    mock_box_client.users.get_user_me.assert_called_once()
+    assert fresh_coalescer.coalesced == 4
+
+
+@pytest.mark.asyncio
+async def test_coalesce_keys_on_arguments_and_user(fresh_coalescer):
+    """Test calls differing in arguments or user are not coalesced"""
+    calls = []
+
+    @coalesce
+    async def read_tool(ctx, file_id: str, page: int = 1):
+        calls.append((file_id, page))
+        await asyncio.sleep(0.01)
+        return file_id
+
+    def make_ctx(user_id=None):
+        ctx = MagicMock()
+        ctx.request_context.request.headers = (
+            {"x-box-user-id": user_id} if user_id else {}
+        )
+        return ctx
+
+    await asyncio.gather(
+        read_tool(make_ctx(), "1"),
+        read_tool(make_ctx(), "1", page=1),
+        read_tool(make_ctx(), file_id="1"),
+        read_tool(make_ctx(), "2"),
+        read_tool(make_ctx(), "1", page=2),
+        read_tool(make_ctx("42"), "1"),
+    )
+
+    assert sorted(calls) == [("1", 1), ("1", 1), ("1", 2), ("2", 1)]
+    assert fresh_coalescer.coalesced == 2
+    assert read_tool.__name__ == "read_tool"
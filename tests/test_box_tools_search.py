@@ -1,6 +1,7 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from box_ai_agents_toolkit import SearchForContentContentTypes
 
 from box_tools_search import (
     box_search_folder_by_name_tool,
@@ -86,6 +87,32 @@ async def test_box_search_tool_basic(
         assert item["type"] == "file"
 
 
+@pytest.mark.asyncio
+@patch("box_tools_search.get_box_async_api")
+@patch("box_tools_search.get_box_client")
+@patch("box_tools_search.box_search")
+async def test_box_search_tool_async_path(
+    mock_search, mock_get_client, mock_get_async_api, mock_ctx
+):
+    """Test box_search_tool uses the native async API when available"""
+    entries = [{"id": "1", "name": "test.pdf", "type": "file"}]
+    mock_get_async_api.return_value.search = AsyncMock(return_value=entries)
+
+    result = await box_search_tool(
+        ctx=mock_ctx,
+        query="test",
+        file_extensions=["pdf"],
+        where_to_look_for_query=["NAME"],
+        ancestor_folder_ids=["0"],
+    )
+
+    assert result == entries
+    mock_get_async_api.return_value.search.assert_awaited_once_with(
+        "test", ["pdf"], [SearchForContentContentTypes.NAME], ["0"]
+    )
+    mock_search.assert_not_called()
+
+
 @pytest.mark.asyncio
 @patch("box_tools_search.get_box_client")
 @patch("box_tools_search.box_search")
@@ -0,0 +1,877 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+from box_sdk_gen import BoxAPIError, GetFileThumbnailByIdExtension, UploadPart
+
+from box_transfer import (
+    DOWNLOAD_MANIFEST_NAME,
+    ChunkedUploadError,
+    download_directory,
+    download_file_to_path,
+    download_thumbnail,
+    find_conflicting_file,
+    resolve_save_path,
+    sha1_digest,
+    spool_content,
+    upload_directory,
+    upload_file_chunked,
+    upload_file_from_path,
+)
+
+CONTENT = b"0123456789" * 100_000
+
+
+def make_client(content=CONTENT, sha1=None, name="video.mp4", chunk_size=65536):
+    """Mock Box client that streams the content in chunks"""
+    client = MagicMock()
+    client.files.get_file_by_id.return_value = MagicMock(
+        sha1=hashlib.sha1(content).hexdigest() if sha1 is None else sha1,
+        size=len(content),
+    )
+    client.files.get_file_by_id.return_value.name = name
+    chunks = []
+
+    def download_file_to_output_stream(file_id, output_stream):
+        for start in range(0, len(content), chunk_size):
+            chunk = content[start : start + chunk_size]
+            chunks.append(len(chunk))
+            output_stream.write(chunk)
+
+    client.downloads.download_file_to_output_stream.side_effect = (
+        download_file_to_output_stream
+    )
+    client.chunks = chunks
+    return client
+
+
+def test_resolve_save_path(tmp_path):
+    """Test downloads go to the given file, into the given directory, or to temp"""
+    assert resolve_save_path(str(tmp_path / "a.bin"), "b.bin") == str(
+        tmp_path / "a.bin"
+    )
+    assert resolve_save_path(str(tmp_path), "b.bin") == str(tmp_path / "b.bin")
+    assert os.path.basename(resolve_save_path(None, "b.bin")) == "b.bin"
+
+
+def test_download_file_to_path_streams_and_hashes(tmp_path):
+    """Test the file is written chunk by chunk and verified against Box's SHA1"""
+    client = make_client()
+
+    saved = download_file_to_path(client, "1", str(tmp_path))
+
+    path = tmp_path / "video.mp4"
+    assert saved == {
+        "path": str(path),
+        "size": len(CONTENT),
+        "sha1": hashlib.sha1(CONTENT).hexdigest(),
+    }
+    assert path.read_bytes() == CONTENT
+    assert max(client.chunks) == 65536
+    client.files.get_file_by_id.assert_called_once_with(
+        "1", fields=["name", "size", "sha1"]
+    )
+    assert not os.path.exists(f"{path}.part")
+
+
+def test_download_file_to_path_uses_given_file_info(tmp_path):
+    """Test file info already fetched by the caller is not fetched again"""
+    client = make_client()
+    file_info = MagicMock(sha1=hashlib.sha1(CONTENT).hexdigest())
+    file_info.name = "clip.mp4"
+
+    saved = download_file_to_path(client, "1", str(tmp_path), file_info)
+
+    assert saved["path"] == str(tmp_path / "clip.mp4")
+    client.files.get_file_by_id.assert_not_called()
+
+
+def test_download_file_to_path_rejects_sha1_mismatch(tmp_path):
+    """Test a corrupted download raises and leaves no file behind"""
+    client = make_client(sha1="0" * 40)
+    path = tmp_path / "video.mp4"
+
+    with pytest.raises(ValueError, match="SHA1 mismatch"):
+        download_file_to_path(client, "1", str(path))
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_download_file_to_path_keeps_destination_on_error(tmp_path):
+    """Test a failed download does not truncate an existing file"""
+    client = make_client()
+    client.downloads.download_file_to_output_stream.side_effect = ConnectionError
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"previous")
+
+    with pytest.raises(ConnectionError):
+        download_file_to_path(client, "1", str(path))
+
+    assert path.read_bytes() == b"previous"
+    assert os.listdir(tmp_path) == ["video.mp4"]
+
+
+def test_download_thumbnail_picks_format_by_size():
+    """Test small thumbnails are JPEG, large ones PNG, within Box's sizes"""
+    client = MagicMock()
+    client.files.get_file_thumbnail_by_id.side_effect = lambda *args, **kwargs: (
+        io.BytesIO(b"thumbnail")
+    )
+
+    assert download_thumbnail(client, "1", 10) == (b"thumbnail", "jpeg")
+    assert download_thumbnail(client, "1", 2048) == (b"thumbnail", "png")
+
+    small, large = client.files.get_file_thumbnail_by_id.call_args_list
+    assert small.args == ("1", GetFileThumbnailByIdExtension.JPG)
+    assert small.kwargs == {"max_width": 32, "max_height": 32}
+    assert large.args == ("1", GetFileThumbnailByIdExtension.PNG)
+
+
+def test_download_thumbnail_not_ready():
+    """Test None is returned while Box is still making the thumbnail"""
+    client = MagicMock()
+    client.files.get_file_thumbnail_by_id.return_value = None
+
+    assert download_thumbnail(client, "1") is None
+
+
+class FakeChunkedUploads:
+    """In-memory Box upload sessions"""
+
+    def __init__(self, part_size=1024, fail_at_offset=None):
+        self.part_size = part_size
+        self.fail_at_offset = fail_at_offset
+        self.sessions = {}
+        self.created = 0
+        self.uploads = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def create_file_upload_session(self, folder_id, file_size, file_name):
+        self.created += 1
+        session_id = f"session-{self.created}"
+        self.sessions[session_id] = {"size": file_size, "parts": {}}
+        return self.get_file_upload_session_by_id(session_id)
+
+    def create_file_upload_session_for_existing_file(
+        self, file_id, file_size, file_name=None
+    ):
+        session = self.create_file_upload_session(None, file_size, file_name)
+        self.sessions[session.id]["file_id"] = file_id
+        return session
+
+    def get_file_upload_session_by_id(self, session_id):
+        if session_id not in self.sessions:
+            raise BoxAPIError(
+                request_info=MagicMock(),
+                response_info=MagicMock(status_code=404),
+                message="Not Found",
+            )
+        return MagicMock(id=session_id, part_size=self.part_size)
+
+    def get_file_upload_session_parts(self, session_id, offset=0, limit=1000):
+        parts = sorted(
+            self.sessions[session_id]["parts"].values(), key=lambda p: p.offset
+        )
+        return MagicMock(entries=parts[offset : offset + limit], total_count=len(parts))
+
+    def upload_file_part(self, session_id, body, digest, content_range):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.01)
+            data = body.read()
+            offset = int(content_range.split()[1].split("-")[0])
+            assert digest == sha1_digest(hashlib.sha1(data).digest())
+            assert content_range == (
+                f"bytes {offset}-{offset + len(data) - 1}"
+                f"/{self.sessions[session_id]['size']}"
+            )
+            if offset == self.fail_at_offset:
+                raise ConnectionError("connection dropped")
+            part = UploadPart(
+                part_id=str(offset),
+                offset=offset,
+                size=len(data),
+                sha_1=hashlib.sha1(data).hexdigest(),
+            )
+            self.sessions[session_id]["parts"][offset] = part
+            self.uploads.append(offset)
+            return MagicMock(part=part)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def create_file_upload_session_commit(self, session_id, parts, digest):
+        self.committed = (session_id, [part.offset for part in parts], digest)
+        entry = MagicMock(id="12345")
+        entry.name = "big.bin"
+        return MagicMock(entries=[entry])
+
+
+@pytest.fixture
+def big_file(tmp_path):
+    path = tmp_path / "big.bin"
+    path.write_bytes(os.urandom(10 * 1024 + 100))
+    return path
+
+
+def upload(client, big_file, tmp_path, **kwargs):
+    return upload_file_chunked(
+        client,
+        str(big_file),
+        "0",
+        "big.bin",
+        concurrency=3,
+        state_dir=str(tmp_path / "state"),
+        **kwargs,
+    )
+
+
+def test_upload_file_chunked_on_a_busy_shared_executor(big_file, tmp_path):
+    """Test parts queued behind the uploading worker are sent by that worker"""
+    client = MagicMock()
+    client.chunked_uploads = FakeChunkedUploads()
+
+    with ThreadPoolExecutor(1) as pool:
+        result = pool.submit(upload, client, big_file, tmp_path, executor=pool).result(
+            timeout=10
+        )
+
+    assert result["parts_uploaded"] == len(range(0, big_file.stat().st_size, 1024))
+
+
+def test_upload_file_chunked_uploads_parts_in_parallel(big_file, tmp_path):
+    """Test every part is sent once, at most `concurrency` at a time"""
+    client = MagicMock()
+    client.chunked_uploads = FakeChunkedUploads()
+
+    result = upload(client, big_file, tmp_path)
+
+    content = big_file.read_bytes()
+    offsets = list(range(0, len(content), 1024))
+    assert sorted(client.chunked_uploads.uploads) == offsets
+    assert 1 < client.chunked_uploads.max_active <= 3
+    assert client.chunked_uploads.committed == (
+        "session-1",
+        offsets,
+        sha1_digest(hashlib.sha1(content).digest()),
+    )
+    assert result == {
+        "id": "12345",
+        "name": "big.bin",
+        "size": len(content),
+        "sha1": hashlib.sha1(content).hexdigest(),
+        "upload_session_id": "session-1",
+        "parts_uploaded": 11,
+        "parts_resumed": 0,
+    }
+    assert os.listdir(tmp_path / "state") == []
+
+
+def test_upload_file_chunked_resumes_interrupted_upload(big_file, tmp_path):
+    """Test a retry reuses the recorded session and only sends missing parts"""
+    client = MagicMock()
+    client.chunked_uploads = FakeChunkedUploads(fail_at_offset=5 * 1024)
+
+    with pytest.raises(ChunkedUploadError, match="upload_session_id=session-1"):
+        upload(client, big_file, tmp_path)
+
+    uploaded_before = set(client.chunked_uploads.uploads)
+    client.chunked_uploads.fail_at_offset = None
+    client.chunked_uploads.uploads = []
+
+    result = upload(client, big_file, tmp_path)
+
+    assert result["upload_session_id"] == "session-1"
+    assert result["parts_resumed"] == len(uploaded_before)
+    assert set(client.chunked_uploads.uploads).isdisjoint(uploaded_before)
+    assert 5 * 1024 in client.chunked_uploads.uploads
+    assert client.chunked_uploads.created == 1
+
+
+def test_upload_file_chunked_restarts_changed_file(big_file, tmp_path):
+    """Test a recorded session is not reused once the local file changed"""
+    client = MagicMock()
+    client.chunked_uploads = FakeChunkedUploads(fail_at_offset=5 * 1024)
+    with pytest.raises(ChunkedUploadError):
+        upload(client, big_file, tmp_path)
+    client.chunked_uploads.fail_at_offset = None
+
+    big_file.write_bytes(os.urandom(10 * 1024))
+    result = upload(client, big_file, tmp_path)
+
+    assert result["upload_session_id"] == "session-2"
+    assert result["parts_resumed"] == 0
+
+
+def test_upload_file_chunked_replaces_expired_session(big_file, tmp_path):
+    """Test a recorded session Box no longer knows is replaced by a new one"""
+    client = MagicMock()
+    client.chunked_uploads = FakeChunkedUploads(fail_at_offset=0)
+    with pytest.raises(ChunkedUploadError):
+        upload(client, big_file, tmp_path)
+    client.chunked_uploads.fail_at_offset = None
+    del client.chunked_uploads.sessions["session-1"]
+
+    result = upload(client, big_file, tmp_path)
+
+    assert result["upload_session_id"] == "session-2"
+
+
+def test_upload_file_chunked_explicit_session_must_exist(big_file, tmp_path):
+    """Test resuming an unknown upload session raises instead of restarting"""
+    client = MagicMock()
+    client.chunked_uploads = FakeChunkedUploads()
+
+    with pytest.raises(BoxAPIError):
+        upload(client, big_file, tmp_path, upload_session_id="expired")
+
+
+def test_upload_file_chunked_new_version(big_file, tmp_path):
+    """Test a file ID makes the upload session add a version to that file"""
+    client = MagicMock()
+    client.chunked_uploads = FakeChunkedUploads()
+
+    result = upload(client, big_file, tmp_path, file_id="777")
+
+    session = client.chunked_uploads.sessions[result["upload_session_id"]]
+    assert session["file_id"] == "777"
+
+
+def test_upload_file_chunked_uses_given_sha1(big_file, tmp_path):
+    """Test a SHA1 the caller already has is committed instead of a new one"""
+    client = MagicMock()
+    client.chunked_uploads = FakeChunkedUploads()
+    sha1 = "ab" * 20
+
+    result = upload(client, big_file, tmp_path, sha1=sha1)
+
+    assert client.chunked_uploads.committed[2] == sha1_digest(bytes.fromhex(sha1))
+    assert result["sha1"] == sha1
+
+
+@patch("box_transfer.file_sha1")
+def test_upload_file_from_path_uses_given_sha1(mock_file_sha1, tmp_path):
+    """Test a SHA1 the caller already has is sent without hashing the file"""
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"v2")
+    client = MagicMock()
+    entry = MagicMock(id="778", type="file")
+    entry.name = "notes.txt"
+    client.uploads.upload_file.return_value = MagicMock(entries=[entry])
+    sha1 = hashlib.sha1(b"v2").hexdigest()
+
+    upload_file_from_path(client, str(path), "notes.txt", "0", sha1=sha1)
+
+    mock_file_sha1.assert_not_called()
+    assert client.uploads.upload_file.call_args.kwargs == {"content_md_5": sha1}
+
+
+def test_upload_file_from_path_new_version(tmp_path):
+    """Test a file ID sends the content as a new version of that file"""
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"v2")
+    client = MagicMock()
+    entry = MagicMock(id="777", type="file")
+    entry.name = "notes.txt"
+    client.uploads.upload_file_version.return_value = MagicMock(entries=[entry])
+
+    result = upload_file_from_path(client, str(path), "notes.txt", "0", file_id="777")
+
+    assert result == {"id": "777", "name": "notes.txt", "type": "file"}
+    file_id, attributes, _ = client.uploads.upload_file_version.call_args.args
+    assert (file_id, attributes.name) == ("777", "notes.txt")
+    assert client.uploads.upload_file_version.call_args.kwargs == {
+        "content_md_5": hashlib.sha1(b"v2").hexdigest()
+    }
+    client.uploads.upload_file.assert_not_called()
+
+
+@patch("box_transfer.SPOOL_MAX_MEMORY", 1000)
+@patch("box_transfer.SPOOL_CHUNK_SIZE", 100)
+def test_spool_content_decodes_base64_in_chunks():
+    """Test base64 is decoded chunk by chunk, spilling to disk past the cap"""
+    content = os.urandom(3000)
+    encoded = base64.encodebytes(content).decode("ascii")
+
+    spool, size, sha1 = spool_content(encoded, is_base64=True)
+
+    with spool:
+        assert spool._rolled
+        assert spool.read() == content
+    assert (size, sha1) == (len(content), hashlib.sha1(content).hexdigest())
+
+    small, size, _ = spool_content("naïve text")
+    with small:
+        assert not small._rolled
+        assert small.read() == "naïve text".encode("utf-8")
+    assert size == 11
+
+
+def preflight_error(status_code, conflicts=None):
+    return BoxAPIError(
+        request_info=MagicMock(),
+        response_info=MagicMock(
+            status_code=status_code, context_info={"conflicts": conflicts}
+        ),
+        message="Preflight failed",
+    )
+
+
+def test_find_conflicting_file():
+    """Test the preflight check reports the file a same-named upload would hit"""
+    client = MagicMock()
+    assert find_conflicting_file(client, "0", "notes.txt", 2) is None
+
+    client.uploads.preflight_file_upload_check.side_effect = preflight_error(
+        409, {"type": "file", "id": "777", "sha1": "a" * 40}
+    )
+    assert find_conflicting_file(client, "0", "notes.txt", 2) == {
+        "id": "777",
+        "sha1": "a" * 40,
+    }
+    kwargs = client.uploads.preflight_file_upload_check.call_args.kwargs
+    assert (kwargs["name"], kwargs["size"], kwargs["parent"].id) == (
+        "notes.txt",
+        2,
+        "0",
+    )
+
+
+def test_find_conflicting_file_raises_other_errors():
+    """Test a failed preflight other than a file conflict is raised"""
+    client = MagicMock()
+    client.uploads.preflight_file_upload_check.side_effect = preflight_error(
+        409, [{"type": "folder", "id": "5"}]
+    )
+    with pytest.raises(BoxAPIError):
+        find_conflicting_file(client, "0", "notes", 2)
+
+    client.uploads.preflight_file_upload_check.side_effect = preflight_error(403)
+    with pytest.raises(BoxAPIError):
+        find_conflicting_file(client, "0", "notes.txt", 2)
+
+
+class FakeBoxFolders:
+    """In-memory Box folder tree with uploads that track their concurrency"""
+
+    def __init__(self, upload_delay=0.0, fail_names=()):
+        self.folders = {"0": {}}
+        self.files = {}
+        self.created = []
+        self.upload_delay = upload_delay
+        self.fail_names = set(fail_names)
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self.client = MagicMock()
+        self.client.folders.get_folder_items.side_effect = self.get_folder_items
+        self.client.folders.create_folder.side_effect = self.create_folder
+        self.client.uploads.upload_file.side_effect = self.upload_file
+        self.client.uploads.upload_file_version.side_effect = self.upload_file_version
+        self.client.uploads.preflight_file_upload_check.side_effect = self.preflight
+        self.versions = []
+
+    def add_folder(self, parent_id, name):
+        folder_id = str(len(self.folders))
+        self.folders[folder_id] = {}
+        self.folders[parent_id][name] = folder_id
+        return folder_id
+
+    def get_folder_items(self, folder_id, fields, usemarker, marker, limit):
+        names = sorted(self.folders[folder_id])
+        start = int(marker or 0)
+        entries = []
+        for name in names[start : start + limit]:
+            item = MagicMock(id=self.folders[folder_id][name], type="folder")
+            item.name = name
+            entries.append(item)
+        next_marker = str(start + limit) if start + limit < len(names) else None
+        return MagicMock(entries=entries, next_marker=next_marker)
+
+    def create_folder(self, name, parent):
+        self.created.append(name)
+        return MagicMock(id=self.add_folder(parent.id, name))
+
+    def upload_file(self, attributes, file, content_md_5):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.upload_delay)
+            if attributes.name in self.fail_names:
+                raise RuntimeError(f"upload of {attributes.name} failed")
+            key = (attributes.parent.id, attributes.name)
+            self.files[key] = file.read()
+        finally:
+            with self.lock:
+                self.active -= 1
+        entry = MagicMock(id=str(len(self.files)), type="file")
+        entry.name = attributes.name
+        return MagicMock(entries=[entry])
+
+    def add_file(self, parent_id, name, content):
+        self.files[(parent_id, name)] = content
+
+    def preflight(self, name, size, parent):
+        content = self.files.get((parent.id, name))
+        if content is not None:
+            raise preflight_error(
+                409,
+                {
+                    "type": "file",
+                    "id": f"{parent.id}/{name}",
+                    "sha1": hashlib.sha1(content).hexdigest(),
+                },
+            )
+
+    def upload_file_version(self, file_id, attributes, file, content_md_5):
+        self.versions.append(file_id)
+        self.files[tuple(file_id.split("/"))] = file.read()
+        entry = MagicMock(id=file_id, type="file")
+        entry.name = attributes.name
+        return MagicMock(entries=[entry])
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(8) as pool:
+        yield pool
+
+
+@pytest.fixture
+def local_tree(tmp_path):
+    root = tmp_path / "tree"
+    (root / "docs" / "2024").mkdir(parents=True)
+    (root / "images").mkdir()
+    (root / "readme.txt").write_bytes(b"readme")
+    (root / "docs" / "a.pdf").write_bytes(b"a" * 10)
+    (root / "docs" / "2024" / "b.pdf").write_bytes(b"b" * 20)
+    for i in range(6):
+        (root / "images" / f"{i}.png").write_bytes(b"i" * 5)
+    return root
+
+
+def test_upload_directory_mirrors_tree(local_tree, tmp_path, executor):
+    """Test sub-directories become folders and files land in their folder"""
+    box = FakeBoxFolders()
+
+    summary = upload_directory(
+        box.client, str(local_tree), "0", 4, 2, str(tmp_path), executor
+    )
+
+    assert summary == {
+        "folders_created": 3,
+        "folders_reused": 0,
+        "files_uploaded": 9,
+        "files_skipped": 0,
+        "files_failed": 0,
+        "bytes_uploaded": 6 + 10 + 20 + 6 * 5,
+        "errors": [],
+    }
+    docs = box.folders["0"]["docs"]
+    assert box.files[(box.folders[docs]["2024"], "b.pdf")] == b"b" * 20
+    assert box.files[(docs, "a.pdf")] == b"a" * 10
+    assert box.files[("0", "readme.txt")] == b"readme"
+
+
+def test_upload_directory_reuses_existing_folders(local_tree, tmp_path, executor):
+    """Test folders already in Box are reused, across pages of the listing"""
+    box = FakeBoxFolders()
+    docs = box.add_folder("0", "docs")
+    for i in range(3):
+        box.add_folder("0", f"other-{i}")
+
+    with patch("box_transfer.FOLDER_ITEMS_PAGE_SIZE", 2):
+        summary = upload_directory(
+            box.client, str(local_tree), "0", 4, 2, str(tmp_path), executor
+        )
+
+    assert summary["folders_reused"] == 1
+    assert summary["folders_created"] == 2
+    assert sorted(box.created) == ["2024", "images"]
+    assert box.folders[docs]["2024"]
+
+
+def test_upload_directory_reuses_folder_created_concurrently(
+    local_tree, tmp_path, executor
+):
+    """Test a 409 on folder creation uses the conflicting folder"""
+    box = FakeBoxFolders()
+    existing = box.add_folder("0", "elsewhere")
+
+    def create_folder(name, parent):
+        if name == "images":
+            raise BoxAPIError(
+                request_info=MagicMock(),
+                response_info=MagicMock(
+                    status_code=409,
+                    context_info={"conflicts": [{"type": "folder", "id": existing}]},
+                ),
+                message="Item with the same name already exists",
+            )
+        return FakeBoxFolders.create_folder(box, name, parent)
+
+    box.client.folders.create_folder.side_effect = create_folder
+
+    summary = upload_directory(
+        box.client, str(local_tree), "0", 4, 2, str(tmp_path), executor
+    )
+
+    assert summary["files_failed"] == 0
+    assert box.files[(existing, "0.png")] == b"i" * 5
+
+
+def test_upload_directory_reports_failures_and_continues(
+    local_tree, tmp_path, executor
+):
+    """Test failed files and folders are summarized without stopping the rest"""
+    box = FakeBoxFolders(fail_names={"a.pdf"})
+    create_folder = box.client.folders.create_folder.side_effect
+
+    def fail_images(name, parent):
+        if name == "images":
+            raise RuntimeError("no permission")
+        return create_folder(name, parent)
+
+    box.client.folders.create_folder.side_effect = fail_images
+
+    summary = upload_directory(
+        box.client, str(local_tree), "0", 4, 2, str(tmp_path), executor
+    )
+
+    assert summary["files_uploaded"] == 2
+    assert summary["files_failed"] == 7
+    assert sorted(summary["errors"], key=lambda e: e["path"]) == [
+        {"path": os.path.join("docs", "a.pdf"), "error": "upload of a.pdf failed"},
+        {"path": "images", "error": "no permission"},
+    ]
+
+
+def test_upload_directory_uploads_in_parallel(local_tree, tmp_path, executor):
+    """Test files are uploaded concurrently, up to the concurrency limit"""
+    box = FakeBoxFolders(upload_delay=0.05)
+
+    upload_directory(box.client, str(local_tree), "0", 3, 2, str(tmp_path), executor)
+
+    assert box.max_active == 3
+
+
+def test_upload_directory_skips_unchanged_and_versions_changed_files(
+    local_tree, tmp_path, executor
+):
+    """Test uploading a partly uploaded tree again resumes it without 409s"""
+    box = FakeBoxFolders()
+    docs = box.add_folder("0", "docs")
+    box.add_file("0", "readme.txt", b"readme")
+    box.add_file(docs, "a.pdf", b"old a")
+
+    summary = upload_directory(
+        box.client, str(local_tree), "0", 4, 2, str(tmp_path), executor
+    )
+
+    assert summary["files_skipped"] == 1
+    assert summary["files_uploaded"] == 8
+    assert summary["files_failed"] == 0
+    assert box.versions == [f"{docs}/a.pdf"]
+    assert box.files[(docs, "a.pdf")] == b"a" * 10
+    # Folders created by the run are not checked for existing files
+    assert box.client.uploads.preflight_file_upload_check.call_count == 2
+
+
+def test_upload_directory_runs_on_a_busy_shared_executor(local_tree, tmp_path):
+    """Test a tree uploaded from the executor's only worker still completes"""
+    box = FakeBoxFolders()
+
+    with ThreadPoolExecutor(1) as pool:
+        summary = pool.submit(
+            upload_directory,
+            box.client,
+            str(local_tree),
+            "0",
+            4,
+            2,
+            str(tmp_path),
+            pool,
+        ).result(timeout=10)
+
+    assert summary["files_uploaded"] == 9
+
+
+class FakeBoxTree:
+    """Box folder tree whose downloads track their concurrency"""
+
+    def __init__(self, tree, download_delay=0.0):
+        self.items = {}
+        self.contents = {}
+        self.downloads = []
+        self.fail_ids = set()
+        self.download_delay = download_delay
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self._add("0", tree)
+        self.client = MagicMock()
+        self.client.folders.get_folder_items.side_effect = self.get_folder_items
+        self.client.downloads.download_file_to_output_stream.side_effect = self.download
+
+    def _add(self, folder_id, tree):
+        self.items[folder_id] = []
+        for name, value in tree.items():
+            item_id = str(len(self.contents) + len(self.items) + 100)
+            if isinstance(value, dict):
+                item = MagicMock(id=item_id, type="folder", sha1=None)
+                self._add(item_id, value)
+            else:
+                self.contents[item_id] = value
+                item = MagicMock(
+                    id=item_id, type="file", sha1=hashlib.sha1(value).hexdigest()
+                )
+            item.name = name
+            self.items[folder_id].append(item)
+
+    def get_folder_items(self, folder_id, fields, usemarker, marker, limit):
+        return MagicMock(entries=self.items[folder_id], next_marker=None)
+
+    def download(self, file_id, output_stream):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.downloads.append(file_id)
+        try:
+            time.sleep(self.download_delay)
+            if file_id in self.fail_ids:
+                raise RuntimeError("connection reset")
+            output_stream.write(self.contents[file_id])
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def file_id(self, name):
+        for items in self.items.values():
+            for item in items:
+                if item.name == name:
+                    return item.id
+
+
+BOX_TREE = {
+    "readme.txt": b"readme",
+    "docs": {"a.pdf": b"a" * 10, "2024": {"b.pdf": b"b" * 20}},
+    "images": {f"{i}.png": bytes([i]) * 5 for i in range(6)},
+}
+
+
+def test_download_directory_mirrors_tree(tmp_path, executor):
+    """Test every file is written to its folder's directory and recorded"""
+    box = FakeBoxTree(BOX_TREE)
+
+    summary = download_directory(box.client, "0", str(tmp_path / "out"), 4, executor)
+
+    out = tmp_path / "out"
+    assert summary["folders"] == 3
+    assert summary["files_downloaded"] == 9
+    assert summary["files_skipped"] == 0
+    assert summary["bytes_downloaded"] == 6 + 10 + 20 + 6 * 5
+    assert summary["errors"] == []
+    assert (out / "docs" / "2024" / "b.pdf").read_bytes() == b"b" * 20
+    assert (out / "images" / "3.png").read_bytes() == b"\x03" * 5
+    assert not list(out.rglob("*.part"))
+    manifest = json.loads((out / DOWNLOAD_MANIFEST_NAME).read_text())
+    assert manifest["folder_id"] == "0"
+    assert manifest["files"][box.file_id("a.pdf")]["path"] == os.path.join(
+        "docs", "a.pdf"
+    )
+
+
+def test_download_directory_skips_recorded_files_without_hashing(tmp_path, executor):
+    """Test a second run trusts the manifest for files untouched since"""
+    box = FakeBoxTree(BOX_TREE)
+    download_directory(box.client, "0", str(tmp_path), 4, executor)
+    box.downloads.clear()
+
+    with patch("box_transfer.file_sha1") as mock_sha1:
+        summary = download_directory(box.client, "0", str(tmp_path), 4, executor)
+
+    assert summary["files_skipped"] == 9
+    assert summary["files_downloaded"] == 0
+    assert box.downloads == []
+    mock_sha1.assert_not_called()
+
+
+def test_download_directory_checks_sha1_of_existing_files(tmp_path, executor):
+    """Test local files are skipped when their SHA1 matches, replaced if not"""
+    box = FakeBoxTree(BOX_TREE)
+    (tmp_path / "readme.txt").write_bytes(b"readme")
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "a.pdf").write_bytes(b"stale")
+
+    summary = download_directory(box.client, "0", str(tmp_path), 4, executor)
+
+    assert summary["files_skipped"] == 1
+    assert summary["files_downloaded"] == 8
+    assert box.file_id("readme.txt") not in box.downloads
+    assert (tmp_path / "docs" / "a.pdf").read_bytes() == b"a" * 10
+
+
+def test_download_directory_resumes_after_failures(tmp_path, executor):
+    """Test failed files are reported, and only they are fetched on resume"""
+    box = FakeBoxTree(BOX_TREE)
+    box.fail_ids = {box.file_id("b.pdf")}
+
+    summary = download_directory(box.client, "0", str(tmp_path), 4, executor)
+
+    assert summary["files_failed"] == 1
+    assert summary["errors"] == [
+        {"path": os.path.join("docs", "2024", "b.pdf"), "error": "connection reset"}
+    ]
+    assert not (tmp_path / "docs" / "2024" / "b.pdf").exists()
+
+    box.fail_ids.clear()
+    box.downloads.clear()
+    summary = download_directory(box.client, "0", str(tmp_path), 4, executor)
+
+    assert summary["files_downloaded"] == 1
+    assert summary["files_skipped"] == 8
+    assert box.downloads == [box.file_id("b.pdf")]
+
+
+def test_download_directory_rejects_unsafe_names(tmp_path, executor):
+    """Test an item name that would escape its directory is not written"""
+    box = FakeBoxTree({"..": b"x", "ok.txt": b"ok"})
+
+    summary = download_directory(box.client, "0", str(tmp_path / "out"), 2, executor)
+
+    assert summary["files_downloaded"] == 1
+    assert summary["errors"][0]["error"] == "invalid item name"
+    assert not (tmp_path / "x").exists()
+
+
+def test_download_directory_downloads_in_parallel(tmp_path, executor):
+    """Test files are downloaded concurrently, up to the concurrency limit"""
+    box = FakeBoxTree(BOX_TREE, download_delay=0.05)
+
+    download_directory(box.client, "0", str(tmp_path), 3, executor)
+
+    assert box.max_active == 3
+
+
+def test_download_directory_runs_on_a_busy_shared_executor(tmp_path):
+    """Test a tree downloaded from the executor's only worker still completes"""
+    box = FakeBoxTree(BOX_TREE)
+
+    with ThreadPoolExecutor(1) as pool:
+        summary = pool.submit(
+            download_directory, box.client, "0", str(tmp_path), 4, pool
+        ).result(timeout=10)
+
+    assert summary["files_downloaded"] == 9
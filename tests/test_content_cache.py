@@ -0,0 +1,204 @@
+import hashlib
+import os
+import time
+import zlib
+from unittest.mock import MagicMock
+
+import pytest
+
+from content_cache import STALE_PARTIAL_AGE, ContentCache, TextCache
+
+
+def make_client(contents):
+    """Mock Box client that downloads the given content of each file ID"""
+    client = MagicMock()
+    client.downloaded = []
+
+    def download_file_to_output_stream(file_id, output_stream):
+        client.downloaded.append(file_id)
+        output_stream.write(contents[file_id])
+
+    client.downloads.download_file_to_output_stream.side_effect = (
+        download_file_to_output_stream
+    )
+    return client
+
+
+def sha1(content):
+    return hashlib.sha1(content).hexdigest()
+
+
+def read(cache, client, file_id, content):
+    with cache.open_content(client, file_id, sha1(content)) as f:
+        return f.read()
+
+
+def test_cache_downloads_once_per_version(tmp_path):
+    """Test a file version is downloaded on the first read and then served"""
+    client = make_client({"1": b"report"})
+    cache = ContentCache(str(tmp_path), 1024)
+
+    assert read(cache, client, "1", b"report") == b"report"
+    assert read(cache, client, "1", b"report") == b"report"
+
+    assert client.downloaded == ["1"]
+    assert cache.stats() == {
+        "entries": 1,
+        "size": 6,
+        "max_size": 1024,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+    }
+
+
+def test_cache_replaces_older_versions(tmp_path):
+    """Test a new version of a file is downloaded and replaces the old one"""
+    contents = {"1": b"v1"}
+    client = make_client(contents)
+    cache = ContentCache(str(tmp_path), 1024)
+    read(cache, client, "1", b"v1")
+
+    contents["1"] = b"v2"
+    assert read(cache, client, "1", b"v2") == b"v2"
+
+    assert client.downloaded == ["1", "1"]
+    assert os.listdir(tmp_path) == [f"1-{sha1(b'v2')}"]
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Test entries are evicted least recently used first to fit the cap"""
+    contents = {"1": b"a" * 40, "2": b"b" * 40, "3": b"c" * 40}
+    client = make_client(contents)
+    cache = ContentCache(str(tmp_path), 100)
+    read(cache, client, "1", contents["1"])
+    read(cache, client, "2", contents["2"])
+    read(cache, client, "1", contents["1"])
+
+    read(cache, client, "3", contents["3"])
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 80
+    assert sorted(os.listdir(tmp_path)) == [
+        f"1-{sha1(contents['1'])}",
+        f"3-{sha1(contents['3'])}",
+    ]
+
+
+def test_cache_rejects_sha1_mismatch(tmp_path):
+    """Test a download that does not match the version's SHA1 is not cached"""
+    client = make_client({"1": b"corrupted"})
+    cache = ContentCache(str(tmp_path), 1024)
+
+    with pytest.raises(ValueError, match="SHA1 mismatch"):
+        cache.open_content(client, "1", sha1(b"report"))
+
+    assert os.listdir(tmp_path) == []
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_survives_restart_in_lru_order(tmp_path):
+    """Test entries on disk are reused, ordered by their last use"""
+    contents = {"1": b"a" * 40, "2": b"b" * 40}
+    client = make_client(contents)
+    cache = ContentCache(str(tmp_path), 100)
+    read(cache, client, "1", contents["1"])
+    read(cache, client, "2", contents["2"])
+    old = time.time() - 60
+    os.utime(tmp_path / f"2-{sha1(contents['2'])}", (old, old))
+
+    restarted = ContentCache(str(tmp_path), 60)
+
+    assert restarted.stats()["entries"] == 1
+    assert read(restarted, client, "1", contents["1"]) == contents["1"]
+    assert client.downloaded == ["1", "2"]
+
+
+def test_cache_uses_entries_added_by_other_processes(tmp_path):
+    """Test an entry written by another worker is served without a download"""
+    client = make_client({"1": b"report"})
+    cache = ContentCache(str(tmp_path), 1024)
+    other = ContentCache(str(tmp_path), 1024)
+    read(other, client, "1", b"report")
+
+    assert read(cache, client, "1", b"report") == b"report"
+    assert client.downloaded == ["1"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_cache_removes_stale_partial_files(tmp_path):
+    """Test partial downloads left by a crash are removed, recent ones kept"""
+    stale = tmp_path / "1-abc.x.part"
+    recent = tmp_path / "2-def.y.part"
+    stale.write_bytes(b"x")
+    recent.write_bytes(b"y")
+    old = time.time() - STALE_PARTIAL_AGE - 1
+    os.utime(stale, (old, old))
+
+    cache = ContentCache(str(tmp_path), 1024)
+
+    assert not stale.exists()
+    assert recent.exists()
+    assert cache.stats()["entries"] == 0
+
+
+def test_text_cache_serves_from_memory(tmp_path):
+    """Test a cached text is served from memory and counted as a hit"""
+    cache = TextCache(str(tmp_path), memory_size=1024, disk_size=1024)
+
+    assert cache.get("1", "a" * 40) is None
+    cache.put("1", "a" * 40, "contract text")
+
+    assert cache.get("1", "a" * 40) == "contract text"
+    assert cache.get("1", "b" * 40) is None
+    stats = cache.stats()
+    assert stats["hits"] == stats["memory_hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["memory"] == {"entries": 1, "size": 13, "max_size": 1024}
+
+
+def test_text_cache_bounds_memory_by_bytes(tmp_path):
+    """Test the memory tier drops least recently used texts to fit its bytes"""
+    cache = TextCache(str(tmp_path), memory_size=25, disk_size=1024)
+    cache.put("1", "a" * 40, "x" * 10)
+    cache.put("2", "a" * 40, "y" * 10)
+    cache.get("1", "a" * 40)
+
+    cache.put("3", "a" * 40, "z" * 10)
+
+    assert cache.stats()["memory"]["entries"] == 2
+    # Evicted from memory, still on disk
+    assert cache.get("2", "a" * 40) == "y" * 10
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_text_cache_disk_tier_is_compressed_and_persistent(tmp_path):
+    """Test texts are stored compressed and survive a restart"""
+    text = "Section 1. Definitions.\n" * 1000
+    TextCache(str(tmp_path), memory_size=1024, disk_size=1024 * 1024).put(
+        "1", "a" * 40, text
+    )
+
+    (entry,) = os.listdir(tmp_path)
+    stored = (tmp_path / entry).read_bytes()
+    assert len(stored) < len(text) / 10
+    assert zlib.decompress(stored).decode("utf-8") == text
+
+    restarted = TextCache(str(tmp_path), memory_size=1024 * 1024, disk_size=1024)
+    assert restarted.get("1", "a" * 40) == text
+    assert restarted.get("1", "a" * 40) == text
+    assert restarted.stats()["disk_hits"] == 1
+    assert restarted.stats()["memory_hits"] == 1
+
+
+def test_text_cache_replaces_older_versions(tmp_path):
+    """Test caching a new version of a file drops the old one from both tiers"""
+    cache = TextCache(str(tmp_path), memory_size=1024, disk_size=1024)
+    cache.put("1", "a" * 40, "draft")
+
+    cache.put("1", "b" * 40, "final")
+
+    assert cache.get("1", "a" * 40) is None
+    assert cache.get("1", "b" * 40) == "final"
+    assert cache.stats()["memory"]["entries"] == 1
+    assert os.listdir(tmp_path) == [f"1-{'b' * 40}"]
@@ -1,10 +1,22 @@
 import argparse
+import json
+import os
+import runpy
+import sys
 from unittest.mock import Mock, patch
 
 import pytest
 from mcp.server.fastmcp import FastMCP
+from starlette.applications import Starlette
 
-from mcp_server_box import get_mcp_server
+import mcp_server_box
+from mcp_server_box import (
+    create_http_app,
+    create_server,
+    get_mcp_server,
+    run_http_workers,
+)
+from tool_registry import BOX_TOOLS
 
 
 @pytest.fixture
@@ -29,7 +41,7 @@ class TestGetMcpServer:
     """Test the get_mcp_server function."""
 
     @patch("mcp_server_box.FastMCP")
-    @patch("mcp_server_box.box_lifespan")
+    @patch("mcp_server_box.lazy_box_lifespan")
     def test_get_mcp_server_stdio_default(self, mock_lifespan, mock_fastmcp_class):
         """Test get_mcp_server with default stdio transport."""
         mock_instance = Mock()
@@ -43,7 +55,7 @@ class TestGetMcpServer:
         assert result == mock_instance
 
     @patch("mcp_server_box.FastMCP")
-    @patch("mcp_server_box.box_lifespan")
+    @patch("mcp_server_box.lazy_box_lifespan")
     def test_get_mcp_server_stdio_explicit(self, mock_lifespan, mock_fastmcp_class):
         """Test get_mcp_server with explicit stdio transport."""
         mock_instance = Mock()
@@ -57,7 +69,7 @@ class TestGetMcpServer:
         assert result == mock_instance
 
     @patch("mcp_server_box.FastMCP")
-    @patch("mcp_server_box.box_lifespan")
+    @patch("mcp_server_box.lazy_box_lifespan")
     def test_get_mcp_server_sse_transport(self, mock_lifespan, mock_fastmcp_class):
         """Test get_mcp_server with SSE transport."""
         mock_instance = Mock()
@@ -77,7 +89,7 @@ class TestGetMcpServer:
         assert result == mock_instance
 
     @patch("mcp_server_box.FastMCP")
-    @patch("mcp_server_box.box_lifespan")
+    @patch("mcp_server_box.lazy_box_lifespan")
     def test_get_mcp_server_http_transport(self, mock_lifespan, mock_fastmcp_class):
         """Test get_mcp_server with HTTP transport."""
         mock_instance = Mock()
@@ -100,27 +112,19 @@ class TestGetMcpServer:
 class TestMainExecution:
     """Test the main execution block."""
 
-    # @patch("mcp_server_box.argparse.ArgumentParser")
-    # @patch("mcp_server_box.get_mcp_server")
-    # @patch("mcp_server_box.register_tools")
+    @patch("mcp.server.fastmcp.FastMCP.run")
+    @patch("fastapi.FastAPI")
+    def test_main_execution_sse_transport(self, mock_fastapi, mock_run, monkeypatch):
+        """Test the SSE transport mounts the MCP SSE app on a FastAPI app."""
+        monkeypatch.setattr(sys, "argv", ["mcp_server_box.py", "--transport", "sse"])
 
-    @patch("mcp_server_box.FastAPI")
-    def test_main_execution_sse_transport(self, mock_fastapi):
-        """Test main execution with SSE transport configuration."""
-        # Test that FastAPI would be imported and used for SSE
-        mock_app = Mock()
-        mock_fastapi.return_value = mock_app
+        runpy.run_path(mcp_server_box.__file__, run_name="__main__")
 
-        # Simulate SSE transport configuration
-        mock_mcp = Mock()
-        mock_mcp.sse_app.return_value = Mock()
-
-        # This simulates the SSE block in main
-        app = mock_fastapi()
-        app.mount("/", mock_mcp.sse_app())
-
-        mock_fastapi.assert_called_once()
-        mock_app.mount.assert_called_once_with("/", mock_mcp.sse_app())
+        mock_fastapi.assert_called_once_with()
+        path, app = mock_fastapi.return_value.mount.call_args.args
+        assert path == "/"
+        assert isinstance(app, Starlette)
+        mock_run.assert_called_once_with(transport="sse")
 
     def test_argument_parser_configuration(self):
         """Test that argument parser is configured correctly."""
@@ -291,3 +295,116 @@ class TestMcpServerInfoTool:
         assert result["transport"] == "http"
         assert result["host"] == "192.168.1.100"
         assert result["port"] == 8080
+
+
+class TestHttpWorkers:
+    """Test the multi-process streamable-http mode."""
+
+    @pytest.mark.asyncio
+    async def test_create_server_registers_tools(self):
+        """Test that every server gets the Box tools and the info tool."""
+        mcp = create_server("http", "127.0.0.1", 8000)
+
+        names = {tool.name for tool in await mcp.list_tools()}
+
+        assert len(names) == len(BOX_TOOLS) + 1
+        assert "mcp_server_info" in names
+
+    @pytest.mark.asyncio
+    async def test_server_info_reports_counters(self):
+        """Test that the info tool reports coalescing and rate limit counters."""
+        mcp = create_server("stdio", "127.0.0.1", 8000)
+
+        content = await mcp.call_tool("mcp_server_info", {})
+        info = json.loads(content[0].text)
+
+        assert set(info["coalescing"]) == {"calls", "coalesced", "in_flight"}
+        assert info["rate_limits"]["search"]["queued"] == 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("transport", ["stdio", "http"])
+    async def test_server_info_reports_content_cache(self, transport):
+        """Test that the info tool reports the content cache on every transport."""
+        from server_context import get_content_cache
+
+        mcp = create_server(transport, "127.0.0.1", 8000)
+
+        content = await mcp.call_tool("mcp_server_info", {})
+        info = json.loads(content[0].text)
+
+        assert info["content_cache"] == get_content_cache().stats()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "transport, host, port",
+        [("stdio", "N/A", "N/A"), ("http", "127.0.0.1", 8000)],
+    )
+    async def test_server_info_address(self, transport, host, port):
+        """Test that only the address differs between transports."""
+        from server_context import get_text_cache
+
+        mcp = create_server(transport, "127.0.0.1", 8000)
+
+        content = await mcp.call_tool("mcp_server_info", {})
+        info = json.loads(content[0].text)
+
+        assert info["transport"] == transport
+        assert (info["host"], info["port"]) == (host, port)
+        assert info["text_cache"] == get_text_cache().stats()
+        assert set(info) == {
+            "server_name",
+            "transport",
+            "host",
+            "port",
+            "coalescing",
+            "rate_limits",
+            "content_cache",
+            "text_cache",
+        }
+
+    def test_create_http_app(self, monkeypatch):
+        """Test the worker app factory builds a streamable-http app."""
+        monkeypatch.setenv("BOX_MCP_HOST", "127.0.0.1")
+        monkeypatch.setenv("BOX_MCP_PORT", "9000")
+
+        app = create_http_app()
+
+        assert isinstance(app, Starlette)
+        assert [route.path for route in app.routes] == ["/mcp"]
+
+    @patch.dict(os.environ)
+    @patch("mcp_server_box.uvicorn.run")
+    def test_run_http_workers(self, mock_run):
+        """Test workers run from the app factory with a temporary token cache."""
+        os.environ.pop("BOX_MCP_TOKEN_CACHE", None)
+        token_cache = {}
+
+        def run(*args, **kwargs):
+            token_cache["path"] = os.environ["BOX_MCP_TOKEN_CACHE"]
+            assert os.path.isdir(os.path.dirname(token_cache["path"]))
+
+        mock_run.side_effect = run
+
+        run_http_workers("127.0.0.1", 9000, 4)
+
+        mock_run.assert_called_once_with(
+            "mcp_server_box:create_http_app",
+            factory=True,
+            host="127.0.0.1",
+            port=9000,
+            workers=4,
+        )
+        assert os.environ["BOX_MCP_PORT"] == "9000"
+        assert not os.path.exists(os.path.dirname(token_cache["path"]))
+
+    @patch.dict(os.environ)
+    @patch("mcp_server_box.uvicorn.run")
+    def test_run_http_workers_keeps_token_cache(self, mock_run, tmp_path):
+        """Test a configured token cache is used and left in place."""
+        path = str(tmp_path / "token.json")
+        os.environ["BOX_MCP_TOKEN_CACHE"] = path
+
+        run_http_workers("127.0.0.1", 9000, 2)
+
+        assert os.environ["BOX_MCP_TOKEN_CACHE"] == path
+        assert tmp_path.exists()
@@ -0,0 +1,279 @@
+import asyncio
+import io
+from email.utils import formatdate
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from box_sdk_gen import BoxAPIError, FetchOptions, FetchResponse, NetworkSession
+
+from rate_limits import (
+    BoxRetryStrategy,
+    RateLimitedNetworkClient,
+    RateLimitRetryStrategy,
+    RateLimitScheduler,
+    TokenBucket,
+    endpoint_class,
+    retry_after_seconds,
+)
+
+API_URL = "https://api.box.com/2.0"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_response(status, headers=None, body=b"{}"):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = body
+    response.url = f"{API_URL}/search"
+    return response
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        (f"{API_URL}/search?query=report", "search"),
+        (f"{API_URL}/ai/ask", "ai"),
+        (f"{API_URL}/ai/extract_structured", "ai"),
+        ("https://upload.box.com/api/2.0/files/content", "upload"),
+        ("https://upload.box.com/api/2.0/files/upload_sessions", "upload"),
+        (f"{API_URL}/metadata_templates/enterprise", "metadata"),
+        (f"{API_URL}/files/1/metadata/enterprise/invoice", "metadata"),
+        (f"{API_URL}/docgen_templates", "docgen"),
+        (f"{API_URL}/docgen_batches/1", "docgen"),
+        (f"{API_URL}/folders/0/items", "default"),
+        (f"{API_URL}/files/1/content", "default"),
+        ("https://api.box.com/oauth2/token", "default"),
+    ],
+)
+def test_endpoint_class(url, expected):
+    """Test URLs are classified into Box's rate limit classes"""
+    assert endpoint_class(url) == expected
+
+
+def test_token_bucket_spaces_calls_after_burst():
+    """Test calls past the burst wait one interval each, in arrival order"""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+
+    delays = [bucket.reserve() for _ in range(4)]
+
+    assert delays == [0.0, 0.0, 0.5, 1.0]
+
+
+def test_token_bucket_refills_up_to_burst():
+    """Test tokens refill at the rate and never beyond the burst"""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+    bucket.reserve()
+    bucket.reserve()
+
+    clock.now = 10.0
+
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.5]
+
+
+def test_token_bucket_pause_delays_and_empties():
+    """Test a pause holds every call, then resumes at the rate without a burst"""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+
+    bucket.pause(3.0)
+
+    assert bucket.reserve() == 3.0
+    assert bucket.reserve() == 3.5
+    clock.now = 1.0
+    assert bucket.reserve() == 3.0
+
+
+def test_unlimited_bucket_only_waits_for_pauses():
+    """Test a bucket without a rate never queues except when paused"""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=None, clock=clock)
+
+    assert [bucket.reserve() for _ in range(100)] == [0.0] * 100
+    bucket.pause(2.0)
+    assert bucket.reserve() == 2.0
+    clock.now = 2.0
+    assert bucket.reserve() == 0.0
+
+
+@patch("rate_limits.time.sleep")
+def test_scheduler_acquire_waits_and_records_stats(mock_sleep):
+    """Test acquire sleeps for its turn and records the wait"""
+    clock = FakeClock()
+    scheduler = RateLimitScheduler({"search": 1.0}, clock=clock)
+
+    scheduler.acquire(f"{API_URL}/search")
+    scheduler.acquire(f"{API_URL}/search")
+    scheduler.acquire(f"{API_URL}/folders/0/items")
+
+    mock_sleep.assert_called_once_with(1.0)
+    stats = scheduler.stats()
+    assert stats["search"] == {
+        "rate": 1.0,
+        "queued": 0,
+        "requests": 2,
+        "throttled": 0,
+        "wait_avg": 0.5,
+        "wait_max": 1.0,
+    }
+    assert stats["default"]["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_reports_queue_depth():
+    """Test callers waiting for a token are counted as queued"""
+    scheduler = RateLimitScheduler({"search": 100.0})
+    scheduler.buckets["search"].burst = 1
+    scheduler.buckets["search"].tokens = 1
+
+    waiters = [
+        asyncio.ensure_future(scheduler.acquire_async(f"{API_URL}/search"))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+
+    assert scheduler.stats()["search"]["queued"] == 2
+    await asyncio.gather(*waiters)
+    assert scheduler.stats()["search"]["queued"] == 0
+
+
+def test_scheduler_throttle_pauses_only_that_class():
+    """Test a 429 pauses its endpoint class and leaves the others running"""
+    clock = FakeClock()
+    scheduler = RateLimitScheduler({"search": 10.0, "ai": 10.0}, clock=clock)
+
+    scheduler.throttle(f"{API_URL}/ai/ask", 5.0)
+
+    assert scheduler.buckets["ai"].reserve() == 5.0
+    assert scheduler.buckets["search"].reserve() == 0.0
+    assert scheduler.stats()["ai"]["throttled"] == 1
+
+
+def test_retry_strategy_queues_429_past_the_sdk_budget():
+    """Test 429s are retried beyond the SDK's five attempts, up to max_retries"""
+    scheduler = RateLimitScheduler(max_retries=8)
+    strategy = RateLimitRetryStrategy(scheduler)
+    options = FetchOptions(url=f"{API_URL}/ai/ask", method="POST")
+    throttled = FetchResponse(status=429, headers={"Retry-After": "7"})
+
+    assert strategy.should_retry(options, throttled, 8)
+    assert not strategy.should_retry(options, throttled, 9)
+    with patch.object(scheduler, "throttle") as mock_throttle:
+        assert strategy.retry_after(options, throttled, 1) == 0.0
+    mock_throttle.assert_called_once_with(f"{API_URL}/ai/ask", 7.0)
+
+
+def test_retry_strategy_defers_other_statuses_to_the_sdk():
+    """Test server errors keep the SDK's retry budget and backoff"""
+    strategy = RateLimitRetryStrategy(RateLimitScheduler())
+    options = FetchOptions(url=f"{API_URL}/folders/0", method="GET")
+    failed = FetchResponse(status=503, headers={"Retry-After": "2"})
+
+    assert strategy.should_retry(options, failed, 4)
+    assert not strategy.should_retry(options, failed, 5)
+    assert strategy.retry_after(options, failed, 1) == 2.0
+    assert isinstance(strategy, BoxRetryStrategy)
+
+
+@patch("rate_limits.time.sleep")
+def test_network_client_queues_throttled_call(mock_sleep):
+    """Test a throttled call waits out Retry-After in the queue and succeeds"""
+    scheduler = RateLimitScheduler()
+    session = MagicMock()
+    session.request.side_effect = [
+        make_response(429, {"Retry-After": "3"}),
+        make_response(200, body=b'{"entries": []}'),
+    ]
+    network_session = NetworkSession(
+        network_client=RateLimitedNetworkClient(session, scheduler),
+        retry_strategy=RateLimitRetryStrategy(scheduler),
+    )
+
+    response = network_session.network_client.fetch(
+        FetchOptions(
+            url=f"{API_URL}/search",
+            method="GET",
+            network_session=network_session,
+        )
+    )
+
+    assert response.status == 200
+    assert session.request.call_count == 2
+    # The SDK sleeps for no time; the retry waits out Retry-After in the queue
+    delays = [call.args[0] for call in mock_sleep.call_args_list]
+    assert delays == [0.0, pytest.approx(3.0, abs=0.1)]
+    assert scheduler.stats()["search"]["throttled"] == 1
+
+
+@patch("rate_limits.time.time", return_value=1_000_000.0)
+def test_retry_after_accepts_seconds_and_http_dates(_):
+    """Test Retry-After is read as seconds or a date, else backoff is used"""
+    assert retry_after_seconds("7", 1) == 7.0
+    assert retry_after_seconds(formatdate(1_000_030.0, usegmt=True), 1) == 30.0
+    assert retry_after_seconds(formatdate(999_000.0, usegmt=True), 1) == 0.0
+    assert 1.0 <= retry_after_seconds("soon", 1) <= 3.0
+
+
+class UnseekableStream(io.BytesIO):
+    def seekable(self):
+        return False
+
+
+def fetch_upload(session, scheduler, stream):
+    network_session = NetworkSession(
+        network_client=RateLimitedNetworkClient(session, scheduler),
+        retry_strategy=RateLimitRetryStrategy(scheduler),
+    )
+    return network_session.network_client.fetch(
+        FetchOptions(
+            url="https://upload.box.com/api/2.0/files/upload_sessions/1",
+            method="PUT",
+            content_type="application/octet-stream",
+            file_stream=stream,
+            network_session=network_session,
+        )
+    )
+
+
+@patch("rate_limits.time.sleep")
+def test_network_client_rewinds_streamed_body_after_429(_):
+    """Test a throttled upload sends its whole body again on the retry"""
+    sent = []
+
+    def request(**kwargs):
+        sent.append(kwargs["data"].read())
+        if len(sent) == 1:
+            return make_response(429, {"Retry-After": "0"})
+        return make_response(200)
+
+    session = MagicMock()
+    session.request.side_effect = request
+    stream = io.BytesIO(b"header:part")
+    stream.seek(7)
+
+    response = fetch_upload(session, RateLimitScheduler(), stream)
+
+    assert response.status == 200
+    assert sent == [b"part", b"part"]
+
+
+@patch("rate_limits.time.sleep")
+def test_network_client_does_not_retry_unseekable_body(_):
+    """Test a throttled upload from a stream that cannot rewind is not resent"""
+    session = MagicMock()
+    session.request.return_value = make_response(429, {"Retry-After": "0"})
+
+    with pytest.raises(BoxAPIError):
+        fetch_upload(session, RateLimitScheduler(), UnseekableStream(b"part"))
+
+    assert session.request.call_count == 1
@@ -1,10 +1,112 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from typing import AsyncIterator
 from unittest.mock import MagicMock, Mock, patch
 
+import httpx
 import pytest
+from box_sdk_gen import (
+    AccessToken,
+    BoxNetworkClient,
+    CCGConfig,
+    InMemoryTokenStorage,
+)
 
-from server_context import BoxContext, box_lifespan
+import server_context
+from rate_limits import (
+    RATE_LIMITS,
+    RateLimitedNetworkClient,
+    RateLimitRetryStrategy,
+)
+from server_context import (
+    BoxContext,
+    HttpSettings,
+    KeepAliveSession,
+    SharedTokenStorage,
+    SingleFlightCCGAuth,
+    UserClientPool,
+    box_lifespan,
+    TokenManager,
+    get_content_cache,
+    get_executor,
+    get_http_settings,
+    get_max_inline_size,
+    get_max_workers,
+    get_rate_limiter,
+    get_shared_client,
+    get_text_cache,
+    get_transfer_concurrency,
+    get_token_manager,
+    get_user_client_pool,
+    get_user_mode,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_client():
+    """Give each test a fresh process-wide Box client and token manager."""
+    original_client = server_context._client
+    original_token_manager = server_context._token_manager
+    original_user_clients = server_context._user_clients
+    original_rate_limiter = server_context._rate_limiter
+    original_content_cache = server_context._content_cache
+    original_text_cache = server_context._text_cache
+    server_context._client = None
+    server_context._token_manager = None
+    server_context._user_clients = None
+    server_context._rate_limiter = None
+    server_context._content_cache = None
+    server_context._text_cache = None
+    yield
+    if server_context._token_manager is not None:
+        server_context._token_manager.stop()
+    server_context._client = original_client
+    server_context._token_manager = original_token_manager
+    server_context._user_clients = original_user_clients
+    server_context._rate_limiter = original_rate_limiter
+    server_context._content_cache = original_content_cache
+    server_context._text_cache = original_text_cache
+
+
+@pytest.fixture
+def token_lifetime():
+    """Lifetime in seconds of tokens issued by the fake token endpoint."""
+    return 3600
+
+
+@pytest.fixture
+def token_exchanges(token_lifetime):
+    """Count CCG token exchanges against a fake token endpoint."""
+    exchanges = []
+    lock = threading.Lock()
+
+    def request_access_token(*args, **kwargs):
+        time.sleep(0.01)  # Widen the window for racing callers
+        with lock:
+            exchanges.append(threading.current_thread().name)
+            return AccessToken(
+                access_token=f"token-{len(exchanges)}", expires_in=token_lifetime
+            )
+
+    config = CCGConfig(
+        client_id="client_id",
+        client_secret="client_secret",
+        enterprise_id="12345",
+        token_storage=InMemoryTokenStorage(),
+    )
+    with (
+        patch("server_context.get_ccg_config", return_value=config),
+        patch("box_sdk_gen.box.ccg_auth.AuthorizationManager") as mock_manager,
+    ):
+        mock_manager.return_value.request_access_token.side_effect = (
+            request_access_token
+        )
+        yield exchanges
 
 
 class TestBoxContext:
@@ -14,6 +116,8 @@ class TestBoxContext:
         """Test BoxContext initialization with default values."""
         context = BoxContext()
         assert context.client is None
+        assert context.executor is None
+        assert context.http_client is None
 
     def test_box_context_with_client(self):
         """Test BoxContext initialization with a client."""
@@ -62,27 +166,27 @@ class TestBoxLifespan:
     """Test the box_lifespan async context manager."""
 
     @pytest.mark.asyncio
-    @patch("server_context.get_oauth_client")
-    async def test_box_lifespan_success(self, mock_get_oauth_client):
+    @patch("server_context.create_ccg_client")
+    async def test_box_lifespan_success(self, mock_create_ccg_client):
         """Test successful box_lifespan context manager execution."""
         mock_client = MagicMock()
-        mock_get_oauth_client.return_value = mock_client
+        mock_create_ccg_client.return_value = mock_client
         mock_server = MagicMock()
 
         async with box_lifespan(mock_server) as context:
             assert isinstance(context, BoxContext)
             assert context.client == mock_client
 
-        mock_get_oauth_client.assert_called_once()
+        mock_create_ccg_client.assert_called_once()
 
     @pytest.mark.asyncio
-    @patch("server_context.get_oauth_client")
+    @patch("server_context.create_ccg_client")
     async def test_box_lifespan_client_initialization_failure(
-        self, mock_get_oauth_client
+        self, mock_create_ccg_client
     ):
         """Test box_lifespan when client initialization fails."""
-        mock_get_oauth_client.side_effect = Exception(
-            "OAuth client initialization failed"
+        mock_create_ccg_client.side_effect = Exception(
+            "CCG client initialization failed"
         )
         mock_server = MagicMock()
 
@@ -90,15 +194,15 @@ class TestBoxLifespan:
             async with box_lifespan(mock_server) as context:  # noqa: F841
                 pass  # This shouldn't be reached
 
-        assert str(exc_info.value) == "OAuth client initialization failed"
-        mock_get_oauth_client.assert_called_once()
+        assert str(exc_info.value) == "CCG client initialization failed"
+        mock_create_ccg_client.assert_called_once()
 
     @pytest.mark.asyncio
-    @patch("server_context.get_oauth_client")
-    async def test_box_lifespan_exception_during_yield(self, mock_get_oauth_client):
+    @patch("server_context.create_ccg_client")
+    async def test_box_lifespan_exception_during_yield(self, mock_create_ccg_client):
         """Test box_lifespan when an exception occurs during the yield block."""
         mock_client = MagicMock()
-        mock_get_oauth_client.return_value = mock_client
+        mock_create_ccg_client.return_value = mock_client
         mock_server = MagicMock()
 
         with pytest.raises(ValueError) as exc_info:
@@ -107,14 +211,14 @@ class TestBoxLifespan:
                 raise ValueError("Test exception during yield")
 
         assert str(exc_info.value) == "Test exception during yield"
-        mock_get_oauth_client.assert_called_once()
+        mock_create_ccg_client.assert_called_once()
 
     @pytest.mark.asyncio
-    @patch("server_context.get_oauth_client")
-    async def test_box_lifespan_cleanup_called(self, mock_get_oauth_client):
+    @patch("server_context.create_ccg_client")
+    async def test_box_lifespan_cleanup_called(self, mock_create_ccg_client):
         """Test that box_lifespan cleanup code is executed."""
         mock_client = MagicMock()
-        mock_get_oauth_client.return_value = mock_client
+        mock_create_ccg_client.return_value = mock_client
         mock_server = MagicMock()
 
         # Mock the cleanup section by patching the entire function
@@ -125,7 +229,7 @@ class TestBoxLifespan:
         @asynccontextmanager
         async def mock_box_lifespan(server) -> AsyncIterator[BoxContext]:
             try:
-                client = mock_get_oauth_client()
+                client = mock_create_ccg_client()
                 yield BoxContext(client=client)
             finally:
                 # Track that cleanup was called
@@ -136,46 +240,46 @@ class TestBoxLifespan:
             assert context.client == mock_client
 
         assert len(cleanup_called) == 1
-        mock_get_oauth_client.assert_called_once()
+        mock_create_ccg_client.assert_called_once()
 
     @pytest.mark.asyncio
-    @patch("server_context.get_oauth_client")
-    async def test_box_lifespan_with_none_client(self, mock_get_oauth_client):
-        """Test box_lifespan when get_oauth_client returns None."""
-        mock_get_oauth_client.return_value = None
+    @patch("server_context.create_ccg_client")
+    async def test_box_lifespan_with_none_client(self, mock_create_ccg_client):
+        """Test box_lifespan when create_ccg_client returns None."""
+        mock_create_ccg_client.return_value = None
         mock_server = MagicMock()
 
         async with box_lifespan(mock_server) as context:
             assert isinstance(context, BoxContext)
             assert context.client is None
 
-        mock_get_oauth_client.assert_called_once()
+        mock_create_ccg_client.assert_called_once()
 
     @pytest.mark.asyncio
-    @patch("server_context.get_oauth_client")
-    async def test_box_lifespan_multiple_calls(self, mock_get_oauth_client):
-        """Test multiple calls to box_lifespan."""
+    @patch("server_context.create_ccg_client")
+    async def test_box_lifespan_multiple_calls(self, mock_create_ccg_client):
+        """Test that multiple box_lifespan calls share one client."""
         mock_client1 = MagicMock()
         mock_client2 = MagicMock()
-        mock_get_oauth_client.side_effect = [mock_client1, mock_client2]
+        mock_create_ccg_client.side_effect = [mock_client1, mock_client2]
         mock_server = MagicMock()
 
         # First call
         async with box_lifespan(mock_server) as context1:
             assert context1.client == mock_client1
 
-        # Second call
+        # Second call reuses the process-wide client
         async with box_lifespan(mock_server) as context2:
-            assert context2.client == mock_client2
+            assert context2.client == mock_client1
 
-        assert mock_get_oauth_client.call_count == 2
+        assert mock_create_ccg_client.call_count == 1
 
     @pytest.mark.asyncio
-    @patch("server_context.get_oauth_client")
-    async def test_box_lifespan_context_isolation(self, mock_get_oauth_client):
+    @patch("server_context.create_ccg_client")
+    async def test_box_lifespan_context_isolation(self, mock_create_ccg_client):
         """Test that different box_lifespan contexts are isolated."""
         mock_client = MagicMock()
-        mock_get_oauth_client.return_value = mock_client
+        mock_create_ccg_client.return_value = mock_client
         mock_server1 = MagicMock()
         mock_server2 = MagicMock()
 
@@ -187,14 +291,14 @@ class TestBoxLifespan:
                 assert context1 is not context2  # Different instances
                 assert context1.client == context2.client  # Same client
 
-        assert mock_get_oauth_client.call_count == 2
+        mock_create_ccg_client.assert_called_once()
 
     @pytest.mark.asyncio
-    @patch("server_context.get_oauth_client")
-    async def test_box_lifespan_server_parameter_unused(self, mock_get_oauth_client):
+    @patch("server_context.create_ccg_client")
+    async def test_box_lifespan_server_parameter_unused(self, mock_create_ccg_client):
         """Test that the server parameter is not used in the current implementation."""
         mock_client = MagicMock()
-        mock_get_oauth_client.return_value = mock_client
+        mock_create_ccg_client.return_value = mock_client
 
         # Pass different server objects to verify they don't affect the outcome
         mock_server1 = MagicMock()
@@ -211,7 +315,7 @@ class TestBoxLifespan:
 
         # Both should have the same client since server parameter is not used
         assert client1 == client2 == mock_client
-        assert mock_get_oauth_client.call_count == 2
+        mock_create_ccg_client.assert_called_once()
 
     # def test_box_lifespan_is_async_context_manager(self):
     #     """Test that box_lifespan is properly decorated as an async context manager."""
@@ -224,17 +328,731 @@ class TestBoxLifespan:
     #     assert inspect.iscoroutinefunction(box_lifespan(MagicMock()).__aenter__)
 
 
+class TestExecutor:
+    """Test the shared executor used for blocking Box API calls."""
+
+    @pytest.fixture(autouse=True)
+    def reset_executor(self):
+        """Give each test a fresh process-wide executor."""
+        original = server_context._executor
+        server_context._executor = None
+        yield
+        if server_context._executor is not None:
+            server_context._executor.shutdown(wait=False)
+        server_context._executor = original
+
+    def test_get_max_workers_from_env(self, monkeypatch):
+        """Test that the pool size is read from BOX_MCP_MAX_WORKERS."""
+        monkeypatch.setenv("BOX_MCP_MAX_WORKERS", "3")
+        assert get_max_workers() == 3
+
+    def test_get_max_workers_default(self, monkeypatch):
+        """Test the default pool size when the variable is unset."""
+        monkeypatch.delenv("BOX_MCP_MAX_WORKERS", raising=False)
+        assert 1 <= get_max_workers() <= 32
+
+    def test_get_max_workers_invalid(self, monkeypatch):
+        """Test that a non-positive pool size is rejected."""
+        monkeypatch.setenv("BOX_MCP_MAX_WORKERS", "0")
+        with pytest.raises(ValueError):
+            get_max_workers()
+
+    def test_get_executor_is_shared(self, monkeypatch):
+        """Test that the executor is created once and bounded by the setting."""
+        monkeypatch.setenv("BOX_MCP_MAX_WORKERS", "2")
+        executor = get_executor()
+
+        assert isinstance(executor, ThreadPoolExecutor)
+        assert executor._max_workers == 2
+        assert get_executor() is executor
+
+    @pytest.mark.asyncio
+    @patch("server_context.create_ccg_client")
+    async def test_box_lifespan_shares_executor(self, mock_create_ccg_client):
+        """Test that every lifespan hands out the same executor."""
+        mock_server = MagicMock()
+
+        async with box_lifespan(mock_server) as context1:
+            async with box_lifespan(mock_server) as context2:
+                assert context1.executor is get_executor()
+                assert context2.executor is context1.executor
+
+        # Leaving the lifespan must not shut the shared pool down
+        assert get_executor().submit(lambda: 42).result() == 42
+
+
+class TestHttpSettings:
+    """Test connection pooling and timeouts of the Box HTTP clients."""
+
+    def test_defaults(self, monkeypatch):
+        """Test the default settings when no variable is set."""
+        for name in (
+            "BOX_MCP_HTTP_POOL_SIZE",
+            "BOX_MCP_HTTP_MAX_PER_HOST",
+            "BOX_MCP_HTTP_KEEPALIVE",
+            "BOX_MCP_HTTP_CONNECT_TIMEOUT",
+            "BOX_MCP_HTTP_READ_TIMEOUT",
+        ):
+            monkeypatch.delenv(name, raising=False)
+
+        assert get_http_settings() == HttpSettings()
+        assert HttpSettings().connect_timeout == 5.0
+        assert HttpSettings().read_timeout == 60.0
+
+    def test_from_env(self, monkeypatch):
+        """Test that every setting is read from its environment variable."""
+        monkeypatch.setenv("BOX_MCP_HTTP_POOL_SIZE", "20")
+        monkeypatch.setenv("BOX_MCP_HTTP_MAX_PER_HOST", "8")
+        monkeypatch.setenv("BOX_MCP_HTTP_KEEPALIVE", "15.5")
+        monkeypatch.setenv("BOX_MCP_HTTP_CONNECT_TIMEOUT", "2")
+        monkeypatch.setenv("BOX_MCP_HTTP_READ_TIMEOUT", "120")
+
+        assert get_http_settings() == HttpSettings(
+            pool_size=20,
+            max_per_host=8,
+            keepalive_expiry=15.5,
+            connect_timeout=2.0,
+            read_timeout=120.0,
+        )
+
+    def test_invalid(self, monkeypatch):
+        """Test that non-positive values are rejected."""
+        monkeypatch.setenv("BOX_MCP_HTTP_READ_TIMEOUT", "0")
+        with pytest.raises(ValueError):
+            get_http_settings()
+
+    def test_session_pools_connections_per_host(self):
+        """Test that the adapters keep max_per_host connections per host."""
+        session = KeepAliveSession(HttpSettings(pool_size=4, max_per_host=7))
+        adapter = session.get_adapter("https://api.box.com/2.0/users/me")
+
+        assert adapter._pool_connections == server_context.HTTP_HOST_POOLS
+        assert adapter._pool_maxsize == 7
+        assert session.get_adapter("https://upload.box.com") is adapter
+
+    @patch("requests.Session.request")
+    def test_session_applies_timeouts(self, mock_request):
+        """Test that the configured timeouts replace the SDK's hard-coded ones."""
+        session = KeepAliveSession(HttpSettings(connect_timeout=2, read_timeout=9))
+
+        session.request("GET", "https://api.box.com/2.0/users/me", timeout=(5, 60))
+
+        assert mock_request.call_args.kwargs["timeout"] == (2, 9)
+
+    @patch("requests.Session.request")
+    def test_session_drops_idle_connections(self, mock_request):
+        """Test that pooled connections are dropped after the keep-alive expiry."""
+        session = KeepAliveSession(HttpSettings(keepalive_expiry=30))
+        url = "https://api.box.com/2.0/users/me"
+
+        with patch.object(session, "close") as mock_close:
+            with patch("server_context.time.monotonic", side_effect=[0, 10, 100]):
+                session.request("GET", url)
+                session.request("GET", url)
+                mock_close.assert_not_called()
+                session.request("GET", url)
+
+        mock_close.assert_called_once()
+
+    def test_ccg_client_uses_pooled_session(self, token_exchanges, monkeypatch):
+        """Test that the client built for box_lifespan uses the settings."""
+        monkeypatch.setenv("BOX_MCP_HTTP_MAX_PER_HOST", "12")
+
+        client = get_shared_client()
+        network_client = client.network_session.network_client
+
+        assert isinstance(network_client, BoxNetworkClient)
+        assert isinstance(network_client.requests_session, KeepAliveSession)
+        assert network_client.requests_session.settings.max_per_host == 12
+
+
+class TestMaxInlineSize:
+    """Test the limit on file content returned inline."""
+
+    def test_get_max_inline_size_default(self, monkeypatch):
+        """Test the default limit is 10 MiB."""
+        monkeypatch.delenv("BOX_MCP_MAX_INLINE_SIZE", raising=False)
+        assert get_max_inline_size() == 10 * 1024 * 1024
+
+    def test_get_max_inline_size_from_env(self, monkeypatch):
+        """Test that the limit is read from BOX_MCP_MAX_INLINE_SIZE."""
+        monkeypatch.setenv("BOX_MCP_MAX_INLINE_SIZE", "4096")
+        assert get_max_inline_size() == 4096
+
+
+class TestTransferConcurrency:
+    """Test the number of files a directory transfer sends at once."""
+
+    def test_get_transfer_concurrency_default(self, monkeypatch):
+        """Test the default is 8 files."""
+        monkeypatch.delenv("BOX_MCP_TRANSFER_CONCURRENCY", raising=False)
+        assert get_transfer_concurrency() == 8
+
+    def test_get_transfer_concurrency_rejects_zero(self, monkeypatch):
+        """Test that BOX_MCP_TRANSFER_CONCURRENCY must be positive."""
+        monkeypatch.setenv("BOX_MCP_TRANSFER_CONCURRENCY", "0")
+        with pytest.raises(ValueError):
+            get_transfer_concurrency()
+
+
+class TestContentCache:
+    """Test the process-wide cache of downloaded file content."""
+
+    def test_get_content_cache_reads_env(self, monkeypatch, tmp_path):
+        """Test that the cache is shared and configured from the environment."""
+        monkeypatch.setenv("BOX_MCP_CACHE_DIR", str(tmp_path))
+        monkeypatch.setenv("BOX_MCP_CACHE_MAX_SIZE", "4096")
+
+        cache = get_content_cache()
+
+        assert get_content_cache() is cache
+        assert cache.directory == str(tmp_path / "content")
+        assert cache.max_size == 4096
+
+    def test_get_text_cache_reads_env(self, monkeypatch, tmp_path):
+        """Test that the text cache tiers are sized from the environment."""
+        monkeypatch.setenv("BOX_MCP_CACHE_DIR", str(tmp_path))
+        monkeypatch.setenv("BOX_MCP_TEXT_CACHE_MEMORY_SIZE", "1024")
+        monkeypatch.delenv("BOX_MCP_TEXT_CACHE_DISK_SIZE", raising=False)
+
+        cache = get_text_cache()
+
+        assert get_text_cache() is cache
+        assert cache.memory_size == 1024
+        assert cache.disk.max_size == 256 * 1024 * 1024
+        assert cache.disk.directory == str(tmp_path / "text")
+
+
+class TestRateLimiter:
+    """Test the process-wide scheduler of Box API calls."""
+
+    def test_get_rate_limiter_defaults(self):
+        """Test that the scheduler is shared and uses the default rates."""
+        scheduler = get_rate_limiter()
+
+        assert get_rate_limiter() is scheduler
+        assert scheduler.buckets["search"].rate == RATE_LIMITS["search"]
+        assert scheduler.max_retries == 20
+
+    def test_get_rate_limiter_reads_env(self, monkeypatch):
+        """Test that rates and retries are read from the environment."""
+        monkeypatch.setenv("BOX_MCP_RATE_LIMIT_AI", "0.5")
+        monkeypatch.setenv("BOX_MCP_RATE_LIMIT_RETRIES", "3")
+
+        scheduler = get_rate_limiter()
+
+        assert scheduler.buckets["ai"].rate == 0.5
+        assert scheduler.buckets["upload"].rate == RATE_LIMITS["upload"]
+        assert scheduler.max_retries == 3
+
+    def test_get_rate_limiter_rejects_zero(self, monkeypatch):
+        """Test that a zero rate is rejected."""
+        monkeypatch.setenv("BOX_MCP_RATE_LIMIT_SEARCH", "0")
+
+        with pytest.raises(ValueError, match="BOX_MCP_RATE_LIMIT_SEARCH"):
+            get_rate_limiter()
+
+    def test_ccg_client_is_rate_limited(self, token_exchanges):
+        """Test that the shared client schedules its calls and queues 429s."""
+        network_session = get_shared_client().network_session
+
+        assert isinstance(network_session.network_client, RateLimitedNetworkClient)
+        assert isinstance(network_session.retry_strategy, RateLimitRetryStrategy)
+        assert network_session.network_client.scheduler is get_rate_limiter()
+        assert network_session.retry_strategy.scheduler is get_rate_limiter()
+
+
+class TestHttpClient:
+    """Test the pooled async HTTP client used by the native read paths."""
+
+    @pytest.mark.asyncio
+    async def test_get_http_client_is_shared_per_loop(self):
+        """Test that one keep-alive pool is reused on the running loop."""
+        http_client = server_context.get_http_client()
+
+        assert isinstance(http_client, httpx.AsyncClient)
+        assert server_context.get_http_client() is http_client
+        assert http_client.timeout.connect == 5.0
+
+    def test_get_http_client_uses_settings(self, monkeypatch):
+        """Test that the async pool follows the HTTP settings."""
+        monkeypatch.setenv("BOX_MCP_HTTP_POOL_SIZE", "7")
+        monkeypatch.setenv("BOX_MCP_HTTP_READ_TIMEOUT", "90")
+
+        async def get_client():
+            return server_context.get_http_client()
+
+        http_client = asyncio.run(get_client())
+        pool = http_client._transport._pool
+
+        assert pool._max_connections == 7
+        assert pool._max_keepalive_connections == 7
+        assert http_client.timeout.read == 90.0
+
+    def test_get_http_client_rebuilt_for_new_loop(self):
+        """Test that a client bound to a previous loop is not reused."""
+
+        async def get_client():
+            return server_context.get_http_client()
+
+        first = asyncio.run(get_client())
+        second = asyncio.run(get_client())
+
+        assert first is not second
+
+    @pytest.mark.asyncio
+    @patch("server_context.create_ccg_client")
+    async def test_box_lifespan_shares_http_client(self, mock_create_ccg_client):
+        """Test that every lifespan hands out the same HTTP client."""
+        mock_server = MagicMock()
+
+        async with box_lifespan(mock_server) as context1:
+            async with box_lifespan(mock_server) as context2:
+                assert isinstance(context1.http_client, httpx.AsyncClient)
+                assert context2.http_client is context1.http_client
+
+
+class TestSharedClient:
+    """Test the process-wide Box client and its token cache."""
+
+    def test_shared_client_uses_single_flight_auth(self, token_exchanges):
+        """Test that the shared client is built with single-flight auth."""
+        client = get_shared_client()
+
+        assert isinstance(client.auth, SingleFlightCCGAuth)
+        assert get_shared_client() is client
+
+    def test_shared_client_created_once_under_contention(self):
+        """Test that racing threads build the shared client only once."""
+        with patch("server_context.create_ccg_client") as mock_create:
+            mock_create.side_effect = lambda: (time.sleep(0.01), MagicMock())[1]
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                clients = list(pool.map(lambda _: get_shared_client(), range(64)))
+
+        mock_create.assert_called_once()
+        assert all(client is clients[0] for client in clients)
+
+    @pytest.mark.asyncio
+    async def test_one_token_exchange_for_1000_stateless_requests(
+        self, token_exchanges
+    ):
+        """Test that 1,000 concurrent stateless requests share one token."""
+        mock_server = MagicMock()
+        loop = asyncio.get_running_loop()
+
+        async def stateless_request():
+            # Stateless HTTP enters the lifespan once per request
+            async with box_lifespan(mock_server) as context:
+                return await loop.run_in_executor(
+                    context.executor,
+                    context.client.auth.retrieve_authorization_header,
+                )
+
+        headers = await asyncio.gather(*(stateless_request() for _ in range(1000)))
+
+        assert len(token_exchanges) == 1
+        assert set(headers) == {"Bearer token-1"}
+
+    def test_concurrent_refresh_collapses_to_one_exchange(self, token_exchanges):
+        """Test that a burst of 401 refreshes performs a single exchange."""
+        auth = get_shared_client().auth
+        auth.retrieve_token()
+        assert len(token_exchanges) == 1
+
+        barrier = threading.Barrier(32)
+
+        def refresh_after_401(_):
+            barrier.wait()
+            return auth.refresh_token().access_token
+
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            tokens = list(pool.map(refresh_after_401, range(32)))
+
+        assert len(token_exchanges) == 2
+        assert set(tokens) == {"token-2"}
+
+    def test_401_after_completed_refresh_reuses_new_token(self, token_exchanges):
+        """Test that a 401 for a token already replaced does not exchange again."""
+        auth = get_shared_client().auth
+        auth.retrieve_token()
+
+        first = auth.refresh_token(rejected_token="token-1")
+        late = auth.refresh_token(rejected_token="token-1")
+
+        assert first.access_token == late.access_token == "token-2"
+        assert len(token_exchanges) == 2
+
+    def test_sdk_401_refreshes_the_token_sent_from_its_thread(self, token_exchanges):
+        """Test that the SDK's 401 refresh knows which token was rejected."""
+        auth = get_shared_client().auth
+        sent = threading.Event()
+        refreshed = threading.Event()
+
+        def request_rejected_late():
+            # Sent before another caller's refresh, rejected after it
+            header = auth.retrieve_authorization_header()
+            sent.set()
+            refreshed.wait(timeout=5)
+            return header, auth.refresh_token().access_token
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            late = pool.submit(request_rejected_late)
+            sent.wait()
+            auth.refresh_token(rejected_token="token-1")
+            refreshed.set()
+            header, token = late.result()
+
+        assert header == "Bearer token-1"
+        assert token == "token-2"
+        assert len(token_exchanges) == 2
+
+
+class TestTokenManager:
+    """Test proactive, single-flight refresh of the CCG token."""
+
+    def test_refresh_if_expiring_keeps_fresh_token(self, token_exchanges):
+        """Test that a token valid beyond the margin is not refreshed."""
+        auth = get_shared_client().auth
+        token = auth.retrieve_token()
+
+        assert auth.refresh_token_if_expiring(margin=60) is token
+        assert len(token_exchanges) == 1
+
+    def test_refresh_if_expiring_refreshes_inside_margin(self, token_exchanges):
+        """Test that a token about to expire is refreshed."""
+        auth = get_shared_client().auth
+        auth.retrieve_token()
+
+        token = auth.refresh_token_if_expiring(margin=3600)
+
+        assert token.access_token == "token-2"
+        assert len(token_exchanges) == 2
+
+    def test_expired_token_is_not_served(self, token_exchanges):
+        """Test that retrieve_token replaces a token past its expiry."""
+        auth = get_shared_client().auth
+        auth.retrieve_token()
+        auth.issued_at -= 3600
+
+        assert auth.retrieve_token().access_token == "token-2"
+
+    def test_seconds_until_refresh(self, token_exchanges):
+        """Test the refresh schedule relative to token expiry."""
+        auth = get_shared_client().auth
+        token_manager = TokenManager(auth, refresh_margin=300)
+
+        # Unknown expiry means refresh right away
+        assert token_manager.seconds_until_refresh() == 0
+
+        auth.retrieve_token()
+        assert 3299 < token_manager.seconds_until_refresh() <= 3300
+
+    def test_revalidate_collapses_concurrent_calls(self, token_exchanges):
+        """Test that concurrent revalidations perform a single exchange."""
+        auth = get_shared_client().auth
+        auth.retrieve_token()
+        token_manager = TokenManager(auth)
+        barrier = threading.Barrier(16)
+
+        def revalidate(_):
+            barrier.wait()
+            return token_manager.revalidate()
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(revalidate, range(16)))
+
+        assert all(results)
+        assert len(token_exchanges) == 2
+
+    @pytest.mark.parametrize("token_lifetime", [1])
+    def test_background_refresh_ahead_of_expiry(self, token_exchanges):
+        """Test that callers never perform the exchange themselves."""
+        token_manager = get_token_manager(get_shared_client())
+        auth = token_manager.auth
+
+        deadline = time.monotonic() + 2.5
+        while time.monotonic() < deadline:
+            assert auth.retrieve_token() is not None
+            time.sleep(0.01)
+
+        # 1 s tokens are refreshed every 0.5 s, always by the background thread
+        assert len(token_exchanges) >= 4
+        assert set(token_exchanges) == {"box-token-refresh"}
+
+    def test_get_token_manager_is_shared_and_running(self, token_exchanges):
+        """Test that the token manager is created once and started."""
+        token_manager = get_token_manager(get_shared_client())
+
+        assert get_token_manager(get_shared_client()) is token_manager
+        assert token_manager.auth is get_shared_client().auth
+        assert token_manager._thread.is_alive()
+
+    @patch("server_context.create_ccg_client")
+    def test_get_token_manager_without_ccg_auth(self, mock_create_ccg_client):
+        """Test that clients without single-flight auth are not managed."""
+        mock_create_ccg_client.return_value = MagicMock()
+
+        assert get_token_manager(get_shared_client()) is None
+
+    @pytest.mark.asyncio
+    async def test_box_lifespan_provides_token_manager(self, token_exchanges):
+        """Test that box_lifespan hands out the running token manager."""
+        async with box_lifespan(MagicMock()) as context:
+            assert context.token_manager is get_token_manager(get_shared_client())
+            assert context.token_manager.auth is context.client.auth
+
+
+def retrieve_shared_token(path: str, exchanges_path: str) -> str:
+    """Worker process: retrieve the token through a shared token cache."""
+
+    def request_access_token(*args, **kwargs):
+        with open(exchanges_path, "a") as f:
+            f.write("x")
+        time.sleep(0.2)  # Keep the exchange in flight while the others start
+        return AccessToken(access_token="shared", expires_in=3600)
+
+    auth = SingleFlightCCGAuth(
+        CCGConfig(
+            client_id="client_id",
+            client_secret="client_secret",
+            enterprise_id="12345",
+            token_storage=SharedTokenStorage(path),
+        )
+    )
+    with patch("box_sdk_gen.box.ccg_auth.AuthorizationManager") as mock_manager:
+        mock_manager.return_value.request_access_token.side_effect = (
+            request_access_token
+        )
+        return auth.retrieve_token().access_token
+
+
+@pytest.mark.skipif(server_context.fcntl is None, reason="requires POSIX file locks")
+class TestSharedTokenStorage:
+    """Test the token cache shared by worker processes."""
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        return str(tmp_path / "token.json")
+
+    def test_store_and_get_across_instances(self, path):
+        """Test that a token stored by one worker is read by another."""
+        writer = SharedTokenStorage(path)
+        reader = SharedTokenStorage(path)
+        assert reader.get() is None
+
+        writer.store(AccessToken(access_token="token-1", expires_in=3600))
+
+        token = reader.get()
+        assert token.access_token == "token-1"
+        assert reader.get() is token
+        assert reader.expires_at() == pytest.approx(time.time() + 3600, abs=5)
+
+    def test_file_is_private(self, path):
+        """Test that the token file is only readable by its owner."""
+        SharedTokenStorage(path).store(AccessToken(access_token="t", expires_in=60))
+
+        assert os.stat(path).st_mode & 0o777 == 0o600
+
+    def test_clear(self, path):
+        """Test that clearing removes the token for every worker."""
+        storage = SharedTokenStorage(path)
+        storage.store(AccessToken(access_token="t", expires_in=60))
+
+        storage.clear()
+        storage.clear()
+
+        assert SharedTokenStorage(path).get() is None
+        assert storage.expires_at() is None
+
+    def test_ccg_client_uses_shared_storage(self, path, token_exchanges, monkeypatch):
+        """Test that BOX_MCP_TOKEN_CACHE makes the client share its token."""
+        monkeypatch.setenv("BOX_MCP_TOKEN_CACHE", path)
+
+        auth = get_shared_client().auth
+        auth.retrieve_token()
+
+        assert isinstance(auth.token_storage, SharedTokenStorage)
+        assert SharedTokenStorage(path).get().access_token == "token-1"
+
+    def test_workers_share_one_exchange(self, path, token_exchanges):
+        """Test that auths of different workers collapse into one exchange."""
+        auths = [
+            SingleFlightCCGAuth(
+                CCGConfig(
+                    client_id="client_id",
+                    client_secret="client_secret",
+                    enterprise_id="12345",
+                    token_storage=SharedTokenStorage(path),
+                )
+            )
+            for _ in range(4)
+        ]
+
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            tokens = list(pool.map(lambda i: auths[i % 4].retrieve_token(), range(64)))
+
+        assert len(token_exchanges) == 1
+        assert {token.access_token for token in tokens} == {"token-1"}
+
+    def test_refresh_by_one_worker_is_seen_by_others(self, path, token_exchanges):
+        """Test that a worker does not refresh a token another one renewed."""
+
+        def make_auth():
+            return SingleFlightCCGAuth(
+                CCGConfig(
+                    client_id="client_id",
+                    client_secret="client_secret",
+                    enterprise_id="12345",
+                    token_storage=SharedTokenStorage(path),
+                )
+            )
+
+        first, second = make_auth(), make_auth()
+        stale_token = first.retrieve_token()
+        assert second.retrieve_token().access_token == stale_token.access_token
+
+        first.refresh_token()
+        token = second.refresh_token_if_expiring(margin=300)
+
+        assert token.access_token == "token-2"
+        assert len(token_exchanges) == 2
+
+    def test_processes_share_one_exchange(self, path):
+        """Test single-flight exchange across real worker processes."""
+        exchanges_path = f"{path}.exchanges"
+        spawn = multiprocessing.get_context("spawn")
+
+        with spawn.Pool(4) as pool:
+            tokens = pool.starmap(retrieve_shared_token, [(path, exchanges_path)] * 4)
+
+        assert tokens == ["shared"] * 4
+        with open(exchanges_path) as f:
+            assert f.read() == "x"
+
+
+class TestUserClientPool:
+    """Test the LRU pool of per-user Box clients."""
+
+    @pytest.fixture
+    def pool(self):
+        """Pool over a mock shared client, building one mock per user."""
+        return UserClientPool(MagicMock(), lambda user_id: MagicMock(), max_size=2)
+
+    def test_reuses_client_per_user(self, pool):
+        """Test that a user's client is built once and then reused."""
+        client = pool.get("1")
+
+        assert pool.get("1") is client
+        assert pool.get("2") is not client
+        assert len(pool) == 2
+
+    def test_evicts_least_recently_used(self, pool):
+        """Test that the size cap evicts the least recently used client."""
+        pool.get("1")
+        pool.get("2")
+        pool.get("1")
+        pool.get("3")
+
+        assert "1" in pool
+        assert "2" not in pool
+        assert "3" in pool
+        assert pool.evictions == 1
+
+    def test_evicts_idle_clients(self):
+        """Test that clients idle past the timeout are dropped."""
+        pool = UserClientPool(MagicMock(), lambda user_id: MagicMock(), idle_timeout=60)
+
+        with patch("server_context.time.monotonic", side_effect=[0, 50, 100]):
+            pool.get("1")
+            pool.get("2")
+            pool.get("3")
+
+        assert "1" not in pool
+        assert "2" in pool
+        assert "3" in pool
+
+    def test_refreshes_expiring_user_token(self, token_exchanges, monkeypatch):
+        """Test that a user token close to expiry is refreshed in the background."""
+        monkeypatch.setenv("BOX_MCP_USER_MODE", "user-token")
+        pool = get_user_client_pool(get_shared_client())
+        auth = pool.get("1").auth
+        auth.retrieve_token()
+
+        auth.issued_at -= 3500
+        pool.get("1")
+        pool._clients["1"].refresh.result()
+
+        assert auth.token_storage.get().access_token == "token-2"
+        assert len(token_exchanges) == 2
+
+    def test_get_user_mode(self, monkeypatch):
+        """Test that per-user clients are opt-in and the mode is validated."""
+        monkeypatch.delenv("BOX_MCP_USER_MODE", raising=False)
+        assert get_user_mode() is None
+
+        monkeypatch.setenv("BOX_MCP_USER_MODE", "as-user")
+        assert get_user_mode() == "as-user"
+
+        monkeypatch.setenv("BOX_MCP_USER_MODE", "admin")
+        with pytest.raises(ValueError):
+            get_user_mode()
+
+    def test_as_user_clients_share_token(self, token_exchanges, monkeypatch):
+        """Test that as-user clients impersonate with the shared client's token."""
+        monkeypatch.setenv("BOX_MCP_USER_MODE", "as-user")
+        shared = get_shared_client()
+
+        client = get_user_client_pool(shared).get("42")
+        headers = client.network_session.additional_headers
+
+        assert client.auth is shared.auth
+        assert headers["As-User"] == "42"
+        assert headers["x-box-ai-library"] == "mcp-server-box"
+
+    def test_user_token_clients_have_own_auth(self, token_exchanges, monkeypatch):
+        """Test that user-token clients get a CCG token for the user."""
+        monkeypatch.setenv("BOX_MCP_USER_MODE", "user-token")
+        shared = get_shared_client()
+
+        client = get_user_client_pool(shared).get("42")
+
+        assert isinstance(client.auth, SingleFlightCCGAuth)
+        assert client.auth is not shared.auth
+        assert client.auth.subject_id == "42"
+        assert client.network_session is shared.network_session
+
+    @pytest.mark.asyncio
+    async def test_box_lifespan_provides_pool(self, token_exchanges, monkeypatch):
+        """Test that the lifespan hands out one pool when enabled."""
+        monkeypatch.setenv("BOX_MCP_USER_MODE", "as-user")
+        monkeypatch.setenv("BOX_MCP_USER_POOL_SIZE", "5")
+
+        async with box_lifespan(MagicMock()) as context1:
+            async with box_lifespan(MagicMock()) as context2:
+                assert isinstance(context1.user_clients, UserClientPool)
+                assert context2.user_clients is context1.user_clients
+                assert context1.user_clients.max_size == 5
+
+    @pytest.mark.asyncio
+    async def test_box_lifespan_without_user_mode(self, token_exchanges, monkeypatch):
+        """Test that no pool is built when per-user clients are disabled."""
+        monkeypatch.delenv("BOX_MCP_USER_MODE", raising=False)
+
+        async with box_lifespan(MagicMock()) as context:
+            assert context.user_clients is None
+
+
 class TestBoxContextIntegration:
     """Integration tests for BoxContext and box_lifespan together."""
 
     @pytest.mark.asyncio
-    @patch("server_context.get_oauth_client")
-    async def test_integration_box_context_in_lifespan(self, mock_get_oauth_client):
+    @patch("server_context.create_ccg_client")
+    async def test_integration_box_context_in_lifespan(self, mock_create_ccg_client):
         """Test integration between BoxContext and box_lifespan."""
         mock_client = MagicMock()
         mock_client.users = MagicMock()
         mock_client.users.get_user_me = MagicMock()
-        mock_get_oauth_client.return_value = mock_client
+        mock_create_ccg_client.return_value = mock_client
 
         mock_server = MagicMock()
 
@@ -249,11 +1067,11 @@ class TestBoxContextIntegration:
             assert hasattr(context.client.users, "get_user_me")
 
     @pytest.mark.asyncio
-    @patch("server_context.get_oauth_client")
-    async def test_integration_context_modification(self, mock_get_oauth_client):
+    @patch("server_context.create_ccg_client")
+    async def test_integration_context_modification(self, mock_create_ccg_client):
         """Test that context can be modified during the lifespan."""
         mock_client = MagicMock()
-        mock_get_oauth_client.return_value = mock_client
+        mock_create_ccg_client.return_value = mock_client
         mock_server = MagicMock()
 
         async with box_lifespan(mock_server) as context:
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+from mcp.server.fastmcp import Context, FastMCP, Image
+
+import server_context
+import tool_registry
+from tool_registry import (
+    BOX_TOOLS,
+    LazyBoxContext,
+    LazyTool,
+    build_tool_manifest,
+    lazy_box_lifespan,
+    load_tool_manifest,
+    register_box_tools,
+)
+
+
+@pytest.mark.asyncio
+async def test_manifest_is_up_to_date():
+    """The checked-in manifest must match the tools; run src/tool_registry.py"""
+    manifest = await build_tool_manifest()
+
+    assert manifest == list(load_tool_manifest().values())
+
+
+@pytest.mark.asyncio
+async def test_lazy_tools_list_like_eager_tools():
+    """Test lazy registration lists the same tools as eager registration"""
+    lazy_mcp = FastMCP("lazy")
+    eager_mcp = FastMCP("eager")
+    register_box_tools(lazy_mcp)
+    register_box_tools(eager_mcp, lazy=False)
+
+    lazy_tools = await lazy_mcp.list_tools()
+
+    assert lazy_tools == await eager_mcp.list_tools()
+    assert len(lazy_tools) == len(BOX_TOOLS)
+    assert all(
+        isinstance(tool, LazyTool) for tool in lazy_mcp._tool_manager.list_tools()
+    )
+
+
+def test_startup_does_not_import_box_sdk():
+    """Test listing tools and resources imports neither the Box SDK nor FastAPI"""
+    script = (
+        "import asyncio, sys\n"
+        "from mcp_server_box import get_mcp_server, register_tools\n"
+        "mcp = get_mcp_server()\n"
+        "register_tools(mcp)\n"
+        "tools = asyncio.run(mcp.list_tools())\n"
+        "asyncio.run(mcp.list_resource_templates())\n"
+        "heavy = [m for m in ('box_sdk_gen', 'box_ai_agents_toolkit', 'fastapi')"
+        " if m in sys.modules]\n"
+        "print(len(tools), heavy)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=os.path.dirname(tool_registry.__file__),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.split(maxsplit=1) == [str(len(BOX_TOOLS)), "[]\n"]
+
+
+@pytest.mark.asyncio
+async def test_lazy_tool_imports_module_on_first_call():
+    """Test a lazy tool builds the real tool on its first call"""
+    calls = []
+
+    async def box_who_am_i(ctx: Context) -> dict:
+        calls.append(ctx)
+        return {"id": "1"}
+
+    tool = LazyTool("box_tools_generic", load_tool_manifest()["box_who_am_i"])
+    ctx = MagicMock(spec=Context)
+
+    with patch("box_tools_generic.box_who_am_i", box_who_am_i):
+        result = await tool.run({}, context=ctx)
+        assert await tool.run({}, context=ctx) == result
+
+    assert result == {"id": "1"}
+    assert calls == [ctx, ctx]
+
+
+@pytest.mark.asyncio
+async def test_lazy_tool_is_called_by_fastmcp():
+    """
+    Lazy tools are written into FastMCP's private tool table; this fails if
+    FastMCP changes how it stores or calls tools
+    """
+
+    async def box_who_am_i(ctx: Context) -> dict:
+        return {"id": "1"}
+
+    mcp = FastMCP("lazy")
+    register_box_tools(mcp)
+    assert isinstance(mcp._tool_manager._tools["box_who_am_i"], LazyTool)
+
+    with patch("box_tools_generic.box_who_am_i", box_who_am_i):
+        (content,) = await mcp.call_tool("box_who_am_i", {})
+
+    assert json.loads(content.text) == {"id": "1"}
+    assert mcp._tool_manager.get_tool("box_who_am_i").resolve().fn is box_who_am_i
+
+
+@pytest.mark.asyncio
+async def test_lazy_tool_returns_image_content():
+    """Test a tool returning images is not turned into structured output"""
+
+    async def box_download_file_tool(
+        ctx: Context, file_id: str
+    ) -> str | list[str | Image]:
+        return ["Thumbnail of a.png", Image(data=b"\x89PNG", format="png")]
+
+    mcp = FastMCP("lazy")
+    register_box_tools(mcp)
+
+    with patch("box_tools_files.box_download_file_tool", box_download_file_tool):
+        text, image = await mcp.call_tool("box_download_file_tool", {"file_id": "1"})
+
+    assert text.text == "Thumbnail of a.png"
+    assert image.mimeType == "image/png"
+
+
+def test_register_without_manifest_is_eager():
+    """Test tools missing from the manifest are imported and registered"""
+    mcp = FastMCP("eager")
+
+    with patch("tool_registry.load_tool_manifest", return_value={}):
+        register_box_tools(mcp)
+
+    tools = mcp._tool_manager.list_tools()
+    assert len(tools) == len(BOX_TOOLS)
+    assert not any(isinstance(tool, LazyTool) for tool in tools)
+
+
+def test_load_tool_manifest_missing(tmp_path):
+    """Test a missing manifest loads as empty"""
+    assert load_tool_manifest(str(tmp_path / "missing.json")) == {}
+
+
+def test_load_tool_manifest(tmp_path):
+    """Test the manifest is keyed by tool name"""
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps([{"name": "tool", "inputSchema": {}}]))
+
+    assert load_tool_manifest(str(path)) == {
+        "tool": {"name": "tool", "inputSchema": {}}
+    }
+
+
+@patch("server_context.create_box_context")
+def test_lazy_box_context_builds_on_first_access(mock_create_box_context):
+    """Test the Box context is only built when first used, and only once"""
+    loop = MagicMock()
+    context = LazyBoxContext(loop)
+    mock_create_box_context.assert_not_called()
+
+    client = context.client
+    executor = context.executor
+
+    mock_create_box_context.assert_called_once_with(loop)
+    assert client is mock_create_box_context.return_value.client
+    assert executor is mock_create_box_context.return_value.executor
+
+
+@pytest.mark.asyncio
+@patch("server_context.create_box_context")
+async def test_lazy_box_lifespan(mock_create_box_context):
+    """Test the lazy lifespan starts without building the Box context"""
+    async with lazy_box_lifespan(MagicMock()) as context:
+        assert isinstance(context, LazyBoxContext)
+        mock_create_box_context.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("server_context.get_user_client_pool")
+@patch("server_context.get_token_manager")
+@patch("server_context.get_shared_client")
+async def test_lazy_box_context_first_used_from_worker_thread(*mocks):
+    """Test a tool can first touch the context from an executor thread"""
+    loop = asyncio.get_running_loop()
+    async with lazy_box_lifespan(MagicMock()) as context:
+        http_client = await loop.run_in_executor(None, lambda: context.http_client)
+
+    # Built for the server's loop, not for the worker thread
+    assert http_client is server_context.get_http_client()